@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from agenta_backend import celery_config
 from agenta_backend.routers import (
@@ -15,6 +16,7 @@ from agenta_backend.routers import (
     configs_router,
     health_router,
 )
+from agenta_backend.services import docker_runtime
 from agenta_backend.open_api import open_api_tags_metadata
 from agenta_backend.utils.common import isEE, isCloudProd, isCloudDev, isOss, isCloudEE
 from agenta_backend.migrations.postgres.utils import (
@@ -64,8 +66,19 @@ async def lifespan(application: FastAPI, cache=True):
     if await check_if_templates_table_exist():
         await templates_manager.update_and_sync_templates(cache=cache)
 
+    image_events_watcher = None
+    if docker_runtime.DOCKER_IMAGE_EVENTS_ENABLED and not isCloudEE():
+        image_events_watcher = asyncio.create_task(docker_runtime.watch_image_events())
+
     yield
 
+    if image_events_watcher is not None:
+        image_events_watcher.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await image_events_watcher
+    with suppress(Exception):
+        await docker_runtime.close_docker_client()
+
 
 app = FastAPI(lifespan=lifespan, openapi_tags=open_api_tags_metadata)
 
@@ -78,6 +91,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=allow_headers,
+    expose_headers=["X-Next-Cursor"],
 )
 
 if not isCloudEE():
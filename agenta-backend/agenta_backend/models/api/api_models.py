@@ -186,6 +186,23 @@ class Image(BaseModel):
     tags: str
 
 
+class ImageBuildStatusEnum(str, Enum):
+    BUILD_QUEUED = "BUILD_QUEUED"
+    BUILD_STARTED = "BUILD_STARTED"
+    BUILD_FINISHED = "BUILD_FINISHED"
+    BUILD_FAILED = "BUILD_FAILED"
+
+
+class ImageBuild(BaseModel):
+    build_id: str
+    app_id: str
+    status: ImageBuildStatusEnum
+    image: Optional[Image] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 class AddVariantFromImagePayload(BaseModel):
     variant_name: str
     docker_id: str
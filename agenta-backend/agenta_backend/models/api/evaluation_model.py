@@ -46,6 +46,11 @@ class AggregatedResult(BaseModel):
     result: Result
 
 
+class LLMJudgeCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+
+
 class NewHumanEvaluation(BaseModel):
     app_id: str
     variant_ids: List[str]
@@ -76,6 +81,7 @@ class Evaluation(BaseModel):
     average_cost: Optional[Result] = None
     total_cost: Optional[Result] = None
     average_latency: Optional[Result] = None
+    llm_judge_cache: Optional[LLMJudgeCacheStats] = None
     created_at: datetime
     updated_at: datetime
 
@@ -238,6 +244,8 @@ class LLMRunRateLimit(BaseModel):
     max_retries: int
     retry_delay: int
     delay_between_batches: int
+    max_concurrency: Optional[int] = None
+    requests_per_second: Optional[float] = None
 
 
 class LMProvidersEnum(str, Enum):
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 from pydantic import BaseModel, Field
 
 
@@ -51,3 +51,8 @@ class TestSetOutputResponse(BaseModel):
 
     class Config:
         allow_population_by_field_name = True
+
+
+class TestSetRowsResponse(BaseModel):
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[int] = None
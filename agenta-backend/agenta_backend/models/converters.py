@@ -4,7 +4,7 @@
 import uuid
 import json
 import logging
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Dict, Optional
 
 from agenta_backend.services import db_manager
 from agenta_backend.utils.common import isCloudEE
@@ -74,6 +74,7 @@ else:
 from agenta_backend.models.db_models import (
     TemplateDB,
     AppVariantRevisionsDB,
+    HumanEvaluationVariantDB,
 )
 from agenta_backend.models.api.api_models import (
     App,
@@ -100,10 +101,12 @@ logger.setLevel(logging.DEBUG)
 
 async def human_evaluation_db_to_simple_evaluation_output(
     human_evaluation_db: HumanEvaluationDB,
+    evaluation_variants: Optional[List[HumanEvaluationVariantDB]] = None,
 ) -> SimpleEvaluationOutput:
-    evaluation_variants = await db_manager.fetch_human_evaluation_variants(
-        human_evaluation_id=str(human_evaluation_db.id)
-    )
+    if evaluation_variants is None:
+        evaluation_variants = await db_manager.fetch_human_evaluation_variants(
+            human_evaluation_id=str(human_evaluation_db.id)
+        )
     return SimpleEvaluationOutput(
         id=str(human_evaluation_db.id),
         app_id=str(human_evaluation_db.app_id),
@@ -146,15 +149,18 @@ async def evaluation_db_to_pydantic(
         average_cost=evaluation_db.average_cost,
         total_cost=evaluation_db.total_cost,
         average_latency=evaluation_db.average_latency,
+        llm_judge_cache=getattr(evaluation_db, "llm_judge_cache", None),
     )
 
 
 async def human_evaluation_db_to_pydantic(
     evaluation_db: HumanEvaluationDB,
+    evaluation_variants: Optional[List[HumanEvaluationVariantDB]] = None,
 ) -> HumanEvaluation:
-    evaluation_variants = await db_manager.fetch_human_evaluation_variants(
-        human_evaluation_id=str(evaluation_db.id)  # type: ignore
-    )
+    if evaluation_variants is None:
+        evaluation_variants = await db_manager.fetch_human_evaluation_variants(
+            human_evaluation_id=str(evaluation_db.id)  # type: ignore
+        )
 
     revisions = []
     variants_ids = []
@@ -239,32 +245,65 @@ def aggregated_result_of_evaluation_to_pydantic(
 
 
 async def evaluation_scenario_db_to_pydantic(
-    evaluation_scenario_db: EvaluationScenarioDB, evaluation_id: str
+    evaluation_scenario_db: EvaluationScenarioDB,
+    evaluation_id: str,
+    fields: Optional[List[str]] = None,
 ) -> EvaluationScenario:
-    scenario_results = [
-        {
-            "evaluator_config": str(scenario_result.evaluator_config_id),
-            "result": scenario_result.result,
-        }
-        for scenario_result in evaluation_scenario_db.results
-    ]
+    """
+    Convert an EvaluationScenarioDB object to an EvaluationScenario object.
+
+    Args:
+        evaluation_scenario_db (EvaluationScenarioDB): The evaluation scenario to convert.
+        evaluation_id (str): The ID of the evaluation.
+        fields (List[str], optional): The fields loaded on the evaluation scenario (all if None); the other fields are left empty.
+
+    Returns:
+        EvaluationScenario: The converted evaluation scenario.
+    """
+
+    def is_loaded(field: str) -> bool:
+        return fields is None or field in fields
+
+    scenario_results = (
+        [
+            {
+                "evaluator_config": str(scenario_result.evaluator_config_id),
+                "result": scenario_result.result,
+            }
+            for scenario_result in evaluation_scenario_db.results
+        ]
+        if is_loaded("results")
+        else []
+    )
     return EvaluationScenario(
         id=str(evaluation_scenario_db.id),
         evaluation_id=evaluation_id,
-        inputs=[
-            EvaluationScenarioInput(**scenario_input)  # type: ignore
-            for scenario_input in evaluation_scenario_db.inputs
-        ],
-        outputs=[
-            EvaluationScenarioOutput(**scenario_output)  # type: ignore
-            for scenario_output in evaluation_scenario_db.outputs
-        ],
-        correct_answers=[
-            CorrectAnswer(**correct_answer)  # type: ignore
-            for correct_answer in evaluation_scenario_db.correct_answers
-        ],
-        is_pinned=evaluation_scenario_db.is_pinned or False,  # type: ignore
-        note=evaluation_scenario_db.note or "",  # type: ignore
+        inputs=(
+            [
+                EvaluationScenarioInput(**scenario_input)  # type: ignore
+                for scenario_input in evaluation_scenario_db.inputs
+            ]
+            if is_loaded("inputs")
+            else []
+        ),
+        outputs=(
+            [
+                EvaluationScenarioOutput(**scenario_output)  # type: ignore
+                for scenario_output in evaluation_scenario_db.outputs
+            ]
+            if is_loaded("outputs")
+            else []
+        ),
+        correct_answers=(
+            [
+                CorrectAnswer(**correct_answer)  # type: ignore
+                for correct_answer in evaluation_scenario_db.correct_answers
+            ]
+            if is_loaded("correct_answers")
+            else None
+        ),
+        is_pinned=(evaluation_scenario_db.is_pinned or False) if is_loaded("is_pinned") else None,  # type: ignore
+        note=(evaluation_scenario_db.note or "") if is_loaded("note") else None,  # type: ignore
         results=scenario_results,  # type: ignore
     )
 
@@ -488,19 +527,22 @@ def templates_db_to_pydantic(templates_db: List[TemplateDB]) -> List[Template]:
     ]
 
 
-def testset_db_to_pydantic(test_set_db: TestSetDB) -> TestSetOutput:
+def testset_db_to_pydantic(
+    test_set_db: TestSetDB, csvdata: Optional[List[Dict[str, Any]]] = None
+) -> TestSetOutput:
     """
     Convert a TestSetDB object to a TestSetAPI object.
 
     Args:
         test_set_db (Dict): The TestSetDB object to be converted.
+        csvdata (List[Dict], optional): The rows of the testset, when they are not stored on the TestSetDB object.
 
     Returns:
         TestSetAPI: The converted TestSetAPI object.
     """
     return TestSetOutput(
         name=test_set_db.name,
-        csvdata=test_set_db.csvdata,
+        csvdata=csvdata if csvdata is not None else test_set_db.csvdata,
         created_at=str(test_set_db.created_at),
         updated_at=str(test_set_db.updated_at),
         id=str(test_set_db.id),
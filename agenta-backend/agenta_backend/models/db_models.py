@@ -9,13 +9,14 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Enum,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy_json import mutable_json_type
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from agenta_backend.models.base import Base
-from agenta_backend.models.shared_models import TemplateType
+from agenta_backend.models.shared_models import TemplateType, TestsetStorageMode
 
 
 class UserDB(Base):
@@ -166,6 +167,9 @@ class VariantBaseDB(Base):
 
 class AppVariantDB(Base):
     __tablename__ = "app_variants"
+    __table_args__ = (
+        Index("ix_app_variants_base_id_config_name", "base_id", "config_name"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -245,6 +249,7 @@ class AppVariantRevisionsDB(Base):
 
 class AppEnvironmentDB(Base):
     __tablename__ = "environments"
+    __table_args__ = (Index("ix_environments_app_id_name", "app_id", "name"),)
 
     id = Column(
         UUID(as_uuid=True),
@@ -343,6 +348,9 @@ class TestSetDB(Base):
     name = Column(String)
     app_id = Column(UUID(as_uuid=True), ForeignKey("app_db.id", ondelete="CASCADE"))
     csvdata = Column(mutable_json_type(dbtype=JSONB, nested=True))
+    storage_mode = Column(
+        String, default=TestsetStorageMode.JSON.value, nullable=False
+    )  # TestsetStorageMode; in "rows" mode, the rows are stored in TestSetRowDB
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
@@ -354,6 +362,30 @@ class TestSetDB(Base):
     user = relationship("UserDB")
 
 
+class TestSetRowDB(Base):
+    __tablename__ = "testset_rows"
+    __table_args__ = (
+        Index(
+            "ix_testset_rows_testset_id_ordinal", "testset_id", "ordinal", unique=True
+        ),
+    )
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid7,
+        unique=True,
+        nullable=False,
+    )
+    testset_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("testsets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    ordinal = Column(Integer, nullable=False)  # position of the row in the testset
+    data = Column(mutable_json_type(dbtype=JSONB, nested=True))
+
+
 class EvaluatorConfigDB(Base):
     __tablename__ = "evaluators_configs"
 
@@ -540,6 +572,9 @@ class EvaluationDB(Base):
     average_cost = Column(mutable_json_type(dbtype=JSONB, nested=True))  # Result
     total_cost = Column(mutable_json_type(dbtype=JSONB, nested=True))  # Result
     average_latency = Column(mutable_json_type(dbtype=JSONB, nested=True))  # Result
+    llm_judge_cache = Column(
+        mutable_json_type(dbtype=JSONB, nested=True)
+    )  # LLMJudgeCacheStats
     created_at = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -23,6 +23,7 @@ class InvokationResult(BaseModel):
     result: Result
     cost: Optional[float] = None
     latency: Optional[float] = None
+    status_code: Optional[int] = None
 
 
 class EvaluationScenarioResult(BaseModel):
@@ -65,3 +66,8 @@ class HumanEvaluationScenarioOutput(BaseModel):
 class TemplateType(enum.Enum):
     IMAGE = "image"
     ZIP = "zip"
+
+
+class TestsetStorageMode(str, enum.Enum):
+    JSON = "json"
+    ROWS = "rows"
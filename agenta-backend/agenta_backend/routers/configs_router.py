@@ -1,8 +1,8 @@
 import logging
 
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from fastapi.responses import JSONResponse
-from fastapi import Request, HTTPException
+from fastapi import Request, Response, HTTPException
 from agenta_backend.utils.common import APIRouter, isCloudEE
 
 from agenta_backend.models.api.api_models import (
@@ -12,6 +12,7 @@ from agenta_backend.models.api.api_models import (
 from agenta_backend.services import (
     db_manager,
     app_manager,
+    configs_cache,
 )
 
 if isCloudEE():
@@ -96,18 +97,80 @@ async def save_config(
         raise HTTPException(status_code, detail=str(e)) from e
 
 
+async def resolve_config(
+    base_id: str,
+    config_name: Optional[str] = None,
+    environment_name: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Resolves the configuration deployed to an environment, or with the given name, of a base.
+
+    Args:
+        base_id (str): The ID of the base.
+        config_name (Optional[str]): The name of the configuration.
+        environment_name (Optional[str]): The environment the configuration is deployed to.
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The ID of the app of the base, and the configuration.
+    """
+
+    # in case environment_name is provided, find the variant deployed
+    if environment_name:
+        result = await db_manager.fetch_config_by_environment(
+            base_id=base_id, environment_name=environment_name
+        )
+        if result is None or result[1] is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Environment name {environment_name} not found for base {base_id}",
+            )
+        app_environment, found_variant_revision = result
+        if str(found_variant_revision.base_id) != await db_manager.get_object_uuid(
+            object_id=base_id, table_name="bases"
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Environment {environment_name} does not deploy base {base_id}",
+            )
+
+        return str(app_environment.app_id), {
+            "config_name": found_variant_revision.config_name,
+            "current_version": found_variant_revision.revision,
+            "parameters": found_variant_revision.config_parameters,
+        }
+    elif config_name:
+        found_variant = await db_manager.fetch_config_by_config_name(
+            base_id=base_id, config_name=config_name
+        )
+        if not found_variant:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Config name {config_name} not found for base {base_id}",
+            )
+
+        return str(found_variant.app_id), {
+            "config_name": found_variant.config_name,
+            "current_version": found_variant.revision,
+            "parameters": found_variant.config_parameters,
+        }
+
+    raise HTTPException(
+        status_code=400,
+        detail="Either config_name or environment_name must be provided",
+    )
+
+
 @router.get("/", response_model=GetConfigResponse, operation_id="get_config")
 async def get_config(
     request: Request,
+    response: Response,
     base_id: str,
     config_name: Optional[str] = None,
     environment_name: Optional[str] = None,
 ):
     try:
-        base_db = await db_manager.fetch_base_by_id(base_id)
-
         # determine whether the user has access to the base
         if isCloudEE():
+            base_db = await db_manager.fetch_base_by_id(base_id)
             has_permission = await check_action_access(
                 user_uid=request.state.user_id,
                 object=base_db,
@@ -121,64 +184,24 @@ async def get_config(
                     status_code=403,
                 )
 
-        # in case environment_name is provided, find the variant deployed
-        if environment_name:
-            app_environments = await db_manager.list_environments(
-                app_id=str(base_db.app_id)  # type: ignore
+        cache = configs_cache.get_configs_cache()
+        cached_config = cache.get(base_id, environment_name, config_name)
+        if cached_config is None:
+            app_id, config = await resolve_config(
+                base_id, config_name=config_name, environment_name=environment_name
             )
-            found_variant_revision = next(
-                (
-                    app_environment.deployed_app_variant_revision
-                    for app_environment in app_environments
-                    if app_environment.name == environment_name
-                ),
-                None,
+            cached_config = cache.set(
+                base_id, environment_name, config_name, app_id, config
             )
-            if not found_variant_revision:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Environment name {environment_name} not found for base {str(base_db.id)}",
-                )
-            if str(found_variant_revision.base_id) != str(base_db.id):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Environment {environment_name} does not deploy base {str(base_db.id)}",
-                )
 
-            variant_revision = found_variant_revision.revision
-            config = {
-                "name": found_variant_revision.config_name,
-                "parameters": found_variant_revision.config_parameters,
-            }
-        elif config_name:
-            variants_db = await db_manager.list_variants_for_base(base_db)
-            found_variant = next(
-                (
-                    variant_db
-                    for variant_db in variants_db
-                    if variant_db.config_name == config_name  # type: ignore
-                ),
-                None,
-            )
-            if not found_variant:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Config name {config_name} not found for base {str(base_db.id)}",
-                )
-            variant_revision = found_variant.revision
-            config = {
-                "name": found_variant.config_name,
-                "parameters": found_variant.config_parameters,
-            }
-
-        assert (
-            "name" and "parameters" in config
-        ), "'name' and 'parameters' not found in configuration"
-        return GetConfigResponse(
-            config_name=config["name"],  # type: ignore
-            current_version=variant_revision,  # type: ignore
-            parameters=config["parameters"],  # type: ignore
-        )
+        # the client already has this configuration
+        if configs_cache.etag_matches(
+            request.headers.get("if-none-match"), cached_config.etag
+        ):
+            return Response(status_code=304, headers={"ETag": cached_config.etag})
+
+        response.headers["ETag"] = cached_config.etag
+        return GetConfigResponse(**cached_config.config)
     except HTTPException as e:
         logger.error(f"get_config http exception: {e.detail}")
         raise
@@ -2,7 +2,7 @@ import uuid
 import logging
 
 from typing import List, Optional, Union
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import Request, UploadFile, HTTPException
 
 from agenta_backend.services import db_manager
@@ -33,6 +33,7 @@ else:
 
 from agenta_backend.models.api.api_models import (
     URI,
+    ImageBuild,
     RestartAppContainer,
     Template,
 )
@@ -93,6 +94,119 @@ async def build_image(
         return JSONResponse({"message": str(ex)}, status_code=500)
 
 
+@router.post("/image_builds/", operation_id="submit_image_build")
+async def submit_image_build(
+    app_id: str,
+    base_name: str,
+    tar_file: UploadFile,
+    request: Request,
+) -> ImageBuild:
+    """
+    Queues the build of a Docker image from a tar file containing the application code.
+
+    Unlike `build_image`, returns as soon as the upload is saved. The progress of the
+    build is available from `get_image_build` and `stream_image_build_logs`.
+
+    Args:
+        app_id (str): The ID of the application to build the image for.
+        base_name (str): The base name of the image to build.
+        tar_file (UploadFile): The tar file containing the application code.
+
+    Returns:
+        ImageBuild: The queued build.
+    """
+
+    app_db = await db_manager.fetch_app_by_id(app_id)
+
+    # Check app access
+    if isCloudEE():
+        has_permission = await check_action_access(
+            user_uid=request.state.user_id,
+            object=app_db,
+            permission=Permission.CREATE_APPLICATION,
+        )
+        if not has_permission:
+            error_msg = f"You do not have permission to perform this action. Please contact your organization admin."
+            logger.error(error_msg)
+            return JSONResponse(
+                {"detail": error_msg},
+                status_code=403,
+            )
+
+    build = await container_manager.submit_image_build(
+        app_db=app_db,
+        base_name=base_name,
+        tar_file=tar_file,
+    )
+    return build.to_api()
+
+
+@router.get("/image_builds/{build_id}/", operation_id="get_image_build")
+async def get_image_build(build_id: str, request: Request) -> ImageBuild:
+    """
+    Returns the status of an image build, and its image once finished.
+
+    Raises:
+        HTTPException: If the build is unknown, or finished before the retention period.
+    """
+
+    build = container_manager.get_image_build(build_id)
+    if build is None:
+        raise HTTPException(status_code=404, detail=f"Build {build_id} not found")
+
+    # Check app access
+    if isCloudEE():
+        has_permission = await check_action_access(
+            user_uid=request.state.user_id,
+            object=await db_manager.fetch_app_by_id(build.app_id),
+            permission=Permission.VIEW_APPLICATION,
+        )
+        if not has_permission:
+            error_msg = f"You do not have permission to perform this action. Please contact your organization admin."
+            logger.error(error_msg)
+            return JSONResponse(
+                {"detail": error_msg},
+                status_code=403,
+            )
+
+    return build.to_api()
+
+
+@router.get("/image_builds/{build_id}/logs/", operation_id="stream_image_build_logs")
+async def stream_image_build_logs(build_id: str, request: Request):
+    """
+    Streams the logs of an image build as plain text, until the build is finished.
+
+    Raises:
+        HTTPException: If the build is unknown, or finished before the retention period.
+    """
+
+    build = container_manager.get_image_build(build_id)
+    if build is None:
+        raise HTTPException(status_code=404, detail=f"Build {build_id} not found")
+
+    # Check app access
+    if isCloudEE():
+        has_permission = await check_action_access(
+            user_uid=request.state.user_id,
+            object=await db_manager.fetch_app_by_id(build.app_id),
+            permission=Permission.VIEW_APPLICATION,
+        )
+        if not has_permission:
+            error_msg = f"You do not have permission to perform this action. Please contact your organization admin."
+            logger.error(error_msg)
+            return JSONResponse(
+                {"detail": error_msg},
+                status_code=403,
+            )
+
+    async def lines():
+        async for line in build.follow_logs():
+            yield f"{line}\n"
+
+    return StreamingResponse(lines(), media_type="text/plain")
+
+
 @router.post("/restart_container/", operation_id="restart_container")
 async def restart_docker_container(
     payload: RestartAppContainer,
@@ -112,7 +226,7 @@ async def restart_docker_container(
         container_id = deployment.container_id
 
         logger.debug(f"Restarting container with id: {container_id}")
-        container_manager.restart_container(container_id)
+        await container_manager.restart_container(container_id)
         return {"message": "Please wait a moment. The container is now restarting."}
     except Exception as ex:
         return JSONResponse({"message": str(ex)}, status_code=500)
@@ -1,6 +1,7 @@
+import uuid
 import random
 import logging
-from typing import Any, List
+from typing import Any, List, Optional
 
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException, Request, status, Response, Query
@@ -244,11 +245,30 @@ async def fetch_evaluation_results(evaluation_id: str, request: Request):
 async def fetch_evaluation_scenarios(
     evaluation_id: str,
     request: Request,
+    response: Response,
+    cursor: Optional[uuid.UUID] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    fields: Optional[List[str]] = Query(default=None),
+    evaluator_config_id: Optional[uuid.UUID] = None,
+    result_value: Optional[str] = None,
+    has_error: Optional[bool] = None,
 ):
     """Fetches evaluation scenarios for a given evaluation ID.
 
+    When a limit is provided, the scenarios are paginated: the cursor of the next page
+    is returned in the X-Next-Cursor header, and is absent on the last page.
+
     Arguments:
         evaluation_id (str): The ID of the evaluation for which to fetch scenarios.
+        cursor (uuid.UUID, optional): The X-Next-Cursor header of the previous page \
+            (a malformed cursor is rejected with a 422).
+        limit (int, optional): The maximum number of scenarios to return.
+        fields (List[str], optional): The scenario fields to return (all if not provided), \
+            among inputs, outputs, correct_answers, is_pinned, note and results.
+        evaluator_config_id (uuid.UUID, optional): Only return the scenarios evaluated by this evaluator config.
+        result_value (str, optional): Only return the scenarios whose result for evaluator_config_id \
+            has this value (rejected with a 422 without evaluator_config_id).
+        has_error (bool, optional): Only return the scenarios with (or without) an app or evaluator error.
 
     Raises:
         HTTPException: If the evaluation is not found or access is denied.
@@ -257,6 +277,12 @@ async def fetch_evaluation_scenarios(
         List[EvaluationScenario]: A list of evaluation scenarios.
     """
 
+    if result_value is not None and evaluator_config_id is None:
+        raise HTTPException(
+            status_code=422,
+            detail="result_value can only be used with evaluator_config_id",
+        )
+
     try:
         evaluation = await db_manager.fetch_evaluation_by_id(evaluation_id)
         if not evaluation:
@@ -283,9 +309,35 @@ async def fetch_evaluation_scenarios(
 
         eval_scenarios = (
             await evaluation_service.fetch_evaluation_scenarios_for_evaluation(
-                evaluation_id=str(evaluation.id)
+                evaluation_id=str(evaluation.id),
+                cursor=str(cursor) if cursor is not None else None,
+                limit=limit,
+                fields=fields,
+                evaluator_config_id=(
+                    str(evaluator_config_id)
+                    if evaluator_config_id is not None
+                    else None
+                ),
+                result_value=result_value,
+                has_error=has_error,
             )
         )
+        headers = {}
+        if limit is not None and len(eval_scenarios) == limit:
+            headers["X-Next-Cursor"] = eval_scenarios[-1].id
+        response.headers.update(headers)
+
+        if fields is not None:
+            # Only the requested fields are returned, to keep the response small
+            return JSONResponse(
+                [
+                    eval_scenario.model_dump(
+                        mode="json", include={"id", "evaluation_id", *fields}
+                    )
+                    for eval_scenario in eval_scenarios
+                ],
+                headers=headers,
+            )
         return eval_scenarios
 
     except Exception as exc:
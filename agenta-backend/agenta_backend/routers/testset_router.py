@@ -1,17 +1,17 @@
-import io
-import csv
 import json
+import uuid
 import random
 import logging
 import requests
 from typing import Optional, List
 
 from pydantic import ValidationError
+from sqlalchemy.exc import NoResultFound
 
 from fastapi.responses import JSONResponse
-from fastapi import HTTPException, UploadFile, File, Form, Request
+from fastapi import HTTPException, UploadFile, File, Form, Request, Query
 
-from agenta_backend.services import db_manager
+from agenta_backend.services import db_manager, testset_upload_service
 from agenta_backend.utils.common import APIRouter, isCloudEE
 from agenta_backend.models.converters import testset_db_to_pydantic
 
@@ -19,6 +19,7 @@ from agenta_backend.models.converters import testset_db_to_pydantic
 from agenta_backend.models.api.testset_model import (
     NewTestset,
     DeleteTestsets,
+    TestSetRowsResponse,
     TestSetSimpleResponse,
     TestSetOutputResponse,
 )
@@ -57,8 +58,11 @@ async def upload_file(
     """
     Uploads a CSV or JSON file and saves its data to MongoDB.
 
+    The file is parsed incrementally and its rows are saved in chunks, so that large
+    files are never fully loaded in memory.
+
     Args:
-    upload_type : Either a json or csv file.
+    upload_type : Either a json (JSON array or newline-delimited JSON) or csv file.
         file (UploadFile): The CSV or JSON file to upload.
         testset_name (Optional): the name of the testset if provided.
 
@@ -82,44 +86,34 @@ async def upload_file(
                 status_code=403,
             )
 
-    # Create a document
-    document = {
-        "name": testset_name if testset_name else file.filename,
-        "csvdata": [],
-    }
-
-    if upload_type == "JSON":
-        # Read and parse the JSON file
-        json_data = await file.read()
-        json_text = json_data.decode("utf-8")
-        json_object = json.loads(json_text)
-
-        # Populate the document with column names and values
-        for row in json_object:
-            document["csvdata"].append(row)
-
-    else:
-        # Read and parse the CSV file
-        csv_data = await file.read()
-        csv_text = csv_data.decode("utf-8")
-
-        # Use StringIO to create a file-like object from the string
-        csv_file_like_object = io.StringIO(csv_text)
-        csv_reader = csv.DictReader(csv_file_like_object)
+    name = testset_name if testset_name else file.filename
+    progress = {"logged_percent": 0}
 
-        # Populate the document with rows from the CSV reader
-        for row in csv_reader:
-            document["csvdata"].append(row)
+    def log_progress(bytes_read: int, size: Optional[int]):
+        if not size:
+            return
+        percent = min(100, bytes_read * 100 // size)
+        if percent >= progress["logged_percent"] + 10:
+            progress["logged_percent"] = percent
+            logger.debug(f"Testset upload {name}: {percent}% ({bytes_read} bytes) read")
 
+    rows = testset_upload_service.stream_testset_rows(
+        file, upload_type, on_progress=log_progress
+    )
     try:
-        testset = await db_manager.create_testset(
-            app=app, user_uid=request.state.user_id, testset_data=document
+        testset, rows_count = await db_manager.create_testset_from_rows(
+            app=app, user_uid=request.state.user_id, name=name, rows=rows
         )
+        logger.debug(f"Testset upload {name}: {rows_count} rows saved")
         return TestSetSimpleResponse(
             id=str(testset.id),
-            name=document["name"],
+            name=name,
             created_at=str(testset.created_at),
         )
+    except testset_upload_service.TestsetUploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except testset_upload_service.TestsetUploadFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ValidationError as e:
         raise HTTPException(status_code=403, detail=e.errors())
 
@@ -388,12 +382,70 @@ async def get_single_testset(
 
         if test_set is None:
             raise HTTPException(status_code=404, detail="testset not found")
-        return testset_db_to_pydantic(test_set)
+        csvdata = await db_manager.fetch_testset_csvdata(test_set)
+        return testset_db_to_pydantic(test_set, csvdata=csvdata)
     except Exception as exc:
         status_code = exc.status_code if hasattr(exc, "status_code") else 500  # type: ignore
         raise HTTPException(status_code=status_code, detail=str(exc))
 
 
+@router.get(
+    "/{testset_id}/rows/",
+    response_model=TestSetRowsResponse,
+    operation_id="get_testset_rows",
+)
+async def get_testset_rows(
+    testset_id: uuid.UUID,
+    request: Request,
+    cursor: Optional[int] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    columns: Optional[List[str]] = Query(default=None),
+):
+    """
+    Fetch a page of the rows of a testset.
+
+    Args:
+        testset_id (uuid.UUID): The _id of the testset to fetch the rows of \
+            (a malformed ID is rejected with a 422).
+        cursor (Optional[int]): The next_cursor returned with the previous page.
+        limit (int): The maximum number of rows to return.
+        columns (Optional[List[str]]): The columns to return (all if not provided).
+
+    Returns:
+        The rows of the page, and the cursor of the next page if there is one.
+    """
+
+    if isCloudEE():
+        has_permission = await check_action_access(
+            user_uid=request.state.user_id,
+            object_id=str(testset_id),
+            object_type="testset",
+            permission=Permission.VIEW_TESTSET,
+        )
+        logger.debug(f"User has Permission to view Testset: {has_permission}")
+        if not has_permission:
+            error_msg = f"You do not have permission to perform this action. Please contact your organization admin."
+            logger.error(error_msg)
+            return JSONResponse(
+                {"detail": error_msg},
+                status_code=403,
+            )
+
+    try:
+        page = await db_manager.fetch_testset_rows(
+            str(testset_id),
+            after=cursor if cursor is not None else -1,
+            limit=limit,
+            columns=columns,
+        )
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="testset not found")
+    return TestSetRowsResponse(
+        rows=[row for _, row in page],
+        next_cursor=page[-1][0] if len(page) == limit else None,
+    )
+
+
 @router.delete("/", response_model=List[str], operation_id="delete_testsets")
 async def delete_testsets(
     payload: DeleteTestsets,
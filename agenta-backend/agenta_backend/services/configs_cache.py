@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# How long a resolved configuration is served without querying the database (in seconds).
+# Deployments and parameter updates invalidate the cache of the process handling them,
+# the TTL bounds how long the other workers serve the previous configuration.
+CONFIGS_CACHE_TTL = float(os.environ.get("AGENTA_CONFIGS_CACHE_TTL", 5))
+# Maximum number of configurations kept in memory by each process
+CONFIGS_CACHE_SIZE = int(os.environ.get("AGENTA_CONFIGS_CACHE_SIZE", 10000))
+
+
+class CachedConfig(NamedTuple):
+    app_id: str
+    config: Dict[str, Any]
+    etag: str
+
+
+def compute_etag(config: Dict[str, Any]) -> str:
+    """
+    Computes the (strong) ETag of a configuration, from its JSON representation.
+
+    Args:
+        config (Dict[str, Any]): The configuration, as returned by GET /configs.
+
+    Returns:
+        str: The quoted ETag.
+    """
+
+    payload = json.dumps(config, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks whether an If-None-Match header matches an ETag (weak comparison).
+
+    Args:
+        if_none_match (Optional[str]): The value of the If-None-Match header.
+        etag (str): The quoted ETag of the current configuration.
+
+    Returns:
+        bool: Whether the client already has the current configuration.
+    """
+
+    if not if_none_match:
+        return False
+
+    def opaque_tag(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    tags = [opaque_tag(tag) for tag in if_none_match.split(",")]
+    return "*" in tags or opaque_tag(etag) in tags
+
+
+class ConfigsCache:
+    """
+    In-process cache of the configurations resolved by GET /configs.
+
+    Entries are keyed by base, environment name and config name, and remember the
+    app they belong to: deploying to an environment or updating the parameters of a
+    variant invalidates all the configurations of its app.
+    """
+
+    def __init__(
+        self, ttl: float = CONFIGS_CACHE_TTL, max_size: int = CONFIGS_CACHE_SIZE
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, Optional[str], Optional[str]], Tuple[float, CachedConfig]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        base_id: str,
+        environment_name: Optional[str] = None,
+        config_name: Optional[str] = None,
+    ) -> Optional[CachedConfig]:
+        """
+        Returns a cached configuration, if it has not expired.
+
+        Args:
+            base_id (str): The ID of the base.
+            environment_name (Optional[str]): The environment the configuration is deployed to.
+            config_name (Optional[str]): The name of the configuration.
+
+        Returns:
+            Optional[CachedConfig]: The configuration, or None.
+        """
+
+        key = (base_id, environment_name, config_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() > entry[0]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(
+        self,
+        base_id: str,
+        environment_name: Optional[str],
+        config_name: Optional[str],
+        app_id: str,
+        config: Dict[str, Any],
+    ) -> CachedConfig:
+        """
+        Caches a resolved configuration.
+
+        Args:
+            base_id (str): The ID of the base.
+            environment_name (Optional[str]): The environment the configuration is deployed to.
+            config_name (Optional[str]): The name of the configuration.
+            app_id (str): The ID of the app of the base.
+            config (Dict[str, Any]): The configuration, as returned by GET /configs.
+
+        Returns:
+            CachedConfig: The cached configuration, with its ETag.
+        """
+
+        cached_config = CachedConfig(str(app_id), config, compute_etag(config))
+        if self.ttl <= 0:
+            return cached_config
+
+        key = (base_id, environment_name, config_name)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, cached_config)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return cached_config
+
+    def invalidate(self, app_id: Optional[str] = None) -> None:
+        """
+        Removes the cached configurations of an app.
+
+        Args:
+            app_id (Optional[str]): The ID of the app (all the apps if None).
+        """
+
+        with self._lock:
+            if app_id is None:
+                self._entries.clear()
+                return
+            for key, (_, cached_config) in list(self._entries.items()):
+                if cached_config.app_id == str(app_id):
+                    del self._entries[key]
+
+
+_configs_cache: Optional[ConfigsCache] = None
+
+
+def get_configs_cache() -> ConfigsCache:
+    """
+    Returns the cache of the configurations resolved by GET /configs.
+
+    Returns:
+        ConfigsCache: The cache.
+    """
+
+    global _configs_cache
+    if _configs_cache is None:
+        _configs_cache = ConfigsCache()
+    return _configs_cache
@@ -5,8 +5,9 @@ import shutil
 import uuid
 from asyncio.exceptions import CancelledError
 from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 import backoff
 import docker
@@ -15,11 +16,15 @@ from aiodocker import Docker, exceptions
 from fastapi import HTTPException, UploadFile
 from httpx import ConnectError, TimeoutException
 
-from agenta_backend.models.api.api_models import Image
+from agenta_backend.models.api.api_models import (
+    Image,
+    ImageBuild,
+    ImageBuildStatusEnum,
+)
 from agenta_backend.models.db_models import (
     AppDB,
 )
-from agenta_backend.services import docker_utils
+from agenta_backend.services import docker_runtime
 from agenta_backend.utils.common import isCloudProd
 
 client = docker.from_env()
@@ -28,39 +33,214 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-async def build_image(app_db: AppDB, base_name: str, tar_file: UploadFile) -> Image:
+# Maximum number of images built at the same time by the API process
+IMAGE_BUILDS_MAX_CONCURRENCY = int(
+    os.environ.get("AGENTA_IMAGE_BUILDS_MAX_CONCURRENCY", 2)
+)
+# Size of the chunks in which uploaded build contexts are written to disk, in bytes
+IMAGE_BUILDS_UPLOAD_CHUNK_SIZE = 1024 * 1024
+# How long finished builds (and their logs) are kept, in seconds
+IMAGE_BUILDS_RETENTION = int(os.environ.get("AGENTA_IMAGE_BUILDS_RETENTION", 3600))
+
+
+class QueuedImageBuild:
+    """
+    An image build run by the build queue, with its status and logs.
+
+    The build runs in a worker thread and notifies the event loop of the API when
+    it logs a line or finishes, so that its logs can be followed while it runs.
+    """
+
+    def __init__(self, app_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.build_id = str(uuid.uuid4())
+        self.app_id = app_id
+        self.status = ImageBuildStatusEnum.BUILD_QUEUED
+        self.image: Optional[Image] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.logs: List[str] = []
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in [
+            ImageBuildStatusEnum.BUILD_FINISHED,
+            ImageBuildStatusEnum.BUILD_FAILED,
+        ]
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def notify_threadsafe(self) -> None:
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def log(self, line: str) -> None:
+        """
+        Adds a line to the logs of the build (called from the worker thread).
+        """
+
+        logger.info(line)
+        self.logs.append(line)
+        self.notify_threadsafe()
+
+    async def wait(self) -> None:
+        """
+        Waits until the build is finished.
+        """
+
+        while not self.finished:
+            await self._changed.wait()
+
+    async def follow_logs(self) -> AsyncIterator[str]:
+        """
+        Yields the lines logged by the build, until it is finished.
+        """
+
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.logs):
+                yield self.logs[sent]
+                sent += 1
+            if self.finished:
+                return
+            await changed.wait()
+
+    def to_api(self) -> ImageBuild:
+        return ImageBuild(
+            build_id=self.build_id,
+            app_id=self.app_id,
+            status=self.status,
+            image=self.image,
+            error=self.error,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+        )
+
+
+_image_builds: Dict[str, QueuedImageBuild] = {}
+_image_builds_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_image_builds_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool running the builds, shared by all the requests.
+
+    Its size caps the number of concurrent builds; the builds submitted beyond it
+    wait in the queue of the pool.
+    """
+
+    global _image_builds_executor
+    if _image_builds_executor is None:
+        _image_builds_executor = ThreadPoolExecutor(
+            max_workers=IMAGE_BUILDS_MAX_CONCURRENCY,
+            thread_name_prefix="image-build",
+        )
+    return _image_builds_executor
+
+
+def get_image_build(build_id: str) -> Optional[QueuedImageBuild]:
+    """
+    Returns a build submitted to the build queue, if it is still retained.
+
+    Args:
+        build_id (str): The id of the build.
+
+    Returns:
+        Optional[QueuedImageBuild]: The build, or None if it is unknown.
+    """
+
+    return _image_builds.get(build_id)
+
+
+def _prune_image_builds() -> None:
+    now = datetime.now(timezone.utc)
+    for build_id, build in list(_image_builds.items()):
+        if (
+            build.finished_at is not None
+            and (now - build.finished_at).total_seconds() > IMAGE_BUILDS_RETENTION
+        ):
+            del _image_builds[build_id]
+
+
+async def submit_image_build(
+    app_db: AppDB, base_name: str, tar_file: UploadFile
+) -> QueuedImageBuild:
+    """
+    Saves the build context to disk and queues the build of its image.
+
+    Args:
+        app_db (AppDB): The app the image is built for.
+        base_name (str): The name of the base (variant) of the app.
+        tar_file (UploadFile): The tar file of the build context.
+
+    Returns:
+        QueuedImageBuild: The queued build.
+    """
+
     app_name = app_db.app_name
     user_id = str(app_db.user_id)
-
     image_name = f"agentaai/{app_name.lower()}_{base_name.lower()}:latest"
-    # Get event loop
-    loop = asyncio.get_event_loop()
-
-    # Create a ThreadPoolExecutor for running threads
-    thread_pool = ThreadPoolExecutor(max_workers=4)
 
     # Create a unique temporary directory for each upload
     temp_dir = Path(f"/tmp/{uuid.uuid4()}")
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    # Save uploaded file to the temporary directory
+    # Copy the uploaded file to the temporary directory in chunks, off the event loop
     tar_path = temp_dir / tar_file.filename
-    with tar_path.open("wb") as buffer:
-        buffer.write(await tar_file.read())
-    future = loop.run_in_executor(
-        thread_pool,
-        build_image_job,
-        *(
-            app_name,
-            base_name,
-            tar_path,
-            image_name,
-            temp_dir,
-            user_id,
-        ),
-    )
-    image_result = await asyncio.wrap_future(future)
-    return image_result
+
+    def save_upload():
+        with tar_path.open("wb") as buffer:
+            shutil.copyfileobj(tar_file.file, buffer, IMAGE_BUILDS_UPLOAD_CHUNK_SIZE)
+
+    await asyncio.to_thread(save_upload)
+
+    _prune_image_builds()
+    build = QueuedImageBuild(app_id=str(app_db.id), loop=asyncio.get_running_loop())
+    _image_builds[build.build_id] = build
+
+    def run_build():
+        build.status = ImageBuildStatusEnum.BUILD_STARTED
+        build.notify_threadsafe()
+        try:
+            build.image = build_image_job(
+                app_name,
+                base_name,
+                tar_path,
+                image_name,
+                temp_dir,
+                user_id,
+                log=build.log,
+            )
+            build.status = ImageBuildStatusEnum.BUILD_FINISHED
+        except Exception as ex:  # pylint: disable=broad-except
+            build.error = ex.detail if isinstance(ex, HTTPException) else str(ex)
+            build.status = ImageBuildStatusEnum.BUILD_FAILED
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            build.finished_at = datetime.now(timezone.utc)
+            build.notify_threadsafe()
+
+    get_image_builds_executor().submit(run_build)
+    return build
+
+
+async def build_image(app_db: AppDB, base_name: str, tar_file: UploadFile) -> Image:
+    """
+    Builds the image of an app from a tar file, waiting for its turn in the build queue.
+
+    Raises:
+        HTTPException: If the build failed.
+    """
+
+    build = await submit_image_build(app_db, base_name, tar_file)
+    await build.wait()
+    if build.image is None:
+        raise HTTPException(status_code=500, detail=build.error)
+    return build.image
 
 
 def build_image_job(
@@ -70,11 +250,10 @@ def build_image_job(
     image_name: str,
     temp_dir: Path,
     user_id: str,
+    log: Callable[[str], None] = logger.info,
 ) -> Image:
     """Business logic for building a docker image from a tar file
 
-    TODO: This should be a background task
-
     Arguments:
         app_name --  The `app_name` parameter is a string that represents the name of the application
         base_name --  The `base_name` parameter is a string that represents the variant of the \
@@ -87,6 +266,7 @@ def build_image_job(
         temp_dir --  The `temp_dir` parameter is a `Path` object that represents the temporary directory
             where the contents of the tar file will be extracted
         user_id -- The id of the user that owns the app
+        log -- Called with each line of the build logs, as they are produced
 
     Raises:
         HTTPException: _description_
@@ -105,17 +285,24 @@ def build_image_job(
         else:
             dockerfile = "Dockerfile"
 
-        image, build_log = client.images.build(
+        build_log = []
+        for chunk in client.api.build(
             path=str(temp_dir),
             tag=image_name,
             buildargs={"ROOT_PATH": f"/{user_id}/{app_name}/{base_name}"},
             rm=True,
             dockerfile=dockerfile,
             pull=True,
-        )
-        for line in build_log:
-            logger.info(line)
-
+            decode=True,
+        ):
+            build_log.append(chunk)
+            if "error" in chunk:
+                raise docker.errors.BuildError(chunk["error"], build_log)
+            line = chunk.get("stream", chunk.get("status", "")).rstrip("\n")
+            if line:
+                log(line)
+
+        image = client.images.get(image_name)
         pydantic_image = Image(
             type="image",
             docker_id=image.id,
@@ -125,9 +312,9 @@ def build_image_job(
         return pydantic_image
 
     except docker.errors.BuildError as ex:
-        log = "Error building Docker image:\n"
-        log += str(ex) + "\n"
-        logger.error(log)
+        log_message = "Error building Docker image:\n"
+        log_message += str(ex) + "\n"
+        logger.error(log_message)
         raise HTTPException(status_code=500, detail=str(ex))
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
@@ -196,10 +383,10 @@ async def get_image_details_from_docker_hub(
         return image_details["Id"]
 
 
-def restart_container(container_id: str):
+async def restart_container(container_id: str):
     """Restart docker container.
 
     Args:
         container_id (str): The id of the container to restart.
     """
-    docker_utils.restart_container(container_id)
+    await docker_runtime.restart_container(container_id)
@@ -3,20 +3,23 @@ import uuid
 import logging
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
+from uuid_utils.compat import uuid7
 
 from agenta_backend.models import converters
 from agenta_backend.utils.common import isCloudEE
+from agenta_backend.services import configs_cache, ids_mapping_cache
 from agenta_backend.models.db.postgres_engine import db_engine
 from agenta_backend.services.json_importer_helper import get_json
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, any_, insert, delete, true, column, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID, array
 from sqlalchemy.future import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, aliased, load_only
+from sqlalchemy.orm import joinedload, selectinload, aliased, load_only
 
 if isCloudEE():
     from agenta_backend.commons.services import db_manager_ee
@@ -64,6 +67,7 @@ else:
 from agenta_backend.models.db_models import (
     TemplateDB,
     IDsMappingDB,
+    TestSetRowDB,
     AppVariantRevisionsDB,
     HumanEvaluationVariantDB,
     EvaluationScenarioResultDB,
@@ -76,6 +80,7 @@ from agenta_backend.models.shared_models import (
     ConfigDB,
     TemplateType,
     CorrectAnswer,
+    TestsetStorageMode,
     AggregatedResult,
     EvaluationScenarioResult,
     EvaluationScenarioInput,
@@ -91,6 +96,22 @@ logger.setLevel(logging.DEBUG)
 # Define parent directory
 PARENT_DIRECTORY = Path(os.path.dirname(__file__)).parent
 
+# Testsets with at least this many rows are stored one row per record in the
+# testset_rows table instead of a single JSONB document
+TESTSET_ROWS_STORAGE_THRESHOLD = int(
+    os.environ.get("AGENTA_TESTSET_ROWS_STORAGE_THRESHOLD", "10000")
+)
+TESTSET_ROWS_INSERT_BATCH_SIZE = 1000
+
+# The evaluation scenario columns that can be left out when fetching evaluation scenarios
+EVALUATION_SCENARIO_PROJECTABLE_COLUMNS = [
+    "inputs",
+    "outputs",
+    "correct_answers",
+    "is_pinned",
+    "note",
+]
+
 
 async def add_testset_to_app_variant(
     app_id: str,
@@ -794,6 +815,87 @@ async def list_variants_for_base(base: VariantBaseDB):
         return app_variants
 
 
+async def fetch_config_by_environment(
+    base_id: str, environment_name: str
+) -> Optional[Tuple[AppEnvironmentDB, Optional[AppVariantRevisionsDB]]]:
+    """
+    Fetches an environment of the app of a base with the variant revision it deploys, in one query.
+
+    Args:
+        base_id (str): The ID of the base.
+        environment_name (str): The name of the environment.
+
+    Returns:
+        Optional[Tuple[AppEnvironmentDB, Optional[AppVariantRevisionsDB]]]: The environment and
+            its deployed variant revision (None if nothing is deployed), or None if the base or
+            the environment was not found.
+    """
+
+    base_uuid = await get_object_uuid(object_id=base_id, table_name="bases")
+    app_id = (
+        select(VariantBaseDB.app_id)
+        .filter_by(id=uuid.UUID(base_uuid))
+        .scalar_subquery()
+    )
+    async with db_engine.get_session() as session:
+        result = await session.execute(
+            select(AppEnvironmentDB, AppVariantRevisionsDB)
+            .outerjoin(
+                AppVariantRevisionsDB,
+                AppEnvironmentDB.deployed_app_variant_revision_id
+                == AppVariantRevisionsDB.id,
+            )
+            .options(
+                load_only(AppEnvironmentDB.app_id, AppEnvironmentDB.name),  # type: ignore
+                load_only(
+                    AppVariantRevisionsDB.base_id,  # type: ignore
+                    AppVariantRevisionsDB.revision,  # type: ignore
+                    AppVariantRevisionsDB.config_name,  # type: ignore
+                    AppVariantRevisionsDB.config_parameters,  # type: ignore
+                ),
+            )
+            .where(
+                AppEnvironmentDB.app_id == app_id,
+                AppEnvironmentDB.name == environment_name,
+            )
+        )
+        row = result.first()
+        return (row[0], row[1]) if row is not None else None
+
+
+async def fetch_config_by_config_name(
+    base_id: str, config_name: str
+) -> Optional[AppVariantDB]:
+    """
+    Fetches the variant of a base with the given config name, in one query.
+
+    Args:
+        base_id (str): The ID of the base.
+        config_name (str): The name of the configuration.
+
+    Returns:
+        Optional[AppVariantDB]: The variant, or None if it was not found.
+    """
+
+    base_uuid = await get_object_uuid(object_id=base_id, table_name="bases")
+    async with db_engine.get_session() as session:
+        result = await session.execute(
+            select(AppVariantDB)
+            .options(
+                load_only(
+                    AppVariantDB.app_id,  # type: ignore
+                    AppVariantDB.revision,  # type: ignore
+                    AppVariantDB.config_name,  # type: ignore
+                    AppVariantDB.config_parameters,  # type: ignore
+                )
+            )
+            .filter_by(base_id=uuid.UUID(base_uuid), config_name=config_name)
+            .order_by(AppVariantDB.variant_name.asc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+
 async def get_user(user_uid: str) -> UserDB:
     """Get the user object from the database.
 
@@ -1247,6 +1349,8 @@ async def remove_app_variant_from_db(app_variant_db: AppVariantDB):
         await session.delete(app_variant_db)
         await session.commit()
 
+    configs_cache.get_configs_cache().invalidate(app_id=str(app_variant_db.app_id))
+
 
 async def deploy_to_environment(
     environment_name: str, variant_id: str, **user_org_data
@@ -1307,6 +1411,8 @@ async def deploy_to_environment(
 
         await session.commit()
 
+    configs_cache.get_configs_cache().invalidate(app_id=str(app_variant_db.app_id))
+
 
 async def fetch_app_environment_by_name_and_appid(
     app_id: str, environment_name: str, **kwargs: dict
@@ -1445,6 +1551,8 @@ async def update_app_environment_deployed_variant_revision(
         await session.commit()
         await session.refresh(app_environment)
 
+    configs_cache.get_configs_cache().invalidate(app_id=str(app_environment.app_id))
+
 
 async def list_environments(app_id: str, **kwargs: dict):
     """
@@ -1832,6 +1940,8 @@ async def update_variant_parameters(
         session.add(variant_revision)
         await session.commit()
 
+    configs_cache.get_configs_cache().invalidate(app_id=str(app_variant_db.app_id))
+
 
 async def get_app_variant_instance_by_id(variant_id: str) -> AppVariantDB:
     """Get the app variant object from the database with the provided id.
@@ -1893,18 +2003,141 @@ async def create_testset(app: AppDB, user_uid: str, testset_data: Dict[str, Any]
 
     user = await get_user(user_uid=user_uid)
     async with db_engine.get_session() as session:
-        testset_db = TestSetDB(**testset_data, app_id=app.id, user_id=user.id)
+        testset_data = dict(testset_data)
+        csvdata = testset_data.pop("csvdata", None) or []
+        storage_mode = get_testset_storage_mode(csvdata)
+
+        testset_db = TestSetDB(
+            **testset_data,
+            csvdata=csvdata if storage_mode == TestsetStorageMode.JSON else None,
+            storage_mode=storage_mode.value,
+            app_id=app.id,
+            user_id=user.id,
+        )
         if isCloudEE():
             testset_db.organization_id = app.organization_id
             testset_db.workspace_id = app.workspace_id
 
         session.add(testset_db)
+        if storage_mode == TestsetStorageMode.ROWS:
+            await session.flush()
+            await _insert_testset_rows(session, testset_db.id, csvdata)
+
         await session.commit()
         await session.refresh(testset_db)
 
         return testset_db
 
 
+async def create_testset_from_rows(
+    app: AppDB, user_uid: str, name: str, rows: AsyncIterable[Dict[str, Any]]
+) -> Tuple[TestSetDB, int]:
+    """
+    Creates a testset from streamed rows, without holding large testsets in memory.
+
+    Rows are buffered until the testset reaches TESTSET_ROWS_STORAGE_THRESHOLD rows, at
+    which point it is stored in rows mode and the rows are written in batches as they
+    arrive. Everything is written in a single transaction, so that a failure while
+    reading the rows leaves no partial testset behind.
+
+    Args:
+        app (AppDB): The app object
+        user_uid (str): The user uID
+        name (str): The name of the testset
+        rows (AsyncIterable[Dict[str, Any]]): The rows of the testset
+
+    Returns:
+        Tuple[TestSetDB, int]: The newly created testset and its number of rows
+    """
+
+    user = await get_user(user_uid=user_uid)
+    async with db_engine.get_session() as session:
+        testset_db = TestSetDB(name=name, app_id=app.id, user_id=user.id)
+        if isCloudEE():
+            testset_db.organization_id = app.organization_id
+            testset_db.workspace_id = app.workspace_id
+
+        buffered_rows: List[Dict[str, Any]] = []
+        rows_count = 0
+        async for row in rows:
+            buffered_rows.append(row)
+            if rows_count + len(buffered_rows) < TESTSET_ROWS_STORAGE_THRESHOLD:
+                continue
+
+            if testset_db.storage_mode is None:
+                testset_db.storage_mode = TestsetStorageMode.ROWS.value
+                session.add(testset_db)
+                await session.flush()
+            if len(buffered_rows) >= TESTSET_ROWS_INSERT_BATCH_SIZE:
+                await _insert_testset_rows(
+                    session, testset_db.id, buffered_rows, start=rows_count
+                )
+                rows_count += len(buffered_rows)
+                buffered_rows = []
+
+        if testset_db.storage_mode is None:
+            testset_db.storage_mode = TestsetStorageMode.JSON.value
+            testset_db.csvdata = buffered_rows
+            session.add(testset_db)
+        else:
+            await _insert_testset_rows(
+                session, testset_db.id, buffered_rows, start=rows_count
+            )
+        rows_count += len(buffered_rows)
+
+        await session.commit()
+        await session.refresh(testset_db)
+
+        return testset_db, rows_count
+
+
+def get_testset_storage_mode(csvdata: List[Dict[str, Any]]) -> TestsetStorageMode:
+    """
+    Chooses how a testset with the given rows is stored.
+
+    Args:
+        csvdata (List[Dict[str, Any]]): The rows of the testset
+
+    Returns:
+        TestsetStorageMode: "rows" for large testsets, "json" otherwise
+    """
+
+    if len(csvdata) >= TESTSET_ROWS_STORAGE_THRESHOLD:
+        return TestsetStorageMode.ROWS
+    return TestsetStorageMode.JSON
+
+
+async def _insert_testset_rows(
+    session: AsyncSession,
+    testset_id: uuid.UUID,
+    rows: List[Dict[str, Any]],
+    start: int = 0,
+) -> None:
+    """
+    Bulk inserts the rows of a testset in batches, without committing.
+
+    Args:
+        session (AsyncSession): The session to insert the rows with
+        testset_id (uuid.UUID): The ID of the testset
+        rows (List[Dict[str, Any]]): The rows to insert
+        start (int): The ordinal of the first row
+    """
+
+    for offset in range(0, len(rows), TESTSET_ROWS_INSERT_BATCH_SIZE):
+        batch = rows[offset : offset + TESTSET_ROWS_INSERT_BATCH_SIZE]
+        await session.execute(
+            insert(TestSetRowDB),
+            [
+                {
+                    "testset_id": testset_id,
+                    "ordinal": start + offset + index,
+                    "data": row,
+                }
+                for index, row in enumerate(batch)
+            ],
+        )
+
+
 async def update_testset(testset_id: str, values_to_update: dict) -> None:
     """Update a testset.
 
@@ -1919,6 +2152,23 @@ async def update_testset(testset_id: str, values_to_update: dict) -> None:
         )
         testset = result.scalars().first()
 
+        values_to_update = dict(values_to_update)
+        if "csvdata" in values_to_update:
+            csvdata = values_to_update.pop("csvdata") or []
+            storage_mode = get_testset_storage_mode(csvdata)
+
+            if testset.storage_mode == TestsetStorageMode.ROWS.value:
+                await session.execute(
+                    delete(TestSetRowDB).where(TestSetRowDB.testset_id == testset.id)
+                )
+            if storage_mode == TestsetStorageMode.ROWS:
+                await _insert_testset_rows(session, testset.id, csvdata)
+
+            testset.csvdata = (
+                csvdata if storage_mode == TestsetStorageMode.JSON else None
+            )
+            testset.storage_mode = storage_mode.value
+
         # Validate keys in values_to_update and update attributes
         valid_keys = [key for key in values_to_update.keys() if hasattr(testset, key)]
         for key in valid_keys:
@@ -1928,6 +2178,112 @@ async def update_testset(testset_id: str, values_to_update: dict) -> None:
         await session.refresh(testset)
 
 
+async def fetch_testset_rows(
+    testset_id: str,
+    after: int = -1,
+    limit: int = 100,
+    columns: Optional[List[str]] = None,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Fetches a page of the rows of a testset, whatever its storage mode.
+
+    The rows are paginated by their position in the testset (keyset pagination); for
+    testsets stored in rows mode, a page is read from the (testset_id, ordinal) index
+    without scanning the preceding rows.
+
+    Args:
+        testset_id (str): The ID of the testset
+        after (int): The position of the last row of the previous page (-1 to start)
+        limit (int): The maximum number of rows to fetch
+        columns (Optional[List[str]]): The columns to keep in each row (all if None)
+
+    Returns:
+        List[Tuple[int, Dict[str, Any]]]: The (position, row) pairs of the page
+    """
+
+    testset_uuid = uuid.UUID(testset_id)
+    async with db_engine.get_session() as session:
+        result = await session.execute(
+            select(TestSetDB.storage_mode).filter_by(id=testset_uuid)
+        )
+        storage_mode = result.scalar_one_or_none()
+        if storage_mode is None:
+            raise NoResultFound(f"Testset with id {testset_id} not found")
+
+        if storage_mode == TestsetStorageMode.ROWS.value:
+            ordinal, data = TestSetRowDB.ordinal, TestSetRowDB.data
+            query = select(ordinal, data).where(TestSetRowDB.testset_id == testset_uuid)
+        else:
+            elements = (
+                func.jsonb_array_elements(TestSetDB.csvdata)
+                .table_valued(column("value", JSONB), with_ordinality="ordinality")
+                .render_derived()
+            )
+            ordinal, data = elements.c.ordinality - 1, elements.c.value
+            query = (
+                select(ordinal, data)
+                .select_from(TestSetDB)
+                .join(elements, true())
+                .where(TestSetDB.id == testset_uuid)
+            )
+
+        if columns:
+            data = func.jsonb_build_object(
+                *[item for name in columns for item in (name, data[name])]
+            )
+            query = query.with_only_columns(ordinal, data)
+
+        result = await session.execute(
+            query.where(ordinal > after).order_by(ordinal).limit(limit)
+        )
+        return [(position, row) for position, row in result.all()]
+
+
+async def iterate_testset_rows(
+    testset_id: str, page_size: int = 1000, columns: Optional[List[str]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterates over the rows of a testset, fetching them page by page.
+
+    Args:
+        testset_id (str): The ID of the testset
+        page_size (int): The number of rows to fetch per query
+        columns (Optional[List[str]]): The columns to keep in each row (all if None)
+
+    Yields:
+        Dict[str, Any]: The rows of the testset, in order
+    """
+
+    after = -1
+    while True:
+        page = await fetch_testset_rows(
+            testset_id, after=after, limit=page_size, columns=columns
+        )
+        for _, row in page:
+            yield row
+
+        if len(page) < page_size:
+            return
+        after = page[-1][0]
+
+
+async def fetch_testset_csvdata(testset: TestSetDB) -> List[Dict[str, Any]]:
+    """
+    Returns all the rows of a testset, assembling them for testsets stored in rows mode.
+
+    Args:
+        testset (TestSetDB): The testset
+
+    Returns:
+        List[Dict[str, Any]]: The rows of the testset
+    """
+
+    if testset.storage_mode != TestsetStorageMode.ROWS.value:
+        return testset.csvdata or []
+
+    return [row async for row in iterate_testset_rows(str(testset.id))]
+
+
 async def fetch_testsets_by_app_id(app_id: str):
     """Fetches all testsets for a given app.
     Args:
@@ -2089,6 +2445,53 @@ async def fetch_human_evaluation_variants(human_evaluation_id: str):
         return evaluation_variants
 
 
+async def fetch_human_evaluations_variants(
+    human_evaluations_ids: List[str],
+) -> Dict[str, List[HumanEvaluationVariantDB]]:
+    """
+    Fetches the variants of several human evaluations, in a fixed number of queries.
+
+    Args:
+        human_evaluations_ids (List[str]): The human evaluation IDs
+
+    Returns:
+        The human evaluation variants, by human evaluation ID.
+    """
+
+    evaluations_variants: Dict[str, List[HumanEvaluationVariantDB]] = {
+        human_evaluation_id: [] for human_evaluation_id in human_evaluations_ids
+    }
+    if not human_evaluations_ids:
+        return evaluations_variants
+
+    async with db_engine.get_session() as session:
+        base_query = select(HumanEvaluationVariantDB).filter(
+            HumanEvaluationVariantDB.human_evaluation_id.in_(
+                [uuid.UUID(evaluation_id) for evaluation_id in human_evaluations_ids]
+            )
+        )
+        if isCloudEE():
+            query = base_query.options(
+                selectinload(HumanEvaluationVariantDB.variant.of_type(AppVariantDB)).load_only(AppVariantDB.id, AppVariantDB.variant_name),  # type: ignore
+                selectinload(HumanEvaluationVariantDB.variant_revision.of_type(AppVariantRevisionsDB)).load_only(AppVariantRevisionsDB.id, AppVariantRevisionsDB.revision),  # type: ignore
+            )
+        else:
+            query = base_query.options(
+                selectinload(HumanEvaluationVariantDB.variant).load_only(
+                    AppVariantDB.id, AppVariantDB.variant_name
+                ),  # type: ignore
+                selectinload(HumanEvaluationVariantDB.variant_revision).load_only(
+                    AppVariantRevisionsDB.revision, AppVariantRevisionsDB.id
+                ),  # type: ignore
+            )
+        result = await session.execute(query)
+        for evaluation_variant in result.scalars().all():
+            evaluations_variants[str(evaluation_variant.human_evaluation_id)].append(
+                evaluation_variant
+            )
+        return evaluations_variants
+
+
 async def create_human_evaluation_variants(
     human_evaluation_id: str, variants_ids: List[str]
 ):
@@ -2295,25 +2698,201 @@ async def fetch_human_evaluation_scenarios(evaluation_id: str):
         return evaluation_scenarios
 
 
-async def fetch_evaluation_scenarios(evaluation_id: str):
+async def fetch_evaluation_scenarios(
+    evaluation_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    evaluator_config_id: Optional[str] = None,
+    result_value: Optional[str] = None,
+    has_error: Optional[bool] = None,
+):
     """
     Fetches evaluation scenarios.
 
+    Scenarios are ordered by ID (time-ordered), which makes the ID of the last scenario
+    of a page the cursor of the next page.
+
     Args:
         evaluation_id (str):  The evaluation identifier
+        cursor (str, optional): Only fetch the scenarios after this scenario ID
+        limit (int, optional): The maximum number of scenarios to fetch
+        fields (List[str], optional): The scenario fields to load (all if None), \
+            e.g. to skip the inputs and outputs
+        evaluator_config_id (str, optional): Only fetch the scenarios evaluated by this evaluator config
+        result_value (str, optional): Only fetch the scenarios whose result for \
+            evaluator_config_id has this value (e.g. "true" or "0.5")
+        has_error (bool, optional): Only fetch the scenarios with (or without) an app \
+            or evaluator error
 
     Returns:
         The evaluation scenarios.
     """
 
+    query = (
+        select(EvaluationScenarioDB)
+        .filter_by(evaluation_id=uuid.UUID(evaluation_id))
+        .order_by(EvaluationScenarioDB.id)
+    )
+
+    if fields is not None:
+        columns = [
+            getattr(EvaluationScenarioDB, field)
+            for field in fields
+            if field in EVALUATION_SCENARIO_PROJECTABLE_COLUMNS
+        ]
+        query = query.options(
+            load_only(
+                EvaluationScenarioDB.id, EvaluationScenarioDB.evaluation_id, *columns
+            )
+        )
+    if fields is None or "results" in fields:
+        query = query.options(selectinload(EvaluationScenarioDB.results))
+
+    if cursor is not None:
+        query = query.where(EvaluationScenarioDB.id > uuid.UUID(cursor))
+
+    if evaluator_config_id is not None:
+        result_conditions = [
+            EvaluationScenarioResultDB.evaluation_scenario_id
+            == EvaluationScenarioDB.id,
+            EvaluationScenarioResultDB.evaluator_config_id
+            == uuid.UUID(evaluator_config_id),
+        ]
+        if result_value is not None:
+            result_conditions.append(
+                EvaluationScenarioResultDB.result["value"].astext == result_value
+            )
+        query = query.where(
+            select(EvaluationScenarioResultDB.id).where(*result_conditions).exists()
+        )
+
+    if has_error is not None:
+        error_condition = or_(
+            EvaluationScenarioDB.outputs.contains([{"result": {"type": "error"}}]),
+            select(EvaluationScenarioResultDB.id)
+            .where(
+                EvaluationScenarioResultDB.evaluation_scenario_id
+                == EvaluationScenarioDB.id,
+                EvaluationScenarioResultDB.result["type"].astext == "error",
+            )
+            .exists(),
+        )
+        query = query.where(error_condition if has_error else ~error_condition)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    async with db_engine.get_session() as session:
+        result = await session.execute(query)
+        evaluation_scenarios = result.scalars().all()
+        return evaluation_scenarios
+
+
+async def fetch_evaluation_scenarios_ids_by_input(
+    evaluations_ids: List[str],
+    inputs: List[Tuple[str, Any]],
+) -> List[Tuple[str, Any, str]]:
+    """
+    Fetches the IDs of the scenarios of evaluations having each of the given inputs.
+
+    The inputs are matched in SQL, by joining the inputs JSONB of the scenarios with the
+    given (input_name, input_value) pairs, so that only the matched scenarios are loaded.
+
+    Args:
+        evaluations_ids (List[str]): The IDs of the evaluations
+        inputs (List[Tuple[str, Any]]): The (input_name, input_value) pairs to match
+
+    Returns:
+        List[Tuple[str, Any, str]]: The (input_name, input_value, scenario_id) rows of the \
+            matched inputs, ordered by evaluation (in the given order) and by scenario.
+    """
+
+    evaluations_uuids = [uuid.UUID(evaluation_id) for evaluation_id in evaluations_ids]
+    scenario_inputs = (
+        func.jsonb_array_elements(EvaluationScenarioDB.inputs)
+        .table_valued(column("value", JSONB))
+        .render_derived(name="scenario_inputs")
+    )
+    matched_inputs = (
+        func.jsonb_array_elements(
+            bindparam(
+                "inputs",
+                [{"name": name, "value": value} for name, value in inputs],
+                type_=JSONB,
+            )
+        )
+        .table_valued(column("value", JSONB))
+        .render_derived(name="matched_inputs")
+    )
+    query = (
+        select(
+            scenario_inputs.c.value["name"].astext,
+            scenario_inputs.c.value["value"],
+            EvaluationScenarioDB.id,
+        )
+        .select_from(EvaluationScenarioDB)
+        .join(scenario_inputs, true())
+        .join(
+            matched_inputs,
+            matched_inputs.c.value
+            == func.jsonb_build_object(
+                "name",
+                scenario_inputs.c.value["name"],
+                "value",
+                scenario_inputs.c.value["value"],
+            ),
+        )
+        .where(EvaluationScenarioDB.evaluation_id.in_(evaluations_uuids))
+        .order_by(
+            func.array_position(
+                array(evaluations_uuids), EvaluationScenarioDB.evaluation_id
+            ),
+            EvaluationScenarioDB.id,
+        )
+    )
+
+    async with db_engine.get_session() as session:
+        result = await session.execute(query)
+        return [
+            (input_name, input_value, str(scenario_id))
+            for input_name, input_value, scenario_id in result.all()
+        ]
+
+
+async def fetch_evaluation_scenarios_by_ids(
+    evaluation_scenarios_ids: List[str],
+) -> List[EvaluationScenarioDB]:
+    """
+    Fetches evaluation scenarios, with their results, by ID.
+
+    Args:
+        evaluation_scenarios_ids (List[str]): The IDs of the evaluation scenarios
+
+    Returns:
+        List[EvaluationScenarioDB]: The evaluation scenarios, ordered by ID.
+    """
+
     async with db_engine.get_session() as session:
         result = await session.execute(
             select(EvaluationScenarioDB)
-            .filter_by(evaluation_id=uuid.UUID(evaluation_id))
-            .options(joinedload(EvaluationScenarioDB.results))
+            .where(
+                EvaluationScenarioDB.id
+                == any_(
+                    bindparam(
+                        "ids",
+                        [
+                            uuid.UUID(scenario_id)
+                            for scenario_id in evaluation_scenarios_ids
+                        ],
+                        type_=ARRAY(UUID(as_uuid=True)),
+                    )
+                )
+            )
+            .options(selectinload(EvaluationScenarioDB.results))
+            .order_by(EvaluationScenarioDB.id)
         )
-        evaluation_scenarios = result.unique().scalars().all()
-        return evaluation_scenarios
+        return result.scalars().all()
 
 
 async def fetch_evaluation_scenario_by_id(
@@ -2869,8 +3448,7 @@ async def create_new_evaluation_scenario(
             evaluation_scenario.workspace_id = workspace  # type: ignore
 
         session.add(evaluation_scenario)
-        await session.commit()
-        await session.refresh(evaluation_scenario)
+        await session.flush()  # assigns the evaluation scenario id
 
         # create evaluation scenario result
         for result in results:
@@ -2882,12 +3460,106 @@ async def create_new_evaluation_scenario(
 
             session.add(evaluation_scenario_result)
 
-        await session.commit()  # ensures that scenario results insertion is committed
+        await session.commit()  # commits the scenario and its results together
         await session.refresh(evaluation_scenario)
 
         return evaluation_scenario
 
 
+async def create_new_evaluation_scenarios(
+    user_id: str,
+    evaluation_id: str,
+    variant_id: str,
+    evaluation_scenarios: List[Dict[str, Any]],
+    organization=None,
+    workspace=None,
+) -> List[str]:
+    """Create many evaluation scenarios and their results in a single transaction.
+
+    The scenarios and their results are each inserted with one multi-row
+    INSERT ... RETURNING statement.
+
+    Args:
+        user_id (str): The ID of the user
+        evaluation_id (str): The ID of the evaluation
+        variant_id (str): The ID of the app variant
+        evaluation_scenarios (List[Dict[str, Any]]): The scenarios to create. Each scenario \
+            has the inputs, outputs, correct_answers, is_pinned, note and results \
+            arguments of `create_new_evaluation_scenario`.
+        organization (str, optional): The ID of the organization
+        workspace (str, optional): The ID of the workspace
+
+    Returns:
+        List[str]: The IDs of the created evaluation scenarios, in the same order.
+    """
+
+    if not evaluation_scenarios:
+        return []
+
+    if isCloudEE():
+        # assert that if organization is provided, workspace is also provided, and vice versa
+        assert (
+            organization is not None and workspace is not None
+        ), "organization and workspace must be provided together"
+
+    # Scenarios are fetched by ID (see `fetch_evaluation_scenarios`), so their IDs are
+    # generated in input order: UUIDv7s generated within the same millisecond are not
+    scenarios_ids = sorted(uuid7() for _ in evaluation_scenarios)
+    scenarios_values = []
+    for scenario_id, evaluation_scenario in zip(scenarios_ids, evaluation_scenarios):
+        correct_answers = evaluation_scenario.get("correct_answers")
+        scenario_values = {
+            "id": scenario_id,
+            "user_id": uuid.UUID(user_id),
+            "evaluation_id": uuid.UUID(evaluation_id),
+            "variant_id": uuid.UUID(variant_id),
+            "inputs": [input.dict() for input in evaluation_scenario["inputs"]],
+            "outputs": [output.dict() for output in evaluation_scenario["outputs"]],
+            "correct_answers": (
+                [correct_answer.dict() for correct_answer in correct_answers]
+                if correct_answers is not None
+                else []
+            ),
+            "is_pinned": evaluation_scenario.get("is_pinned"),
+            "note": evaluation_scenario.get("note"),
+        }
+        if isCloudEE():
+            scenario_values["organization_id"] = organization
+            scenario_values["workspace_id"] = workspace
+
+        scenarios_values.append(scenario_values)
+
+    async with db_engine.get_session() as session:
+        result = await session.execute(
+            insert(EvaluationScenarioDB).returning(
+                EvaluationScenarioDB.id, sort_by_parameter_order=True
+            ),
+            scenarios_values,
+        )
+        evaluation_scenarios_ids = result.scalars().all()
+
+        results_values = [
+            {
+                "evaluation_scenario_id": evaluation_scenario_id,
+                "evaluator_config_id": uuid.UUID(result.evaluator_config),
+                "result": result.result.dict(),
+            }
+            for evaluation_scenario_id, evaluation_scenario in zip(
+                evaluation_scenarios_ids, evaluation_scenarios
+            )
+            for result in evaluation_scenario["results"]
+        ]
+        if results_values:
+            await session.execute(insert(EvaluationScenarioResultDB), results_values)
+
+        await session.commit()
+
+        return [
+            str(evaluation_scenario_id)
+            for evaluation_scenario_id in evaluation_scenarios_ids
+        ]
+
+
 async def update_evaluation_with_aggregated_results(
     evaluation_id: str, aggregated_results: List[AggregatedResult]
 ):
@@ -3170,6 +3842,9 @@ async def get_object_uuid(object_id: str, table_name: str) -> str:
     UUID from the specified table. If the object_id is not a valid ObjectId, it is assumed
     to be a PostgreSQL UUID and returned as is.
 
+    The UUIDs of ObjectIds are cached (see `ids_mapping_cache`), so that only the
+    first lookup of a legacy id queries the database.
+
     Args:
         object_id (str): The ID of the object, which could be a MongoDB ObjectId or a PostgreSQL UUID.
         table_name (str): The name of the table to fetch the UUID from.
@@ -3182,23 +3857,53 @@ async def get_object_uuid(object_id: str, table_name: str) -> str:
 
     """
 
-    from bson import ObjectId
-    from bson.errors import InvalidId
+    return (await get_objects_uuids(object_ids=[object_id], table_name=table_name))[0]
 
-    try:
-        # Ensure the object_id is a valid MongoDB ObjectId
-        if isinstance(ObjectId(object_id), ObjectId):
-            object_uuid_as_str = await fetch_corresponding_object_uuid(
-                table_name=table_name, object_id=object_id
-            )
-    except InvalidId:
-        # Use the object_id directly if it is not a valid MongoDB ObjectId
-        object_uuid_as_str = object_id
 
-    assert (
-        object_uuid_as_str is not None
-    ), f"{table_name} Object UUID cannot be none. Is the object_id {object_id} a valid MongoDB ObjectId?"
-    return object_uuid_as_str
+async def get_objects_uuids(object_ids: List[str], table_name: str) -> List[str]:
+    """
+    Resolves a list of ids that could be MongoDB ObjectIds or PostgreSQL UUIDs, with
+    at most one query for the ObjectIds missing from the cache.
+
+    Args:
+        object_ids (List[str]): The IDs of the objects.
+        table_name (str): The name of the table to fetch the UUIDs from.
+
+    Returns:
+        List[str]: The corresponding object UUIDs, in the same order.
+
+    Raises:
+        AssertionError: If an ObjectId has no corresponding UUID.
+    """
+
+    legacy_ids = list(
+        {
+            object_id
+            for object_id in object_ids
+            if ids_mapping_cache.is_object_id(object_id)
+        }
+    )
+    if not legacy_ids:
+        # Use the object_ids directly if they are not valid MongoDB ObjectIds
+        return list(object_ids)
+
+    cache = ids_mapping_cache.get_ids_mapping_cache()
+    object_uuids = await cache.get_many(table_name, legacy_ids)
+    missing_ids = [
+        object_id for object_id in legacy_ids if object_id not in object_uuids
+    ]
+    if missing_ids:
+        fetched_uuids = await fetch_corresponding_objects_uuids(
+            table_name=table_name, object_ids=missing_ids
+        )
+        await cache.set_many(table_name, fetched_uuids)
+        object_uuids.update(fetched_uuids)
+
+    for object_id in legacy_ids:
+        assert (
+            object_uuids.get(object_id) is not None
+        ), f"{table_name} Object UUID cannot be none. Is the object_id {object_id} a valid MongoDB ObjectId?"
+    return [object_uuids.get(object_id, object_id) for object_id in object_ids]
 
 
 async def fetch_corresponding_object_uuid(table_name: str, object_id: str) -> str:
@@ -3219,3 +3924,27 @@ async def fetch_corresponding_object_uuid(table_name: str, object_id: str) -> st
         )
         object_mapping = result.scalars().first()
         return str(object_mapping.uuid)
+
+
+async def fetch_corresponding_objects_uuids(
+    table_name: str, object_ids: List[str]
+) -> Dict[str, str]:
+    """
+    Fetches the corresponding uuids of several objects.
+
+    Args:
+        table_name (str):  The table name
+        object_ids (List[str]):   The object identifiers
+
+    Returns:
+        The corresponding object uuids as strings, by object identifier (missing ones are left out).
+    """
+
+    async with db_engine.get_session() as session:
+        result = await session.execute(
+            select(IDsMappingDB.objectid, IDsMappingDB.uuid).filter(
+                IDsMappingDB.table_name == table_name,
+                IDsMappingDB.objectid.in_(object_ids),
+            )
+        )
+        return {objectid: str(object_uuid) for objectid, object_uuid in result.all()}
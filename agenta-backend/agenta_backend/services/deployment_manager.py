@@ -5,7 +5,7 @@ from typing import Dict, Optional
 from agenta_backend.utils.common import isCloudEE
 from agenta_backend.models.api.api_models import Image
 from agenta_backend.models.db_models import AppVariantDB, DeploymentDB
-from agenta_backend.services import db_manager, docker_utils
+from agenta_backend.services import db_manager, docker_runtime
 from docker.errors import DockerException
 
 logger = logging.getLogger(__name__)
@@ -42,7 +42,7 @@ async def start_service(
     logger.debug(f"container_name: {container_name}")
     logger.debug(f"env_vars: {env_vars}")
 
-    results = docker_utils.start_container(
+    results = await docker_runtime.start_container(
         image_name=app_variant_db.image.tags,
         uri_path=uri_path,
         container_name=container_name,
@@ -82,7 +82,7 @@ async def remove_image(image: Image):
     """
     try:
         if not isCloudEE() and image.deletable:
-            docker_utils.delete_image(image.docker_id)
+            await docker_runtime.delete_image(image.docker_id)
         logger.info(f"Image {image.docker_id} deleted")
     except RuntimeError as e:
         logger.error(f"Error deleting image {image.docker_id}: {e}")
@@ -99,7 +99,7 @@ async def stop_service(deployment: DeploymentDB):
     Returns:
         None
     """
-    docker_utils.delete_container(deployment.container_id)
+    await docker_runtime.delete_container(deployment.container_id)
     logger.info(f"Container {deployment.container_id} deleted")
 
 
@@ -115,9 +115,9 @@ async def stop_and_delete_service(deployment: DeploymentDB):
     """
     logger.debug(f"Stopping container {deployment.container_id}")
     container_id = deployment.container_id
-    docker_utils.stop_container(container_id)
+    await docker_runtime.stop_container(container_id)
     logger.info(f"Container {container_id} stopped")
-    docker_utils.delete_container(container_id)
+    await docker_runtime.delete_container(container_id)
     logger.info(f"Container {container_id} deleted")
 
 
@@ -145,7 +145,7 @@ async def validate_image(image: Image) -> bool:
             f"Image should have a tag starting with the registry name ({agenta_registry_repo})\n Image Tags: {image.tags}"
         )
 
-    if image not in docker_utils.list_images():
+    if not await docker_runtime.image_exists(image.docker_id, image.tags):
         raise DockerException(
             f"Image {image.docker_id} with tags {image.tags} not found"
         )
@@ -0,0 +1,484 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional
+
+from aiodocker import Docker, exceptions
+
+from agenta_backend.models.api.api_models import Image, DockerEnvVars
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+agenta_registry_repo = os.getenv("REGISTRY_REPO_NAME")
+
+# How long a started container is given before checking that it did not exit, in seconds
+CONTAINER_START_CHECK_DELAY = float(
+    os.environ.get("AGENTA_CONTAINER_START_CHECK_DELAY", 0.5)
+)
+
+# How long the image index is kept before being rebuilt, in seconds
+DOCKER_IMAGE_INDEX_TTL = float(os.environ.get("AGENTA_DOCKER_IMAGE_INDEX_TTL", 60))
+# Whether the API keeps the image index up to date with the Docker events
+DOCKER_IMAGE_EVENTS_ENABLED = os.environ.get(
+    "AGENTA_DOCKER_IMAGE_EVENTS_ENABLED", "true"
+).lower() in ["true", "1"]
+# How long to wait before subscribing to the Docker events again, in seconds
+DOCKER_IMAGE_EVENTS_RETRY_DELAY = float(
+    os.environ.get("AGENTA_DOCKER_IMAGE_EVENTS_RETRY_DELAY", 1)
+)
+DOCKER_IMAGE_EVENTS_MAX_RETRY_DELAY = float(
+    os.environ.get("AGENTA_DOCKER_IMAGE_EVENTS_MAX_RETRY_DELAY", 60)
+)
+
+# One Docker client (and connection pool) per event loop
+_docker_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Docker]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_docker_client() -> Docker:
+    """
+    Returns the long-lived Docker client of the running event loop.
+
+    Returns:
+        Docker: The asynchronous Docker client.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _docker_clients.get(loop)
+    if client is None or client.session.closed:
+        client = _docker_clients[loop] = Docker()
+    return client
+
+
+async def close_docker_client() -> None:
+    """
+    Closes the Docker client of the running event loop, if it was opened.
+    """
+
+    client = _docker_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def _repo_tags(details: Dict) -> List[str]:
+    return [tag for tag in details.get("RepoTags") or [] if tag != "<none>:<none>"]
+
+
+class ImageIndex:
+    """
+    In-process index of the tagged images of the Docker host, by id and by tag.
+
+    Lookups are dictionary reads. A missing image is looked up directly with
+    `images.inspect` (the Docker equivalent of `images.get`) and added to the index,
+    so that the full image list is only fetched by `list_images`. The index is
+    cleared every `ttl` seconds and, while `watch_image_events` runs, entries are
+    dropped as soon as Docker reports that their image changed.
+    """
+
+    def __init__(self, ttl: float = DOCKER_IMAGE_INDEX_TTL) -> None:
+        self.ttl = ttl
+        self._tags_by_id: Dict[str, List[str]] = {}
+        self._id_by_tag: Dict[str, str] = {}
+        self._complete = False
+        self._expires_at = time.monotonic() + ttl
+
+    def _check_expiry(self) -> None:
+        if time.monotonic() >= self._expires_at:
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Clears the index.
+        """
+
+        self._tags_by_id.clear()
+        self._id_by_tag.clear()
+        self._complete = False
+        self._expires_at = time.monotonic() + self.ttl
+
+    def add(self, docker_id: str, tags: List[str]) -> None:
+        """
+        Adds an image, or replaces its tags.
+        """
+
+        for tag in self._tags_by_id.pop(docker_id, []):
+            self._id_by_tag.pop(tag, None)
+        self._tags_by_id[docker_id] = tags
+        for tag in tags:
+            self._id_by_tag[tag] = docker_id
+
+    def discard(self, id_or_tag: str) -> None:
+        """
+        Removes an image, given its id or one of its tags.
+        """
+
+        docker_id = self._id_by_tag.get(id_or_tag, id_or_tag)
+        for tag in self._tags_by_id.pop(docker_id, []):
+            self._id_by_tag.pop(tag, None)
+        self._complete = False
+
+    async def _inspect(self, name: str) -> Optional[Dict]:
+        try:
+            details = await get_docker_client().images.inspect(name)
+        except exceptions.DockerError as ex:
+            if ex.status == 404:
+                return None
+            raise
+        self.add(details["Id"], _repo_tags(details))
+        return details
+
+    async def get_by_id(self, docker_id: str) -> Optional[Image]:
+        """
+        Returns the image with the given id, or None if it does not exist or has no tags.
+        """
+
+        self._check_expiry()
+        if docker_id not in self._tags_by_id:
+            details = await self._inspect(docker_id)
+            if details is None or details["Id"] != docker_id:
+                return None
+        tags = self._tags_by_id[docker_id]
+        if not tags:
+            return None
+        return Image(type="image", docker_id=docker_id, tags=tags[0])
+
+    async def get_by_tag(self, tag: str) -> Optional[Image]:
+        """
+        Returns the image with the given tag, or None if it does not exist.
+        """
+
+        self._check_expiry()
+        if tag not in self._id_by_tag:
+            await self._inspect(tag)
+            if tag not in self._id_by_tag:
+                return None
+        return Image(type="image", docker_id=self._id_by_tag[tag], tags=tag)
+
+    async def list_images(self) -> List[Image]:
+        """
+        Returns all the tagged images, listing them from Docker when the index is incomplete.
+        """
+
+        self._check_expiry()
+        if not self._complete:
+            summaries = await get_docker_client().images.list()
+            self._tags_by_id.clear()
+            self._id_by_tag.clear()
+            for summary in summaries:
+                self.add(summary["Id"], _repo_tags(summary))
+            self._complete = True
+        return [
+            Image(type="image", docker_id=docker_id, tags=tags[0])
+            for docker_id, tags in self._tags_by_id.items()
+            if tags
+        ]
+
+
+image_index = ImageIndex()
+
+
+async def watch_image_events() -> None:
+    """
+    Keeps the image index up to date with the image events of the Docker host.
+
+    Runs until cancelled. When the events stream fails or ends (e.g. the Docker
+    daemon is unreachable), the index is invalidated, so that it relies on its TTL,
+    and the events are subscribed to again with an exponential backoff.
+    """
+
+    retry_delay = DOCKER_IMAGE_EVENTS_RETRY_DELAY
+    while True:
+        try:
+            client = get_docker_client()
+            subscriber = client.events.subscribe(
+                filters=json.dumps({"type": ["image"]})
+            )
+            try:
+                while True:
+                    event = await subscriber.get()
+                    if event is None:
+                        logger.warning("Docker events stream ended")
+                        break
+                    retry_delay = DOCKER_IMAGE_EVENTS_RETRY_DELAY
+                    actor = event.get("Actor") or {}
+                    image_index.discard(actor.get("ID") or event.get("id", ""))
+                    if "name" in (actor.get("Attributes") or {}):
+                        image_index.discard(actor["Attributes"]["name"])
+            finally:
+                try:
+                    await client.events.stop()
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.warning(f"Docker events stream failed: {str(ex)}")
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning(f"Docker events subscription failed: {repr(ex)}")
+
+        image_index.invalidate()
+        logger.info(f"Subscribing to the Docker events again in {retry_delay}s")
+        await asyncio.sleep(retry_delay)
+        retry_delay = min(retry_delay * 2, DOCKER_IMAGE_EVENTS_MAX_RETRY_DELAY)
+
+
+async def find_image_by_docker_id(docker_id: str) -> Optional[Image]:
+    """
+    Finds an image based on its docker id.
+
+    Args:
+        docker_id (str): The id of the image.
+
+    Returns:
+        Optional[Image]: The image, or None if it does not exist or has no tags.
+    """
+
+    return await image_index.get_by_id(docker_id)
+
+
+async def find_image_by_tag(tag: str) -> Optional[Image]:
+    """
+    Finds an image based on one of its tags.
+
+    Args:
+        tag (str): The tag of the image (e.g. `agenta-server/app_v1:latest`).
+
+    Returns:
+        Optional[Image]: The image, or None if it does not exist.
+    """
+
+    return await image_index.get_by_tag(tag)
+
+
+async def image_exists(docker_id: str, tag: str) -> bool:
+    """
+    Checks that an image with the given id has the given tag.
+
+    A mismatch in the index (e.g. the tag was moved to a new build since it was
+    indexed) is confirmed with Docker before answering.
+
+    Args:
+        docker_id (str): The id of the image.
+        tag (str): The tag of the image.
+
+    Returns:
+        bool: Whether the image exists with this tag.
+    """
+
+    image = await image_index.get_by_tag(tag)
+    if image is not None and image.docker_id == docker_id:
+        return True
+    if image is not None:
+        image_index.discard(tag)
+        image = await image_index.get_by_tag(tag)
+    return image is not None and image.docker_id == docker_id
+
+
+async def list_images() -> List[Image]:
+    """
+    Lists all the images from our repository.
+    These are tagged with the registry name (config in both agenta_backend and agenta-cli)
+
+    Returns:
+        List[Image]: The images.
+    """
+
+    return [
+        image
+        for image in await image_index.list_images()
+        if image.tags.startswith(agenta_registry_repo)
+    ]
+
+
+def _container_labels(uri_path: str, container_name: str) -> Dict[str, str]:
+    # Default labels
+    labels = {
+        f"traefik.http.services.{container_name}.loadbalancer.server.port": "80",
+        f"traefik.http.middlewares.{container_name}-strip-prefix.stripprefix.prefixes": f"/{uri_path}",
+        f"traefik.http.routers.{container_name}.middlewares": f"{container_name}-strip-prefix",
+        f"traefik.http.routers.{container_name}.service": f"{container_name}",
+    }
+
+    # Merge the default labels with environment-specific labels
+    if os.environ.get("ENVIRONMENT") == "production":
+        # Production specific labels
+        labels[
+            f"traefik.http.routers.{container_name}.rule"
+        ] = f"Host(`{os.environ['BARE_DOMAIN_NAME']}`) && PathPrefix(`/{uri_path}`)"
+
+        if "https" in os.environ["DOMAIN_NAME"]:
+            # SSL specific labels
+            labels.update(
+                {
+                    f"traefik.http.routers.{container_name}.entrypoints": "web-secure",
+                    f"traefik.http.routers.{container_name}.tls": "true",
+                    f"traefik.http.routers.{container_name}.tls.certresolver": "myResolver",
+                }
+            )
+    else:
+        # Development specific labels
+        labels.update(
+            {
+                f"traefik.http.routers.{container_name}.rule": f"PathPrefix(`/{uri_path}`)",
+                f"traefik.http.routers.{container_name}.entrypoints": "web",
+            }
+        )
+    return labels
+
+
+async def start_container(
+    image_name: str, uri_path: str, container_name: str, env_vars: DockerEnvVars
+) -> Optional[Dict]:
+    """
+    Starts the container of an app variant, routed by traefik under `uri_path`.
+
+    Args:
+        image_name (str): The tag of the image to run.
+        uri_path (str): The path under which the container is served.
+        container_name (str): The name of the container.
+        env_vars (DockerEnvVars): The environment variables of the container.
+
+    Returns:
+        Optional[Dict]: The uri, id and name of the container, or None if Docker failed to run it.
+
+    Raises:
+        Exception: If the container exited immediately.
+    """
+
+    logger.debug("Starting container with the following parameters:")
+    logger.debug(f"image_name: {image_name}")
+    logger.debug(f"uri_path: {uri_path}")
+    logger.debug(f"container_name: {container_name}")
+    logger.debug(f"env_vars: {env_vars}")
+
+    client = get_docker_client()
+    env_vars = {} if env_vars is None else env_vars
+    config = {
+        "Image": image_name,
+        "Labels": _container_labels(uri_path, container_name),
+        "Env": [f"{key}={value}" for key, value in env_vars.items()],
+        "HostConfig": {
+            "NetworkMode": "agenta-network",
+            "ExtraHosts": ["host.docker.internal:host-gateway"],
+            "RestartPolicy": {"Name": "always"},
+        },
+    }
+    try:
+        container = await client.containers.run(config=config, name=container_name)
+    except exceptions.DockerError as error:
+        # Container failed to run, get the logs
+        try:
+            failed_container = await client.containers.get(container_name)
+            logs = "".join(await failed_container.log(stdout=True, stderr=True))
+            raise Exception(f"Docker Logs: {logs}") from error
+        except Exception as e:
+            logger.exception(
+                f"Failed to fetch logs: {str(e)} \n Exception Error: {str(error)}"
+            )
+            return None
+
+    # Check the container's status, without blocking the event loop
+    await asyncio.sleep(CONTAINER_START_CHECK_DELAY)
+    details = await container.show()
+    if details["State"]["Status"] == "exited":
+        logs = "".join(await container.log(stdout=True, stderr=True))
+        raise Exception(f"Container exited immediately. Docker Logs: {logs}")
+    return {
+        "uri": f"{os.environ['DOMAIN_NAME']}/{uri_path}",
+        "container_id": container.id,
+        "container_name": container_name,
+    }
+
+
+async def restart_container(container_id: str):
+    """
+    Restarts a container based on its id.
+
+    Args:
+        container_id (str): The docker container id.
+
+    Raises:
+        RuntimeError: If the container could not be restarted.
+    """
+
+    client = get_docker_client()
+    try:
+        logger.info(f"Restarting container with id: {container_id}")
+
+        # Connect and restart container
+        network = await client.networks.get("agenta-network")
+        await network.connect({"Container": container_id})
+        container = await client.containers.get(container_id)
+        await container.restart()
+
+        logger.info(f"Restarted container with id: {container_id}")
+    except exceptions.DockerError as ex:
+        logger.error(
+            f"Error restarting container with id: {container_id}. Error: {str(ex)}"
+        )
+        raise RuntimeError(f"Error starting container with id: {container_id}") from ex
+
+
+async def stop_container(container_id: str):
+    """
+    Stops a container based on its id.
+
+    Args:
+        container_id (str): The docker container id.
+
+    Raises:
+        RuntimeError: If the container could not be stopped.
+    """
+
+    try:
+        container = await get_docker_client().containers.get(container_id)
+        await container.stop()
+        logger.info(f"Stopped container with id: {container_id}")
+    except exceptions.DockerError as ex:
+        logger.error(
+            f"Error stopping container with id: {container_id}. Error: {str(ex)}"
+        )
+        raise RuntimeError(f"Error stopping container with id: {container_id}") from ex
+
+
+async def delete_container(container_id: str):
+    """
+    Deletes a container based on its id.
+
+    Args:
+        container_id (str): The docker container id.
+
+    Raises:
+        RuntimeError: If the container could not be deleted.
+    """
+
+    try:
+        container = await get_docker_client().containers.get(container_id)
+        await container.delete()
+        logger.info(f"Deleted container with id: {container_id}")
+    except exceptions.DockerError as ex:
+        logger.error(
+            f"Error deleting container with id: {container_id}. Error: {str(ex)}"
+        )
+        raise RuntimeError(f"Error deleting container with id: {container_id}") from ex
+
+
+async def delete_image(docker_id: str):
+    """
+    Deletes an image based on its id.
+
+    Args:
+        docker_id (str): The docker image id.
+
+    Raises:
+        RuntimeError: If the image could not be deleted.
+    """
+
+    try:
+        await get_docker_client().images.delete(docker_id)
+        image_index.discard(docker_id)
+        logger.info(f"Deleted image with id: {docker_id}")
+    except exceptions.DockerError as ex:
+        logger.error(f"Error deleting image with id: {docker_id}. Error: {str(ex)}")
+        raise RuntimeError(f"Error deleting image with id: {docker_id}") from ex
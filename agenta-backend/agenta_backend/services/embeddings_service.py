@@ -0,0 +1,346 @@
+import os
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Set
+
+import numpy as np
+from openai import AsyncOpenAI, BadRequestError
+from redis.exceptions import RedisError
+
+from agenta_backend.utils import redis_utils
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+EMBEDDINGS_MODEL = "text-embedding-3-small"
+# Maximum number of texts sent in one embeddings request
+EMBEDDINGS_BATCH_SIZE = int(os.environ.get("AGENTA_EMBEDDINGS_BATCH_SIZE", 256))
+# How long texts requested by concurrent evaluations are collected before being sent, in seconds
+EMBEDDINGS_BATCH_WAIT = float(os.environ.get("AGENTA_EMBEDDINGS_BATCH_WAIT", 0.01))
+
+# Where embeddings are cached: "redis", "disk", "memory" or "none"
+EMBEDDINGS_CACHE = os.environ.get("AGENTA_EMBEDDINGS_CACHE", "redis").lower()
+EMBEDDINGS_CACHE_TTL = int(
+    os.environ.get("AGENTA_EMBEDDINGS_CACHE_TTL", 30 * 24 * 60 * 60)
+)
+EMBEDDINGS_CACHE_PATH = os.environ.get(
+    "AGENTA_EMBEDDINGS_CACHE_PATH", "/tmp/agenta_embeddings_cache.sqlite3"
+)
+EMBEDDINGS_MEMORY_CACHE_SIZE = int(
+    os.environ.get("AGENTA_EMBEDDINGS_MEMORY_CACHE_SIZE", 2048)
+)
+
+
+def embedding_cache_key(text: str, model: str = EMBEDDINGS_MODEL) -> str:
+    """
+    Returns the cache key of the embedding of a text, a hash of the model and the text.
+    """
+
+    digest = hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+    return f"embeddings:{digest}"
+
+
+class EmbeddingsCache:
+    """
+    Cache of embeddings keyed by content hash (see `embedding_cache_key`).
+
+    Vectors are stored as float32 bytes. The base class caches nothing.
+    """
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        return {}
+
+    async def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        return None
+
+
+class MemoryEmbeddingsCache(EmbeddingsCache):
+    """
+    In-process LRU cache of embeddings.
+    """
+
+    def __init__(self, max_size: int = EMBEDDINGS_MEMORY_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        vectors = {}
+        for key in keys:
+            if key in self._vectors:
+                self._vectors.move_to_end(key)
+                vectors[key] = self._vectors[key]
+        return vectors
+
+    async def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        for key, vector in vectors.items():
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+        while len(self._vectors) > self.max_size:
+            self._vectors.popitem(last=False)
+
+
+class RedisEmbeddingsCache(EmbeddingsCache):
+    """
+    Embeddings cache stored in Redis, shared by the workers, with a TTL.
+
+    Redis errors are logged and handled as cache misses.
+    """
+
+    def __init__(self, ttl: int = EMBEDDINGS_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._redis = redis_utils.redis_connection()
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        try:
+            values = await asyncio.to_thread(self._redis.mget, list(keys))
+        except RedisError as e:
+            logger.warning(f"Could not read embeddings from Redis: {e}")
+            return {}
+        return {
+            key: np.frombuffer(value, dtype=np.float32)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    async def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        def set_vectors():
+            pipeline = self._redis.pipeline(transaction=False)
+            for key, vector in vectors.items():
+                pipeline.set(key, vector.astype(np.float32).tobytes(), ex=self.ttl)
+            pipeline.execute()
+
+        try:
+            await asyncio.to_thread(set_vectors)
+        except RedisError as e:
+            logger.warning(f"Could not write embeddings to Redis: {e}")
+
+
+class DiskEmbeddingsCache(EmbeddingsCache):
+    """
+    Embeddings cache stored in a SQLite file, shared by the processes of a host.
+    """
+
+    def __init__(self, path: str = EMBEDDINGS_CACHE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        def get_vectors():
+            with self._lock, self._connect() as connection:
+                placeholders = ",".join("?" * len(keys))
+                return connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    list(keys),
+                ).fetchall()
+
+        if not keys:
+            return {}
+        rows = await asyncio.to_thread(get_vectors)
+        return {key: np.frombuffer(vector, dtype=np.float32) for key, vector in rows}
+
+    async def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        def set_vectors():
+            with self._lock, self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [
+                        (key, vector.astype(np.float32).tobytes())
+                        for key, vector in vectors.items()
+                    ],
+                )
+
+        await asyncio.to_thread(set_vectors)
+
+
+_embeddings_cache: Optional[EmbeddingsCache] = None
+
+
+def get_embeddings_cache() -> EmbeddingsCache:
+    """
+    Returns the embeddings cache configured with AGENTA_EMBEDDINGS_CACHE.
+
+    Returns:
+        EmbeddingsCache: The cache, in memory if Redis or the disk cannot be used.
+    """
+
+    global _embeddings_cache
+    if _embeddings_cache is None:
+        try:
+            if EMBEDDINGS_CACHE == "redis":
+                _embeddings_cache = RedisEmbeddingsCache()
+            elif EMBEDDINGS_CACHE == "disk":
+                _embeddings_cache = DiskEmbeddingsCache()
+            elif EMBEDDINGS_CACHE == "none":
+                _embeddings_cache = EmbeddingsCache()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                f"Could not open the {EMBEDDINGS_CACHE} embeddings cache: {e}"
+            )
+        if _embeddings_cache is None:
+            _embeddings_cache = MemoryEmbeddingsCache()
+    return _embeddings_cache
+
+
+async def get_embeddings(
+    texts: Sequence[str],
+    client: AsyncOpenAI,
+    cache: Optional[EmbeddingsCache] = None,
+    model: str = EMBEDDINGS_MODEL,
+    batch_size: int = EMBEDDINGS_BATCH_SIZE,
+) -> np.ndarray:
+    """
+    Embeds texts, with the embeddings missing from the cache requested in batches.
+
+    Args:
+        texts (Sequence[str]): The texts to embed.
+        client (AsyncOpenAI): The OpenAI client.
+        cache (EmbeddingsCache, optional): The cache, `get_embeddings_cache()` by default.
+        model (str): The embeddings model.
+        batch_size (int): The maximum number of texts sent in one request.
+
+    Returns:
+        np.ndarray: The embeddings, one row per text.
+    """
+
+    cache = cache or get_embeddings_cache()
+    keys = [embedding_cache_key(text, model) for text in texts]
+    vectors = await cache.get_many(list(set(keys)))
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), batch_size):
+        batch_keys = missing_keys[start : start + batch_size]
+        response = await client.embeddings.create(
+            model=model, input=[missing[key] for key in batch_keys]
+        )
+        batch_vectors = {
+            batch_keys[embedding.index]: np.asarray(
+                embedding.embedding, dtype=np.float32
+            )
+            for embedding in response.data
+        }
+        await cache.set_many(batch_vectors)
+        vectors.update(batch_vectors)
+
+    return np.stack([vectors[key] for key in keys])
+
+
+def cosine_similarities(vectors: np.ndarray, other_vectors: np.ndarray) -> np.ndarray:
+    """
+    Computes the similarity of each pair of rows of two arrays of (unit-length) embeddings.
+
+    Args:
+        vectors (np.ndarray): The first embeddings, of shape (n, d).
+        other_vectors (np.ndarray): The second embeddings, of shape (n, d).
+
+    Returns:
+        np.ndarray: The n dot products.
+    """
+
+    return np.einsum("ij,ij->i", vectors, other_vectors)
+
+
+class EmbeddingsBatcher:
+    """
+    Merges the texts embedded concurrently on an event loop into batched requests.
+
+    Texts requested within `max_wait` seconds of each other (or until `batch_size`
+    texts are pending) are de-duplicated and embedded with one call to `get_embeddings`,
+    so that evaluating many rows concurrently sends a few large requests instead of
+    two small requests per row.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        cache: Optional[EmbeddingsCache] = None,
+        model: str = EMBEDDINGS_MODEL,
+        batch_size: int = EMBEDDINGS_BATCH_SIZE,
+        max_wait: float = EMBEDDINGS_BATCH_WAIT,
+    ) -> None:
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embeds texts, together with the texts requested concurrently.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+
+        Returns:
+            np.ndarray: The embeddings, one row per text.
+        """
+
+        vectors = await asyncio.gather(*[self._request(text) for text in texts])
+        return np.stack(vectors)
+
+    def _request(self, text: str) -> asyncio.Future:
+        future = self._pending.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[text] = loop.create_future()
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.ensure_future(self._embed_batch(pending))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _embed_batch(self, pending: Dict[str, asyncio.Future]) -> None:
+        texts = list(pending)
+        try:
+            vectors = await get_embeddings(
+                texts,
+                self.client,
+                cache=self.cache,
+                model=self.model,
+                batch_size=self.batch_size,
+            )
+        except BadRequestError as e:
+            if len(texts) == 1:
+                pending[texts[0]].set_exception(e)
+                return
+            # An invalid text (e.g. empty) only fails the evaluations requesting it
+            await asyncio.gather(
+                *[self._embed_batch({text: future}) for text, future in pending.items()]
+            )
+            return
+        except Exception as e:  # pylint: disable=broad-except
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            if not pending[text].done():
+                pending[text].set_result(vector)
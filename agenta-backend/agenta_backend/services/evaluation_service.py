@@ -1,6 +1,9 @@
+import os
+import json
 import uuid
 import logging
-from typing import Dict, List
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone
 
 from fastapi import HTTPException
@@ -57,6 +60,11 @@ from agenta_backend.models.shared_models import (
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Match the compared scenarios with the testset inputs in SQL, to only load the matched ones
+COMPARE_SCENARIOS_SQL_INDEX = os.environ.get(
+    "AGENTA_COMPARE_SCENARIOS_SQL_INDEX", "false"
+).lower() in ["true", "1"]
+
 
 class UpdateEvaluationScenarioError(Exception):
     """Custom exception for update evaluation scenario errors."""
@@ -145,23 +153,41 @@ async def update_human_evaluation_service(
     )
 
 
-async def fetch_evaluation_scenarios_for_evaluation(evaluation_id: str):
+async def fetch_evaluation_scenarios_for_evaluation(
+    evaluation_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    evaluator_config_id: Optional[str] = None,
+    result_value: Optional[str] = None,
+    has_error: Optional[bool] = None,
+):
     """
     Fetch evaluation scenarios for a given evaluation ID.
 
     Args:
         evaluation_id (str): The ID of the evaluation.
+        cursor, limit, fields, evaluator_config_id, result_value, has_error: \
+            See `db_manager.fetch_evaluation_scenarios`.
 
     Returns:
         List[EvaluationScenario]: A list of evaluation scenarios.
     """
 
     evaluation_scenarios = await db_manager.fetch_evaluation_scenarios(
-        evaluation_id=evaluation_id
+        evaluation_id=evaluation_id,
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+        evaluator_config_id=evaluator_config_id,
+        result_value=result_value,
+        has_error=has_error,
     )
     return [
         await converters.evaluation_scenario_db_to_pydantic(
-            evaluation_scenario_db=evaluation_scenario, evaluation_id=evaluation_id
+            evaluation_scenario_db=evaluation_scenario,
+            evaluation_id=evaluation_id,
+            fields=fields,
         )
         for evaluation_scenario in evaluation_scenarios
     ]
@@ -307,8 +333,13 @@ async def fetch_list_human_evaluations(
     """
 
     evaluations_db = await db_manager.list_human_evaluations(app_id=app_id)
+    evaluations_variants = await db_manager.fetch_human_evaluations_variants(
+        [str(evaluation.id) for evaluation in evaluations_db]
+    )
     return [
-        await converters.human_evaluation_db_to_pydantic(evaluation)
+        await converters.human_evaluation_db_to_pydantic(
+            evaluation, evaluations_variants[str(evaluation.id)]
+        )
         for evaluation in evaluations_db
     ]
 
@@ -391,8 +422,9 @@ async def create_new_human_evaluation(
             status_code=500, detail="Failed to create evaluation_scenario"
         )
 
+    csvdata = await db_manager.fetch_testset_csvdata(human_evaluation.testset)
     await prepare_csvdata_and_create_evaluation_scenario(
-        human_evaluation.testset.csvdata,
+        csvdata,
         payload.inputs,
         payload.evaluation_type,
         human_evaluation,
@@ -460,23 +492,53 @@ async def retrieve_evaluation_results(evaluation_id: str) -> List[dict]:
 
 async def compare_evaluations_scenarios(
     evaluations_ids: List[str],
+    use_sql_index: bool = COMPARE_SCENARIOS_SQL_INDEX,
 ):
     evaluation = await db_manager.fetch_evaluation_by_id(evaluations_ids[0])
-    testset = evaluation.testset
-    unique_testset_datapoints = remove_duplicates(testset.csvdata)
+    testset = await db_manager.fetch_testset_by_id(str(evaluation.testset_id))
+    csvdata = await db_manager.fetch_testset_csvdata(testset)
+    unique_testset_datapoints = remove_duplicates(csvdata)
     formatted_inputs = extract_inputs_values_from_testset(unique_testset_datapoints)
     # # formatted_inputs: [{'input_name': 'country', 'input_value': 'Nauru'}]
 
     all_scenarios = []
-
-    for evaluation_id in evaluations_ids:
-        eval_scenarios = await fetch_evaluation_scenarios_for_evaluation(
-            evaluation_id=evaluation_id
+    scenarios_index = None
+
+    if use_sql_index:
+        # Only the scenarios matching the testset inputs are loaded
+        unique_inputs = {
+            input_index_key(
+                formatted_input["input_name"], formatted_input["input_value"]
+            ): (formatted_input["input_name"], formatted_input["input_value"])
+            for formatted_input in formatted_inputs
+        }
+        scenarios_inputs = await db_manager.fetch_evaluation_scenarios_ids_by_input(
+            evaluations_ids, list(unique_inputs.values())
+        )
+        evaluation_scenarios = await db_manager.fetch_evaluation_scenarios_by_ids(
+            list({scenario_id: None for _, _, scenario_id in scenarios_inputs})
         )
-        all_scenarios.append(eval_scenarios)
+        all_scenarios.append(
+            [
+                await converters.evaluation_scenario_db_to_pydantic(
+                    evaluation_scenario_db=evaluation_scenario,
+                    evaluation_id=str(evaluation_scenario.evaluation_id),
+                )
+                for evaluation_scenario in evaluation_scenarios
+            ]
+        )
+        scenarios_index = index_scenarios_inputs_by_input(
+            scenarios_inputs, all_scenarios
+        )
+    else:
+        for evaluation_id in evaluations_ids:
+            eval_scenarios = await fetch_evaluation_scenarios_for_evaluation(
+                evaluation_id=evaluation_id
+            )
+            all_scenarios.append(eval_scenarios)
 
     grouped_scenarios_by_inputs = find_scenarios_by_input(
-        formatted_inputs, all_scenarios
+        formatted_inputs, all_scenarios, scenarios_index=scenarios_index
     )
 
     return grouped_scenarios_by_inputs
@@ -495,30 +557,44 @@ def extract_inputs_values_from_testset(testset):
     return extracted_values
 
 
-def find_scenarios_by_input(formatted_inputs, all_scenarios):
-    results = []
-    flattened_scenarios = [
-        scenario for sublist in all_scenarios for scenario in sublist
-    ]
+def find_scenarios_by_input(
+    formatted_inputs,
+    all_scenarios,
+    scenarios_index: Optional[Dict[Tuple[str, Any], List[EvaluationScenario]]] = None,
+):
+    """
+    Groups the scenarios of the compared evaluations by testset input.
+
+    Args:
+        formatted_inputs (List[dict]): The input_name and input_value of the testset inputs.
+        all_scenarios (List[List[EvaluationScenario]]): The scenarios of each evaluation.
+        scenarios_index (dict, optional): The scenarios indexed by input, \
+            as built by index_scenarios_by_input (built from all_scenarios if None).
+
+    Returns:
+        dict: The testset inputs ("inputs") and the input_name, input_value and \
+            matching scenarios of each of them ("data").
+    """
+
+    if scenarios_index is None:
+        scenarios_index = index_scenarios_by_input(
+            scenario for sublist in all_scenarios for scenario in sublist
+        )
 
+    results = []
     for formatted_input in formatted_inputs:
         input_name = formatted_input["input_name"]
         input_value = formatted_input["input_value"]
 
-        matching_scenarios = [
-            scenario
-            for scenario in flattened_scenarios
-            if any(
-                input_item.name == input_name and input_item.value == input_value
-                for input_item in scenario.inputs
-            )
-        ]
+        matching_scenarios = scenarios_index.get(
+            input_index_key(input_name, input_value), []
+        )
 
         results.append(
             {
                 "input_name": input_name,
                 "input_value": input_value,
-                "scenarios": matching_scenarios,
+                "scenarios": list(matching_scenarios),
             }
         )
 
@@ -528,14 +604,85 @@ def find_scenarios_by_input(formatted_inputs, all_scenarios):
     }
 
 
+def input_index_key(input_name: str, input_value: Any) -> Tuple[str, Any]:
+    """
+    Returns the key of an input in a scenarios index.
+
+    Unhashable input values (e.g. chat messages) are keyed by their JSON serialization.
+    """
+
+    try:
+        hash(input_value)
+        return input_name, input_value
+    except TypeError:
+        return input_name, json.dumps(input_value, sort_keys=True, default=str)
+
+
+def index_scenarios_by_input(
+    scenarios: Iterable[EvaluationScenario],
+) -> Dict[Tuple[str, Any], List[EvaluationScenario]]:
+    """
+    Indexes scenarios by (input_name, input_value), in a single pass over their inputs.
+
+    Args:
+        scenarios (Iterable[EvaluationScenario]): The scenarios to index.
+
+    Returns:
+        Dict[Tuple[str, Any], List[EvaluationScenario]]: The scenarios having each input, in order.
+    """
+
+    scenarios_index: Dict[Tuple[str, Any], List[EvaluationScenario]] = defaultdict(list)
+    for scenario in scenarios:
+        for input_item in scenario.inputs:
+            matching_scenarios = scenarios_index[
+                input_index_key(input_item.name, input_item.value)
+            ]
+            if not matching_scenarios or matching_scenarios[-1] is not scenario:
+                matching_scenarios.append(scenario)
+
+    return scenarios_index
+
+
+def index_scenarios_inputs_by_input(
+    scenarios_inputs: List[Tuple[str, Any, str]],
+    all_scenarios: List[List[EvaluationScenario]],
+) -> Dict[Tuple[str, Any], List[EvaluationScenario]]:
+    """
+    Indexes scenarios by input from the (input_name, input_value, scenario_id) rows
+    returned by db_manager.fetch_evaluation_scenarios_ids_by_input.
+
+    Args:
+        scenarios_inputs (List[Tuple[str, Any, str]]): The inputs of the scenarios.
+        all_scenarios (List[List[EvaluationScenario]]): The scenarios of each evaluation.
+
+    Returns:
+        Dict[Tuple[str, Any], List[EvaluationScenario]]: The scenarios having each input, in order.
+    """
+
+    scenarios_by_id = {
+        scenario.id: scenario for sublist in all_scenarios for scenario in sublist
+    }
+    scenarios_index: Dict[Tuple[str, Any], List[EvaluationScenario]] = defaultdict(list)
+    for input_name, input_value, scenario_id in scenarios_inputs:
+        scenario = scenarios_by_id.get(scenario_id)
+        if scenario is None:
+            continue
+
+        matching_scenarios = scenarios_index[input_index_key(input_name, input_value)]
+        if not matching_scenarios or matching_scenarios[-1] is not scenario:
+            matching_scenarios.append(scenario)
+
+    return scenarios_index
+
+
 def remove_duplicates(csvdata):
     unique_data = set()
     unique_entries = []
 
     for entry in csvdata:
-        entry_tuple = tuple(entry.items())
-        if entry_tuple not in unique_data:
-            unique_data.add(entry_tuple)
+        entry_key = tuple(input_index_key(name, value) for name, value in entry.items())
+        if entry_key not in unique_data:
+            unique_data.add(entry_key)
             unique_entries.append(entry)
 
     return unique_entries
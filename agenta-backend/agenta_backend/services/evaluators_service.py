@@ -1,18 +1,24 @@
+import os
 import re
 import json
 import asyncio
 import logging
-import asyncio
+import weakref
 import traceback
-from typing import Any, Dict, Union
+from typing import Any, Awaitable, Callable, Dict, List, Union
 
 import httpx
 import numpy as np
-from openai import OpenAI, AsyncOpenAI
-from numpy._core._multiarray_umath import array
+from openai import AsyncOpenAI
 from autoevals.ragas import Faithfulness, ContextRelevancy
 
 from agenta_backend.services.security import sandbox
+from agenta_backend.services.judge_cache_service import cached_llm_judge_call
+from agenta_backend.services.embeddings_service import (
+    EmbeddingsBatcher,
+    cosine_similarities,
+    get_embeddings,
+)
 from agenta_backend.models.shared_models import Error, Result
 from agenta_backend.utils.traces import (
     process_distributed_trace_into_trace_tree,
@@ -22,6 +28,105 @@ from agenta_backend.utils.traces import (
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Maximum number of evaluations awaited concurrently by evaluate_async (e.g. LLM calls)
+EVALUATORS_MAX_CONCURRENCY = int(
+    os.environ.get("AGENTA_EVALUATORS_MAX_CONCURRENCY", 32)
+)
+
+# Clients and concurrency limits shared by the async evaluators, one per event loop
+_openai_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_http_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_embeddings_batchers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_openai_client(api_key: str) -> AsyncOpenAI:
+    """
+    Returns the OpenAI client shared by the evaluators of the running event loop for an API key.
+
+    Args:
+        api_key (str): The OpenAI API key.
+
+    Returns:
+        AsyncOpenAI: The shared client.
+    """
+
+    clients = _openai_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = clients[api_key] = AsyncOpenAI(api_key=api_key)
+    return client
+
+
+def get_embeddings_batcher(api_key: str) -> EmbeddingsBatcher:
+    """
+    Returns the embeddings batcher shared by the evaluators of the running event loop for an API key.
+
+    Args:
+        api_key (str): The OpenAI API key.
+
+    Returns:
+        EmbeddingsBatcher: The shared batcher.
+    """
+
+    batchers = _embeddings_batchers.setdefault(asyncio.get_running_loop(), {})
+    batcher = batchers.get(api_key)
+    if batcher is None:
+        batcher = batchers[api_key] = EmbeddingsBatcher(get_openai_client(api_key))
+    return batcher
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the HTTP client shared by the evaluators of the running event loop.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient()
+    return client
+
+
+def get_evaluators_semaphore() -> asyncio.Semaphore:
+    """
+    Returns the semaphore limiting the concurrent evaluations of the running event loop.
+
+    Returns:
+        asyncio.Semaphore: The semaphore, with EVALUATORS_MAX_CONCURRENCY slots.
+    """
+
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(EVALUATORS_MAX_CONCURRENCY)
+    return semaphore
+
+
+async def close_evaluators_clients() -> None:
+    """
+    Closes the clients shared by the evaluators of the running event loop.
+    """
+
+    loop = asyncio.get_running_loop()
+    _embeddings_batchers.pop(loop, None)
+    for client in _openai_clients.pop(loop, {}).values():
+        await client.close()
+    http_client = _http_clients.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
+
+
+def run_sync(coroutine: Awaitable[Result]) -> Result:
+    """
+    Runs an async evaluator to completion from synchronous code, on the thread's event loop.
+    """
+
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
 
 def get_correct_answer(
     data_point: Dict[str, Any], settings_values: Dict[str, Any]
@@ -49,10 +154,32 @@ def get_correct_answer(
     return data_point[correct_answer_key]
 
 
+def get_output_text(output: Union[str, Dict[str, Any]]) -> str:
+    """
+    Returns the text of an app output, i.e. its "data" field if it is not a string.
+    """
+
+    if not isinstance(output, str):
+        output = output.get("data", "")
+    return output
+
+
+def error_result(message: str) -> Result:
+    """
+    Returns an error result with the traceback of the exception being handled.
+    """
+
+    return Result(
+        type="error",
+        value=None,
+        error=Error(message=message, stacktrace=str(traceback.format_exc())),
+    )
+
+
 def auto_exact_match(
     inputs: Dict[str, Any],  # pylint: disable=unused-argument
     output: Union[str, Dict[str, Any]],
-    data_point: Dict[str, Any],  # pylint: disable=unused-argument
+    data_point: Dict[str, Any],
     app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
@@ -71,30 +198,31 @@ def auto_exact_match(
     Returns:
         Result: A Result object containing the evaluation result.
     """
-    if not isinstance(output, str):
-        output = output.get("data", "")
-    try:
-        correct_answer = get_correct_answer(data_point, settings_values)
-        exact_match = True if output == correct_answer else False
-        result = Result(type="bool", value=exact_match)
-        return result
-    except ValueError as e:
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message=str(e),
-            ),
-        )
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Auto Exact Match evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    return auto_exact_match_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_exact_match_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    results = []
+    for output, data_point in zip(map(get_output_text, outputs), data_points):
+        try:
+            correct_answer = get_correct_answer(data_point, settings_values)
+            results.append(Result(type="bool", value=output == correct_answer))
+        except ValueError as e:
+            results.append(
+                Result(type="error", value=None, error=Error(message=str(e)))
+            )
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Auto Exact Match evaluation"))
+    return results
 
 
 def auto_regex_test(
@@ -105,23 +233,35 @@ def auto_regex_test(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_regex_test_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_regex_test_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
+        # The pattern is compiled once for the whole batch
         re_pattern = re.compile(settings_values["regex_pattern"], re.IGNORECASE)
-        result = (
-            bool(re_pattern.search(output)) == settings_values["regex_should_match"]
-        )
-        return Result(type="bool", value=result)
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Auto Regex evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+        regex_should_match = settings_values["regex_should_match"]
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Auto Regex evaluation")] * len(outputs)
+
+    results = []
+    for output in outputs:
+        try:
+            result = bool(re_pattern.search(output)) == regex_should_match
+            results.append(Result(type="bool", value=result))
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Auto Regex evaluation"))
+    return results
 
 
 def field_match_test(
@@ -159,39 +299,55 @@ def auto_webhook_test(
     app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> Result:
+    return run_sync(
+        auto_webhook_test_async(
+            inputs, output, data_point, app_params, settings_values, lm_providers_keys
+        )
+    )
+
+
+async def auto_webhook_test_async(
+    inputs: Dict[str, Any],
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
     if not isinstance(output, str):
         output = output.get("data", "")
     try:
         correct_answer = get_correct_answer(data_point, settings_values)
 
-        with httpx.Client() as client:
-            payload = {
-                "correct_answer": correct_answer,
-                "output": output,
-                "inputs": inputs,
-            }
-            response = client.post(url=settings_values["webhook_url"], json=payload)
-            response.raise_for_status()
-            response_data = response.json()
-            score = response_data.get("score", None)
-            if score is None and not isinstance(score, (int, float)):
-                return Result(
-                    type="error",
-                    value=None,
-                    error=Error(
-                        message="Error during Auto Webhook evaluation; Webhook did not return a score",
-                    ),
-                )
-            if score < 0 or score > 1:
-                return Result(
-                    type="error",
-                    value=None,
-                    error=Error(
-                        message="Error during Auto Webhook evaluation; Webhook returned an invalid score. Score must be between 0 and 1",
-                    ),
-                )
-            return Result(type="number", value=score)
+        payload = {
+            "correct_answer": correct_answer,
+            "output": output,
+            "inputs": inputs,
+        }
+        response = await get_http_client().post(
+            url=settings_values["webhook_url"], json=payload
+        )
+        response.raise_for_status()
+        response_data = response.json()
+        score = response_data.get("score", None)
+        if score is None and not isinstance(score, (int, float)):
+            return Result(
+                type="error",
+                value=None,
+                error=Error(
+                    message="Error during Auto Webhook evaluation; Webhook did not return a score",
+                ),
+            )
+        if score < 0 or score > 1:
+            return Result(
+                type="error",
+                value=None,
+                error=Error(
+                    message="Error during Auto Webhook evaluation; Webhook returned an invalid score. Score must be between 0 and 1",
+                ),
+            )
+        return Result(type="number", value=score)
     except httpx.HTTPError as e:
         return Result(
             type="error",
@@ -261,6 +417,21 @@ def auto_ai_critique(
     app_params: Dict[str, Any],
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],
+) -> Result:
+    return run_sync(
+        auto_ai_critique_async(
+            inputs, output, data_point, app_params, settings_values, lm_providers_keys
+        )
+    )
+
+
+async def auto_ai_critique_async(
+    inputs: Dict[str, Any],
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],
+    app_params: Dict[str, Any],
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
 ) -> Result:
     """
     Evaluate a response using an AI critique based on provided inputs, output, correct answer, app parameters, and settings.
@@ -297,12 +468,21 @@ def auto_ai_critique(
             {"role": "user", "content": str(chain_run_args)},
         ]
 
-        client = OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo", messages=messages, temperature=0.01
+        async def critique() -> str:
+            client = get_openai_client(openai_api_key)
+            response = await client.chat.completions.create(
+                model="gpt-3.5-turbo", messages=messages, temperature=0.01
+            )
+            return response.choices[0].message.content.strip()
+
+        # Identical critique prompts (e.g. re-runs) are answered from the cache
+        evaluation_output = await cached_llm_judge_call(
+            evaluator_key="auto_ai_critique",
+            model="gpt-3.5-turbo",
+            prompt_template=prompt_template,
+            payload=messages,
+            call=critique,
         )
-
-        evaluation_output = response.choices[0].message.content.strip()
         return Result(type="text", value=evaluation_output)
     except Exception as e:  # pylint: disable=broad-except
         return Result(
@@ -323,58 +503,78 @@ def auto_starts_with(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_starts_with_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_starts_with_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
         prefix = settings_values.get("prefix", "")
         case_sensitive = settings_values.get("case_sensitive", True)
-
         if not case_sensitive:
-            output = output.lower()
             prefix = prefix.lower()
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Starts With evaluation")] * len(outputs)
 
-        result = Result(type="bool", value=output.startswith(prefix))
-        return result
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Starts With evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    results = []
+    for output in outputs:
+        try:
+            if not case_sensitive:
+                output = output.lower()
+            results.append(Result(type="bool", value=output.startswith(prefix)))
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Starts With evaluation"))
+    return results
 
 
 def auto_ends_with(
     inputs: Dict[str, Any],  # pylint: disable=unused-argument
     output: Union[str, Dict[str, Any]],
     data_point: Dict[str, Any],  # pylint: disable=unused-argument
-    app_params: Dict[str, Any],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_ends_with_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_ends_with_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
         suffix = settings_values.get("suffix", "")
         case_sensitive = settings_values.get("case_sensitive", True)
-
         if not case_sensitive:
-            output = output.lower()
             suffix = suffix.lower()
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Ends With evaluation")] * len(outputs)
 
-        result = Result(type="bool", value=output.endswith(suffix))
-        return result
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Ends With evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    results = []
+    for output in outputs:
+        try:
+            if not case_sensitive:
+                output = output.lower()
+            results.append(Result(type="bool", value=output.endswith(suffix)))
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Ends With evaluation"))
+    return results
 
 
 def auto_contains(
@@ -385,27 +585,37 @@ def auto_contains(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_contains_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_contains_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
         substring = settings_values.get("substring", "")
         case_sensitive = settings_values.get("case_sensitive", True)
-
         if not case_sensitive:
-            output = output.lower()
             substring = substring.lower()
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Contains evaluation")] * len(outputs)
 
-        result = Result(type="bool", value=substring in output)
-        return result
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Contains evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    results = []
+    for output in outputs:
+        try:
+            if not case_sensitive:
+                output = output.lower()
+            results.append(Result(type="bool", value=substring in output))
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Contains evaluation"))
+    return results
 
 
 def auto_contains_any(
@@ -416,30 +626,43 @@ def auto_contains_any(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_contains_any_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_contains_any_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
         substrings_str = settings_values.get("substrings", "")
         substrings = [substring.strip() for substring in substrings_str.split(",")]
         case_sensitive = settings_values.get("case_sensitive", True)
-
         if not case_sensitive:
-            output = output.lower()
             substrings = [substring.lower() for substring in substrings]
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Contains Any evaluation")] * len(outputs)
 
-        result = Result(
-            type="bool", value=any(substring in output for substring in substrings)
-        )
-        return result
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Contains Any evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    results = []
+    for output in outputs:
+        try:
+            if not case_sensitive:
+                output = output.lower()
+            results.append(
+                Result(
+                    type="bool",
+                    value=any(substring in output for substring in substrings),
+                )
+            )
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Contains Any evaluation"))
+    return results
 
 
 def auto_contains_all(
@@ -450,30 +673,43 @@ def auto_contains_all(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
+    return auto_contains_all_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
+
+
+def auto_contains_all_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    outputs = [get_output_text(output) for output in outputs]
     try:
         substrings_str = settings_values.get("substrings", "")
         substrings = [substring.strip() for substring in substrings_str.split(",")]
         case_sensitive = settings_values.get("case_sensitive", True)
-
         if not case_sensitive:
-            output = output.lower()
             substrings = [substring.lower() for substring in substrings]
+    except Exception:  # pylint: disable=broad-except
+        return [error_result("Error during Contains All evaluation")] * len(outputs)
 
-        result = Result(
-            type="bool", value=all(substring in output for substring in substrings)
-        )
-        return result
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Contains All evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+    results = []
+    for output in outputs:
+        try:
+            if not case_sensitive:
+                output = output.lower()
+            results.append(
+                Result(
+                    type="bool",
+                    value=all(substring in output for substring in substrings),
+                )
+            )
+        except Exception:  # pylint: disable=broad-except
+            results.append(error_result("Error during Contains All evaluation"))
+    return results
 
 
 def auto_contains_json(
@@ -662,6 +898,21 @@ def rag_faithfulness(
     app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],  # pylint: disable=unused-argument
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> Result:
+    return run_sync(
+        rag_faithfulness_async(
+            inputs, output, data_point, app_params, settings_values, lm_providers_keys
+        )
+    )
+
+
+async def rag_faithfulness_async(
+    inputs: Dict[str, Any],  # pylint: disable=unused-argument
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],  # pylint: disable=unused-argument
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
     try:
         if isinstance(output, str):
@@ -719,15 +970,27 @@ def rag_faithfulness(
             )
 
         # Initialize RAG evaluator to calculate faithfulness score
-        loop = asyncio.get_event_loop()
         faithfulness = Faithfulness(api_key=openai_api_key)
-        eval_score = loop.run_until_complete(
-            faithfulness._run_eval_async(
+
+        async def score() -> float:
+            eval_score = await faithfulness._run_eval_async(
                 output=answer_val, input=question_val, context=contexts_val
             )
+            return eval_score.score
+
+        eval_score = await cached_llm_judge_call(
+            evaluator_key="rag_faithfulness",
+            model=faithfulness.model,
+            prompt_template=Faithfulness.__name__,
+            payload={
+                "question": question_val,
+                "answer": answer_val,
+                "contexts": contexts_val,
+            },
+            call=score,
         )
 
-        return Result(type="number", value=eval_score.score)
+        return Result(type="number", value=eval_score)
 
     except Exception:
         return Result(
@@ -747,6 +1010,21 @@ def rag_context_relevancy(
     app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],  # pylint: disable=unused-argument
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> Result:
+    return run_sync(
+        rag_context_relevancy_async(
+            inputs, output, data_point, app_params, settings_values, lm_providers_keys
+        )
+    )
+
+
+async def rag_context_relevancy_async(
+    inputs: Dict[str, Any],  # pylint: disable=unused-argument
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],  # pylint: disable=unused-argument
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],  # pylint: disable=unused-argument
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
     try:
         if isinstance(output, str):
@@ -804,14 +1082,26 @@ def rag_context_relevancy(
             )
 
         # Initialize RAG evaluator to calculate context relevancy score
-        loop = asyncio.get_event_loop()
         context_rel = ContextRelevancy(api_key=openai_api_key)
-        eval_score = loop.run_until_complete(
-            context_rel._run_eval_async(
+
+        async def score() -> float:
+            eval_score = await context_rel._run_eval_async(
                 output=answer_val, input=question_val, context=contexts_val
             )
+            return eval_score.score
+
+        eval_score = await cached_llm_judge_call(
+            evaluator_key="rag_context_relevancy",
+            model=context_rel.model,
+            prompt_template=ContextRelevancy.__name__,
+            payload={
+                "question": question_val,
+                "answer": answer_val,
+                "contexts": contexts_val,
+            },
+            call=score,
         )
-        return Result(type="number", value=eval_score.score)
+        return Result(type="number", value=eval_score)
 
     except Exception:
         return Result(
@@ -824,24 +1114,67 @@ def rag_context_relevancy(
         )
 
 
-def levenshtein_distance(s1, s2):
+def levenshtein_distance(s1, s2, max_distance=None):
+    """
+    Computes the Levenshtein distance of two sequences with the bit-parallel algorithm
+    of Myers (as formulated by Hyyrö), in O(len(s1) * len(s2) / word size).
+
+    The columns of the dynamic programming matrix are encoded as the bits of Python
+    integers (one bit per character of the shorter sequence), so that each character
+    of the longer sequence is processed with a few integer operations.
+
+    Args:
+        s1: The first sequence.
+        s2: The second sequence.
+        max_distance (optional): When the lengths differ by more than max_distance, the
+            difference of length (a lower bound greater than max_distance) is returned
+            without computing the distance.
+
+    Returns:
+        int: The distance.
+    """
+
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)  # pylint: disable=arguments-out-of-order
+        s1, s2 = s2, s1
+
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return len(s1) - len(s2)
 
     if len(s2) == 0:
         return len(s1)
 
-    previous_row = range(len(s2) + 1)
-    for i, c1 in enumerate(s1):
-        current_row = [i + 1]
-        for j, c2 in enumerate(s2):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+    # Bit i of the mask of a character is set if s2[i] is this character
+    masks: Dict[Any, int] = {}
+    for i, c in enumerate(s2):
+        masks[c] = masks.get(c, 0) | (1 << i)
+
+    all_bits = (1 << len(s2)) - 1
+    last_bit = 1 << (len(s2) - 1)
+    positive_vertical, negative_vertical = all_bits, 0
+    distance = len(s2)
+    for c in s1:
+        equal = masks.get(c, 0)
+        x_vertical = equal | negative_vertical
+        x_horizontal = (
+            (((equal & positive_vertical) + positive_vertical) & all_bits)
+            ^ positive_vertical
+        ) | equal
+        positive_horizontal = negative_vertical | (
+            ~(x_horizontal | positive_vertical) & all_bits
+        )
+        negative_horizontal = positive_vertical & x_horizontal
+        if positive_horizontal & last_bit:
+            distance += 1
+        elif negative_horizontal & last_bit:
+            distance -= 1
+        positive_horizontal = ((positive_horizontal << 1) | 1) & all_bits
+        negative_horizontal = (negative_horizontal << 1) & all_bits
+        positive_vertical = negative_horizontal | (
+            ~(x_vertical | positive_horizontal) & all_bits
+        )
+        negative_vertical = positive_horizontal & x_vertical
 
-    return previous_row[-1]
+    return distance
 
 
 def auto_levenshtein_distance(
@@ -852,79 +1185,92 @@ def auto_levenshtein_distance(
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
-    try:
-        correct_answer = get_correct_answer(data_point, settings_values)
+    return auto_levenshtein_distance_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
 
-        distance = levenshtein_distance(output, correct_answer)
 
-        if "threshold" in settings_values:
-            threshold = settings_values["threshold"]
-            is_within_threshold = distance <= threshold
-            return Result(type="bool", value=is_within_threshold)
+def auto_levenshtein_distance_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    results = []
+    for output, data_point in zip(map(get_output_text, outputs), data_points):
+        try:
+            correct_answer = get_correct_answer(data_point, settings_values)
 
-        return Result(type="number", value=distance)
-    except ValueError as e:
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message=str(e),
-            ),
-        )
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Levenshtein threshold evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+            if "threshold" in settings_values:
+                threshold = settings_values["threshold"]
+                distance = levenshtein_distance(
+                    output, correct_answer, max_distance=threshold
+                )
+                results.append(Result(type="bool", value=distance <= threshold))
+            else:
+                distance = levenshtein_distance(output, correct_answer)
+                results.append(Result(type="number", value=distance))
+        except ValueError as e:
+            results.append(
+                Result(type="error", value=None, error=Error(message=str(e)))
+            )
+        except Exception:  # pylint: disable=broad-except
+            results.append(
+                error_result("Error during Levenshtein threshold evaluation")
+            )
+    return results
 
 
 def auto_similarity_match(
-    inputs: Dict[str, Any],
+    inputs: Dict[str, Any],  # pylint: disable=unused-argument
     output: Union[str, Dict[str, Any]],
     data_point: Dict[str, Any],
-    app_params: Dict[str, Any],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
     settings_values: Dict[str, Any],
-    lm_providers_keys: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
 ) -> Result:
-    if not isinstance(output, str):
-        output = output.get("data", "")
-    try:
-        correct_answer = get_correct_answer(data_point, settings_values)
-        set1 = set(output.split())
-        set2 = set(correct_answer.split())
-        intersect = set1.intersection(set2)
-        union = set1.union(set2)
+    return auto_similarity_match_batch(
+        [inputs], [output], [data_point], app_params, settings_values, lm_providers_keys
+    )[0]
 
-        similarity = len(intersect) / len(union)
 
-        is_similar = (
-            True if similarity > settings_values["similarity_threshold"] else False
-        )
-        result = Result(type="bool", value=is_similar)
-        return result
-    except ValueError as e:
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message=str(e),
-            ),
-        )
-    except Exception as e:  # pylint: disable=broad-except
-        return Result(
-            type="error",
-            value=None,
-            error=Error(
-                message="Error during Auto Similarity Match evaluation",
-                stacktrace=str(traceback.format_exc()),
-            ),
-        )
+def auto_similarity_match_batch(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],  # pylint: disable=unused-argument
+) -> List[Result]:
+    # Correct answers repeated across the batch are only tokenized once
+    tokenized_answers: Dict[str, set] = {}
+
+    results = []
+    for output, data_point in zip(map(get_output_text, outputs), data_points):
+        try:
+            correct_answer = get_correct_answer(data_point, settings_values)
+            set1 = set(output.split())
+            set2 = tokenized_answers.get(correct_answer)
+            if set2 is None:
+                set2 = tokenized_answers[correct_answer] = set(correct_answer.split())
+            intersect = set1.intersection(set2)
+            union = set1.union(set2)
+
+            similarity = len(intersect) / len(union)
+
+            is_similar = similarity > settings_values["similarity_threshold"]
+            results.append(Result(type="bool", value=is_similar))
+        except ValueError as e:
+            results.append(
+                Result(type="error", value=None, error=Error(message=str(e)))
+            )
+        except Exception:  # pylint: disable=broad-except
+            results.append(
+                error_result("Error during Auto Similarity Match evaluation")
+            )
+    return results
 
 
 async def semantic_similarity(
@@ -935,6 +1281,9 @@ async def semantic_similarity(
     """
     Calculate the semantic similarity score of the LLM app using OpenAI's Embeddings API.
 
+    The texts are embedded together with the texts of the rows evaluated concurrently
+    (see `EmbeddingsBatcher`), and their embeddings are cached.
+
     Args:
         output (str): the output text
         correct_answer (str): the correct answer text
@@ -945,21 +1294,30 @@ async def semantic_similarity(
     if not isinstance(output, str):
         output = output.get("data", "")
 
-    openai = AsyncOpenAI(api_key=api_key)
+    vectors = await get_embeddings_batcher(api_key).embed([output, correct_answer])
+    return float(cosine_similarities(vectors[:1], vectors[1:])[0])
 
-    async def encode(text: str):
-        response = await openai.embeddings.create(
-            model="text-embedding-3-small", input=text
-        )
-        return np.array(response.data[0].embedding)
 
-    def cosine_similarity(output_vector: array, correct_answer_vector: array) -> float:
-        return np.dot(output_vector, correct_answer_vector)
+async def semantic_similarities(
+    outputs: List[str],
+    correct_answers: List[str],
+    api_key: str,
+) -> np.ndarray:
+    """
+    Calculate the semantic similarity scores of many outputs at once, e.g. of a whole testset.
+
+    Args:
+        outputs (List[str]): the output texts
+        correct_answers (List[str]): the correct answer texts, one per output
 
-    output_vector = await encode(output)
-    correct_answer_vector = await encode(correct_answer)
-    similarity_score = cosine_similarity(output_vector, correct_answer_vector)
-    return similarity_score
+    Returns:
+        np.ndarray: the semantic similarity score of each output
+    """
+
+    vectors = await get_embeddings(
+        outputs + correct_answers, get_openai_client(api_key)
+    )
+    return cosine_similarities(vectors[: len(outputs)], vectors[len(outputs) :])
 
 
 def auto_semantic_similarity(
@@ -969,18 +1327,30 @@ def auto_semantic_similarity(
     app_params: Dict[str, Any],
     settings_values: Dict[str, Any],
     lm_providers_keys: Dict[str, Any],
+) -> Result:
+    return run_sync(
+        auto_semantic_similarity_async(
+            inputs, output, data_point, app_params, settings_values, lm_providers_keys
+        )
+    )
+
+
+async def auto_semantic_similarity_async(
+    inputs: Dict[str, Any],
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],
+    app_params: Dict[str, Any],
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
 ) -> Result:
     if not isinstance(output, str):
         output = output.get("data", "")
     try:
-        loop = asyncio.get_event_loop()
         openai_api_key = lm_providers_keys["OPENAI_API_KEY"]
         correct_answer = get_correct_answer(data_point, settings_values)
 
-        score = loop.run_until_complete(
-            semantic_similarity(
-                output=output, correct_answer=correct_answer, api_key=openai_api_key
-            )
+        score = await semantic_similarity(
+            output=output, correct_answer=correct_answer, api_key=openai_api_key
         )
         return Result(type="number", value=score)
     except Exception:
@@ -994,6 +1364,39 @@ def auto_semantic_similarity(
         )
 
 
+async def auto_semantic_similarity_batch_async(
+    inputs: List[Dict[str, Any]],  # pylint: disable=unused-argument
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],  # pylint: disable=unused-argument
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+) -> List[Result]:
+    results: List[Result] = [None] * len(outputs)  # type: ignore
+    positions, texts, correct_answers = [], [], []
+    for position, (output, data_point) in enumerate(
+        zip(map(get_output_text, outputs), data_points)
+    ):
+        try:
+            correct_answers.append(get_correct_answer(data_point, settings_values))
+            texts.append(output)
+            positions.append(position)
+        except ValueError as e:
+            results[position] = Result(
+                type="error", value=None, error=Error(message=str(e))
+            )
+
+    if positions:
+        scores = await semantic_similarities(
+            outputs=texts,
+            correct_answers=correct_answers,
+            api_key=lm_providers_keys["OPENAI_API_KEY"],
+        )
+        for position, score in zip(positions, scores):
+            results[position] = Result(type="number", value=float(score))
+    return results
+
+
 EVALUATOR_FUNCTIONS = {
     "auto_exact_match": auto_exact_match,
     "auto_regex_test": auto_regex_test,
@@ -1052,3 +1455,233 @@ def evaluate(
                 stacktrace=str(exc),
             ),
         )
+
+
+# Evaluators doing I/O (LLM, embeddings and webhook calls), awaited by evaluate_async
+ASYNC_EVALUATOR_FUNCTIONS: Dict[str, Callable[..., Awaitable[Result]]] = {
+    "auto_webhook_test": auto_webhook_test_async,
+    "auto_ai_critique": auto_ai_critique_async,
+    "auto_semantic_similarity": auto_semantic_similarity_async,
+    "rag_faithfulness": rag_faithfulness_async,
+    "rag_context_relevancy": rag_context_relevancy_async,
+}
+
+# Synchronous evaluators that may block for long (user code), run in a thread by evaluate_async
+BLOCKING_EVALUATORS = ["auto_custom_code_run"]
+
+
+async def evaluate_async(
+    evaluator_key: str,
+    inputs: Dict[str, Any],
+    output: Union[str, Dict[str, Any]],
+    data_point: Dict[str, Any],
+    app_params: Dict[str, Any],
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+) -> Result:
+    """
+    Evaluates an output without blocking the event loop, like `evaluate`.
+
+    Evaluators doing I/O are awaited and blocking evaluators run in a thread, with at most
+    EVALUATORS_MAX_CONCURRENCY of them running at once on the event loop, across rows and
+    evaluators. The other evaluators are cheap and run inline.
+
+    Args:
+        evaluator_key (str): The key of the evaluator.
+        inputs (Dict[str, Any]): The inputs of the app.
+        output (Union[str, Dict[str, Any]]): The output of the app.
+        data_point (Dict[str, Any]): The testset data point.
+        app_params (Dict[str, Any]): The parameters of the app variant.
+        settings_values (Dict[str, Any]): The settings of the evaluator.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+
+    Returns:
+        Result: The result of the evaluation.
+    """
+
+    evaluation_function = EVALUATOR_FUNCTIONS.get(evaluator_key, None)
+    if not evaluation_function:
+        return Result(
+            type="error",
+            value=None,
+            error=Error(
+                message=f"Evaluation method '{evaluator_key}' not found.",
+            ),
+        )
+
+    args = (inputs, output, data_point, app_params, settings_values, lm_providers_keys)
+    try:
+        if evaluator_key in ASYNC_EVALUATOR_FUNCTIONS:
+            async with get_evaluators_semaphore():
+                return await ASYNC_EVALUATOR_FUNCTIONS[evaluator_key](*args)
+        if evaluator_key in BLOCKING_EVALUATORS:
+            async with get_evaluators_semaphore():
+                return await asyncio.to_thread(evaluation_function, *args)
+        return evaluation_function(*args)
+    except Exception as exc:
+        return Result(
+            type="error",
+            value=None,
+            error=Error(
+                message=f"Error occurred while running {evaluator_key} evaluation. ",
+                stacktrace=str(exc),
+            ),
+        )
+
+
+# Evaluators with a batch implementation, evaluating whole columns of outputs at once
+BATCH_EVALUATOR_FUNCTIONS: Dict[str, Callable[..., List[Result]]] = {
+    "auto_exact_match": auto_exact_match_batch,
+    "auto_regex_test": auto_regex_test_batch,
+    "auto_starts_with": auto_starts_with_batch,
+    "auto_ends_with": auto_ends_with_batch,
+    "auto_contains": auto_contains_batch,
+    "auto_contains_any": auto_contains_any_batch,
+    "auto_contains_all": auto_contains_all_batch,
+    "auto_levenshtein_distance": auto_levenshtein_distance_batch,
+    "auto_similarity_match": auto_similarity_match_batch,
+}
+
+
+def evaluate_batch(
+    evaluator_key: str,
+    inputs: List[Dict[str, Any]],
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+) -> List[Result]:
+    """
+    Evaluates many outputs with the same evaluator, like calling `evaluate` for each of them.
+
+    The deterministic evaluators of BATCH_EVALUATOR_FUNCTIONS prepare their settings
+    (compiled regexes, lowercased substrings...) once for the whole batch; the other
+    evaluators are called for each output.
+
+    Args:
+        evaluator_key (str): The key of the evaluator.
+        inputs (List[Dict[str, Any]]): The inputs of the app, for each output.
+        outputs (List[Union[str, Dict[str, Any]]]): The outputs of the app.
+        data_points (List[Dict[str, Any]]): The testset data point of each output.
+        app_params (Dict[str, Any]): The parameters of the app variant.
+        settings_values (Dict[str, Any]): The settings of the evaluator.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+
+    Returns:
+        List[Result]: The result of the evaluation of each output.
+    """
+
+    batch_function = BATCH_EVALUATOR_FUNCTIONS.get(evaluator_key, None)
+    if batch_function is not None:
+        try:
+            return batch_function(
+                inputs,
+                outputs,
+                data_points,
+                app_params,
+                settings_values,
+                lm_providers_keys,
+            )
+        except Exception:  # pylint: disable=broad-except
+            # e.g. an invalid output, the evaluation of each output reports its error
+            logger.exception(
+                f"Batch evaluation with {evaluator_key} failed, evaluating each output"
+            )
+
+    return [
+        evaluate(
+            evaluator_key,
+            inputs_,
+            output,
+            data_point,
+            app_params,
+            settings_values,
+            lm_providers_keys,
+        )
+        for inputs_, output, data_point in zip(inputs, outputs, data_points)
+    ]
+
+
+# Evaluators with a batch implementation doing I/O, e.g. embedding all the outputs at once
+ASYNC_BATCH_EVALUATOR_FUNCTIONS: Dict[str, Callable[..., Awaitable[List[Result]]]] = {
+    "auto_semantic_similarity": auto_semantic_similarity_batch_async,
+}
+
+# Evaluators that the evaluation task runs on whole batches of outputs
+BATCH_EVALUATORS = [*BATCH_EVALUATOR_FUNCTIONS, *ASYNC_BATCH_EVALUATOR_FUNCTIONS]
+
+
+async def evaluate_batch_async(
+    evaluator_key: str,
+    inputs: List[Dict[str, Any]],
+    outputs: List[Union[str, Dict[str, Any]]],
+    data_points: List[Dict[str, Any]],
+    app_params: Dict[str, Any],
+    settings_values: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+) -> List[Result]:
+    """
+    Evaluates many outputs with the same evaluator without blocking the event loop,
+    like `evaluate_batch`.
+
+    The evaluators of ASYNC_BATCH_EVALUATOR_FUNCTIONS are awaited (e.g. semantic similarity
+    embeds the whole batch in one request and scores it with one vectorized operation);
+    the other evaluators are CPU-bound and run `evaluate_batch` in a thread.
+
+    Args:
+        evaluator_key (str): The key of the evaluator.
+        inputs (List[Dict[str, Any]]): The inputs of the app, for each output.
+        outputs (List[Union[str, Dict[str, Any]]]): The outputs of the app.
+        data_points (List[Dict[str, Any]]): The testset data point of each output.
+        app_params (Dict[str, Any]): The parameters of the app variant.
+        settings_values (Dict[str, Any]): The settings of the evaluator.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+
+    Returns:
+        List[Result]: The result of the evaluation of each output.
+    """
+
+    batch_function = ASYNC_BATCH_EVALUATOR_FUNCTIONS.get(evaluator_key, None)
+    if batch_function is None:
+        return await asyncio.to_thread(
+            evaluate_batch,
+            evaluator_key=evaluator_key,
+            inputs=inputs,
+            outputs=outputs,
+            data_points=data_points,
+            app_params=app_params,
+            settings_values=settings_values,
+            lm_providers_keys=lm_providers_keys,
+        )
+
+    try:
+        async with get_evaluators_semaphore():
+            return await batch_function(
+                inputs,
+                outputs,
+                data_points,
+                app_params,
+                settings_values,
+                lm_providers_keys,
+            )
+    except Exception:  # pylint: disable=broad-except
+        # e.g. a missing API key, the evaluation of each output reports its error
+        logger.exception(
+            f"Batch evaluation with {evaluator_key} failed, evaluating each output"
+        )
+
+    return await asyncio.gather(
+        *[
+            evaluate_async(
+                evaluator_key,
+                inputs_,
+                output,
+                data_point,
+                app_params,
+                settings_values,
+                lm_providers_keys,
+            )
+            for inputs_, output, data_point in zip(inputs, outputs, data_points)
+        ]
+    )
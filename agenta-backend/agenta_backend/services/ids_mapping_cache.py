@@ -0,0 +1,169 @@
+import os
+import re
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+from redis.exceptions import RedisError
+
+from agenta_backend.utils import redis_utils
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Where the mappings of legacy MongoDB ObjectIds to UUIDs are cached: "memory" or "redis"
+IDS_MAPPING_CACHE_BACKEND = os.environ.get(
+    "AGENTA_IDS_MAPPING_CACHE_BACKEND", "memory"
+).lower()
+# Maximum number of mappings kept in memory by each process
+IDS_MAPPING_CACHE_SIZE = int(os.environ.get("AGENTA_IDS_MAPPING_CACHE_SIZE", 10000))
+# The mappings never change, they only expire from Redis to bound its memory
+IDS_MAPPING_CACHE_TTL = int(
+    os.environ.get("AGENTA_IDS_MAPPING_CACHE_TTL", 30 * 24 * 60 * 60)
+)
+
+_OBJECT_ID_PATTERN = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def is_object_id(object_id: str) -> bool:
+    """
+    Checks whether an id is a MongoDB ObjectId (24 hexadecimal characters), without bson.
+
+    Args:
+        object_id (str): The id, a MongoDB ObjectId or a PostgreSQL UUID.
+
+    Returns:
+        bool: Whether the id is a MongoDB ObjectId.
+    """
+
+    return isinstance(object_id, str) and bool(_OBJECT_ID_PATTERN.fullmatch(object_id))
+
+
+def _cache_key(table_name: str, object_id: str) -> str:
+    return f"ids_mapping:{table_name}:{object_id}"
+
+
+class IDsMappingCache:
+    """
+    Cache of the UUIDs of legacy MongoDB ObjectIds, by table.
+
+    Mappings are kept in an in-process LRU and, with the "redis" backend, in Redis,
+    so that they are shared by the workers. Redis errors are logged and handled as
+    cache misses.
+    """
+
+    def __init__(
+        self,
+        max_size: int = IDS_MAPPING_CACHE_SIZE,
+        backend: str = IDS_MAPPING_CACHE_BACKEND,
+        ttl: int = IDS_MAPPING_CACHE_TTL,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if backend == "redis":
+            try:
+                self._redis = redis_utils.redis_connection()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Could not open the Redis ids mapping cache: {e}")
+
+    def _set_local(self, key: str, object_uuid: str) -> None:
+        with self._lock:
+            self._entries[key] = object_uuid
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get_many(
+        self, table_name: str, object_ids: Sequence[str]
+    ) -> Dict[str, str]:
+        """
+        Returns the cached UUIDs of ObjectIds of a table.
+
+        Args:
+            table_name (str): The name of the table.
+            object_ids (Sequence[str]): The ObjectIds.
+
+        Returns:
+            Dict[str, str]: The UUIDs found, by ObjectId.
+        """
+
+        object_uuids = {}
+        with self._lock:
+            for object_id in object_ids:
+                key = _cache_key(table_name, object_id)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    object_uuids[object_id] = self._entries[key]
+
+        missing = [
+            object_id for object_id in object_ids if object_id not in object_uuids
+        ]
+        if self._redis is None or not missing:
+            return object_uuids
+
+        keys = [_cache_key(table_name, object_id) for object_id in missing]
+        try:
+            values = await asyncio.to_thread(self._redis.mget, keys)
+        except RedisError as e:
+            logger.warning(f"Could not read ids mappings from Redis: {e}")
+            return object_uuids
+
+        for object_id, key, value in zip(missing, keys, values):
+            if value is not None:
+                object_uuids[object_id] = value.decode("utf-8")
+                self._set_local(key, object_uuids[object_id])
+        return object_uuids
+
+    async def set_many(self, table_name: str, object_uuids: Dict[str, str]) -> None:
+        """
+        Caches the UUIDs of ObjectIds of a table.
+
+        Args:
+            table_name (str): The name of the table.
+            object_uuids (Dict[str, str]): The UUIDs, by ObjectId.
+        """
+
+        for object_id, object_uuid in object_uuids.items():
+            self._set_local(_cache_key(table_name, object_id), object_uuid)
+
+        if self._redis is None or not object_uuids:
+            return
+
+        def set_mappings():
+            pipeline = self._redis.pipeline(transaction=False)
+            for object_id, object_uuid in object_uuids.items():
+                pipeline.set(
+                    _cache_key(table_name, object_id), object_uuid, ex=self.ttl
+                )
+            pipeline.execute()
+
+        try:
+            await asyncio.to_thread(set_mappings)
+        except RedisError as e:
+            logger.warning(f"Could not write ids mappings to Redis: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_ids_mapping_cache: Optional[IDsMappingCache] = None
+
+
+def get_ids_mapping_cache() -> IDsMappingCache:
+    """
+    Returns the cache of ids mappings configured with AGENTA_IDS_MAPPING_CACHE_BACKEND.
+
+    Returns:
+        IDsMappingCache: The cache.
+    """
+
+    global _ids_mapping_cache
+    if _ids_mapping_cache is None:
+        _ids_mapping_cache = IDsMappingCache()
+    return _ids_mapping_cache
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from agenta_backend.utils import redis_utils
+from agenta_backend.models.api.evaluation_model import LLMJudgeCacheStats
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Configure the cache of the responses of the LLM judges (AI critique and RAG evaluators)
+LLM_JUDGE_CACHE_ENABLED = os.environ.get(
+    "AGENTA_LLM_JUDGE_CACHE_ENABLED", "true"
+).lower() in ["true", "1"]
+# Where responses are cached: "redis" (with an in-process fallback) or "memory"
+LLM_JUDGE_CACHE_BACKEND = os.environ.get(
+    "AGENTA_LLM_JUDGE_CACHE_BACKEND", "redis"
+).lower()
+LLM_JUDGE_CACHE_TTL = int(
+    os.environ.get("AGENTA_LLM_JUDGE_CACHE_TTL", 7 * 24 * 60 * 60)
+)
+# Maximum number of responses kept by the in-process cache
+LLM_JUDGE_CACHE_MAX_SIZE = int(os.environ.get("AGENTA_LLM_JUDGE_CACHE_MAX_SIZE", 10000))
+
+# Hits and misses of the evaluation being run, set by the evaluation task
+llm_judge_cache_stats: ContextVar[Optional[LLMJudgeCacheStats]] = ContextVar(
+    "llm_judge_cache_stats", default=None
+)
+
+
+def llm_judge_cache_key(
+    evaluator_key: str, model: str, prompt_template: str, payload: Any
+) -> str:
+    """
+    Returns the content-addressed key of a judge call.
+
+    Args:
+        evaluator_key (str): The key of the evaluator.
+        model (str): The model of the judge.
+        prompt_template (str): The prompt template of the judge.
+        payload (Any): The inputs, output and context sent to the judge (JSON serializable).
+
+    Returns:
+        str: The cache key.
+    """
+
+    content = json.dumps(
+        [evaluator_key, model, prompt_template, payload], sort_keys=True, default=str
+    )
+    return f"llm_judge:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
+class MemoryLLMJudgeCache:
+    """
+    In-process cache of judge responses, with a TTL and LRU eviction.
+    """
+
+    def __init__(
+        self, ttl: int = LLM_JUDGE_CACHE_TTL, max_size: int = LLM_JUDGE_CACHE_MAX_SIZE
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class RedisLLMJudgeCache:
+    """
+    Cache of judge responses stored in Redis with a TTL, shared by the workers.
+
+    The size of the cache is bounded by the eviction policy of the Redis server.
+    When Redis cannot be reached, the in-process cache is used instead.
+    """
+
+    def __init__(self, ttl: int = LLM_JUDGE_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self.fallback = MemoryLLMJudgeCache(ttl=ttl)
+        self._redis = redis_utils.redis_connection()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await asyncio.to_thread(self._redis.get, key)
+        except RedisError as e:
+            logger.warning(f"Could not read LLM judge response from Redis: {e}")
+            return await self.fallback.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str) -> None:
+        try:
+            await asyncio.to_thread(self._redis.set, key, value, ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Could not write LLM judge response to Redis: {e}")
+            await self.fallback.set(key, value)
+
+
+_llm_judge_cache = None
+
+
+def get_llm_judge_cache():
+    """
+    Returns the cache of judge responses configured with AGENTA_LLM_JUDGE_CACHE_BACKEND.
+
+    Returns:
+        Union[RedisLLMJudgeCache, MemoryLLMJudgeCache]: The cache.
+    """
+
+    global _llm_judge_cache
+    if _llm_judge_cache is None:
+        if LLM_JUDGE_CACHE_BACKEND == "redis":
+            try:
+                _llm_judge_cache = RedisLLMJudgeCache()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Could not open the Redis LLM judge cache: {e}")
+        if _llm_judge_cache is None:
+            _llm_judge_cache = MemoryLLMJudgeCache()
+    return _llm_judge_cache
+
+
+async def cached_llm_judge_call(
+    evaluator_key: str,
+    model: str,
+    prompt_template: str,
+    payload: Any,
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Returns the cached response of a judge call, or makes the call and caches its response.
+
+    Hits and misses are counted in the stats of the evaluation being run, if any.
+
+    Args:
+        evaluator_key (str): The key of the evaluator.
+        model (str): The model of the judge.
+        prompt_template (str): The prompt template of the judge.
+        payload (Any): The inputs, output and context sent to the judge (JSON serializable).
+        call (Callable[[], Awaitable[Any]]): Makes the call, returning a JSON serializable response.
+
+    Returns:
+        Any: The response of the judge.
+    """
+
+    if not LLM_JUDGE_CACHE_ENABLED:
+        return await call()
+
+    cache = get_llm_judge_cache()
+    stats = llm_judge_cache_stats.get()
+    key = llm_judge_cache_key(evaluator_key, model, prompt_template, payload)
+
+    cached_value = await cache.get(key)
+    if cached_value is not None:
+        if stats is not None:
+            stats.hits += 1
+        return json.loads(cached_value)["response"]
+
+    if stats is not None:
+        stats.misses += 1
+    response = await call()
+    if response is not None:
+        await cache.set(key, json.dumps({"response": response}))
+    return response
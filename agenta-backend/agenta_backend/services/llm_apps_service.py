@@ -1,18 +1,105 @@
+import os
+import time
 import json
 import logging
 import asyncio
+import weakref
 import traceback
 import aiohttp
-from typing import Any, Dict, List
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 
 from agenta_backend.models.shared_models import InvokationResult, Result, Error
 from agenta_backend.utils import common
+from agenta_backend.utils.concurrency import AdaptiveConcurrencyLimiter, TokenBucket
 
 # Set logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Configure the connection pool used to invoke the llm apps
+APP_CLIENT_POOL_ENABLED = os.environ.get(
+    "AGENTA_APP_CLIENT_POOL_ENABLED", "true"
+).lower() in ["true", "1"]
+APP_CLIENT_POOL_SIZE = int(os.environ.get("AGENTA_APP_CLIENT_POOL_SIZE", 100))
+APP_CLIENT_POOL_SIZE_PER_HOST = int(
+    os.environ.get("AGENTA_APP_CLIENT_POOL_SIZE_PER_HOST", 50)
+)
+APP_CLIENT_KEEPALIVE_TIMEOUT = float(
+    os.environ.get("AGENTA_APP_CLIENT_KEEPALIVE_TIMEOUT", 30)
+)
+
+# HTTP status codes with which an llm app (or its provider) signals that it is overloaded.
+# 500 is left out since it is what apps return when the user code raises an exception.
+OVERLOAD_STATUS_CODES = [429, 502, 503, 504]
+
+# One client session per event loop, shared by all the invocations of the worker process
+_client_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_client_session() -> aiohttp.ClientSession:
+    """
+    Returns the client session shared by the llm apps invocations of the running event loop.
+
+    The session keeps its connections alive between requests and limits the number
+    of connections opened to each host, so that invoking an app for every row of a
+    testset does not open (and leave in TIME_WAIT) one socket per row.
+
+    Returns:
+        aiohttp.ClientSession: The shared client session.
+    """
+
+    loop = asyncio.get_running_loop()
+    session = _client_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=APP_CLIENT_POOL_SIZE,
+            limit_per_host=APP_CLIENT_POOL_SIZE_PER_HOST,
+            keepalive_timeout=APP_CLIENT_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _client_sessions[loop] = session
+    return session
+
+
+async def close_client_session() -> None:
+    """
+    Closes the client session shared by the llm apps invocations of the running event loop.
+    """
+
+    session = _client_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yields the client session to use for a request to an llm app.
+
+    The shared client session is used unless the pool is disabled, in which
+    case a new client session is opened (and closed) for the request.
+    """
+
+    if not APP_CLIENT_POOL_ENABLED:
+        async with aiohttp.ClientSession() as client:
+            yield client
+    else:
+        yield get_client_session()
+
 
 def extract_result_from_response(response):
     value = None
@@ -105,14 +192,17 @@ async def invoke_app(
     """
     url = f"{uri}/generate"
     payload = await make_payload(datapoint, parameters, openapi_parameters)
-    async with aiohttp.ClientSession() as client:
+    async with app_client() as client:
         app_response = {}
+        status_code = None
 
         try:
             logger.debug(f"Invoking app {uri} with payload {payload}")
-            response = await client.post(url, json=payload, timeout=900)
-            app_response = await response.json()
-            response.raise_for_status()
+            async with client.post(
+                url, json=payload, timeout=aiohttp.ClientTimeout(total=900)
+            ) as response:
+                app_response = await response.json()
+                response.raise_for_status()
 
             value, kind, cost, latency = extract_result_from_response(app_response)
 
@@ -124,9 +214,11 @@ async def invoke_app(
                 ),
                 latency=latency,
                 cost=cost,
+                status_code=response.status,
             )
 
         except aiohttp.ClientResponseError as e:
+            status_code = e.status
             error_message = app_response.get("detail", {}).get(
                 "error", f"HTTP error {e.status}: {e.message}"
             )
@@ -163,7 +255,8 @@ async def invoke_app(
                     message=error_message,
                     stacktrace=stacktrace,
                 ),
-            )
+            ),
+            status_code=status_code,
         )
 
 
@@ -227,73 +320,177 @@ async def run_with_retry(
     )
 
 
-async def batch_invoke(
-    uri: str, testset_data: List[Dict], parameters: Dict, rate_limit_config: Dict
-) -> List[InvokationResult]:
+def create_invocation_scheduler(
+    rate_limit_config: Dict,
+) -> Tuple[AdaptiveConcurrencyLimiter, Optional[TokenBucket]]:
     """
-    Invokes the LLm apps in batches, processing the testset data.
+    Creates the concurrency limiter and the rate limiter of an invocation run from its rate limit configuration.
+
+    For backward compatibility, `batch_size` is used as the initial (and, unless
+    `max_concurrency` is set, maximum) number of concurrent invocations, and
+    `delay_between_batches` caps the request rate to `batch_size` requests per
+    `delay_between_batches` seconds unless `requests_per_second` is set.
+
+    Args:
+        rate_limit_config (Dict): The rate limit configuration.
+
+    Returns:
+        Tuple[AdaptiveConcurrencyLimiter, Optional[TokenBucket]]: The concurrency limiter and
+        the rate limiter, if the request rate is limited.
+    """
+
+    batch_size = max(rate_limit_config["batch_size"], 1)
+    max_concurrency = rate_limit_config.get("max_concurrency") or batch_size
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=min(batch_size, max_concurrency), max_limit=max_concurrency
+    )
+
+    requests_per_second = rate_limit_config.get("requests_per_second")
+    delay_between_batches = rate_limit_config["delay_between_batches"]
+    if not requests_per_second and delay_between_batches > 0:
+        requests_per_second = batch_size / delay_between_batches
+
+    token_bucket = (
+        TokenBucket(rate=requests_per_second, capacity=batch_size)
+        if requests_per_second
+        else None
+    )
+    return limiter, token_bucket
+
+
+async def stream_invoke(
+    uri: str,
+    testset_data: Union[List[Dict], AsyncIterable[Dict]],
+    parameters: Dict,
+    rate_limit_config: Dict,
+) -> AsyncGenerator[Tuple[int, InvokationResult], None]:
+    """
+    Invokes the LLm app for the testset data and yields each output as soon as it is available.
+
+    Datapoints are invoked through a sliding window: a new invocation starts as soon
+    as one finishes, within the limits of an adaptive concurrency limiter and of a
+    token bucket rate limiter (see `create_invocation_scheduler`). The testset data
+    can be an async iterable (e.g. rows streamed from the database), in which case
+    datapoints are only read as fast as they are invoked.
+
+    Outputs are yielded as ``(index, result)`` tuples, where ``index`` is the position
+    of the datapoint in ``testset_data``. Outputs are yielded in completion order, so
+    consumers that need the testset order should use the index.
 
     Args:
         uri (str): The URI of the LLm app.
-        testset_data (List[Dict]): The testset data to be processed.
+        testset_data (Union[List[Dict], AsyncIterable[Dict]]): The testset data to be processed.
         parameters (Dict): The parameters for the LLm app.
         rate_limit_config (Dict): The rate limit configuration.
 
-    Returns:
-        List[InvokationResult]: The list of app outputs after running all batches.
+    Yields:
+        Tuple[int, InvokationResult]: The datapoint index and its app output.
     """
-    batch_size = rate_limit_config[
-        "batch_size"
-    ]  # Number of testset to make in each batch
     max_retries = rate_limit_config[
         "max_retries"
     ]  # Maximum number of times to retry the failed llm call
     retry_delay = rate_limit_config[
         "retry_delay"
     ]  # Delay before retrying the failed llm call (in seconds)
-    delay_between_batches = rate_limit_config[
-        "delay_between_batches"
-    ]  # Delay between batches (in seconds)
+    limiter, token_bucket = create_invocation_scheduler(rate_limit_config)
 
-    list_of_app_outputs: List[
-        InvokationResult
-    ] = []  # Outputs after running all batches
     openapi_parameters = await get_parameters_from_openapi(uri + "/openapi.json")
+    outputs_queue: asyncio.Queue = asyncio.Queue(maxsize=limiter.max_limit)
 
-    async def run_batch(start_idx: int):
-        tasks = []
-        print(f"Preparing {start_idx} batch...")
-        end_idx = min(start_idx + batch_size, len(testset_data))
-        for index in range(start_idx, end_idx):
-            task = asyncio.ensure_future(
-                run_with_retry(
-                    uri,
-                    testset_data[index],
-                    parameters,
-                    max_retries,
-                    retry_delay,
-                    openapi_parameters,
-                )
+    async def run_indexed(index: int, data_point: Dict):
+        try:
+            start_time = time.perf_counter()
+            result = await run_with_retry(
+                uri,
+                data_point,
+                parameters,
+                max_retries,
+                retry_delay,
+                openapi_parameters,
             )
-            tasks.append(task)
+            limiter.record(
+                latency=time.perf_counter() - start_time,
+                overloaded=result.status_code in OVERLOAD_STATUS_CODES,
+            )
+            await outputs_queue.put((index, result))
+        finally:
+            # The slot is only released once the output is queued, so that a slow
+            # consumer also slows down the invocations instead of piling up outputs
+            await limiter.release()
 
-        # Gather results of all tasks
-        results = await asyncio.gather(*tasks)
+    async def schedule_invocations():
+        try:
+            async for index, data_point in enumerate_testset_data(testset_data):
+                await limiter.acquire()
+                if token_bucket is not None:
+                    await token_bucket.acquire()
+                invocation = asyncio.ensure_future(run_indexed(index, data_point))
+                invocations.add(invocation)
+                invocation.add_done_callback(invocations.discard)
+            await asyncio.gather(*invocations)
+        except Exception:
+            await outputs_queue.put(None)
+            raise
+        await outputs_queue.put(None)  # No more outputs are coming
+
+    invocations: Set[asyncio.Future] = set()
+    scheduler = asyncio.ensure_future(schedule_invocations())
+    try:
+        while True:
+            item = await outputs_queue.get()
+            if item is None:
+                break
+            yield item
+        await scheduler  # Raises the error of the testset data source, if any
+    finally:
+        # Make sure that no invocation outlives a consumer that stopped early
+        scheduler.cancel()
+        for invocation in list(invocations):
+            invocation.cancel()
+
+
+async def enumerate_testset_data(
+    testset_data: Union[List[Dict], AsyncIterable[Dict]]
+) -> AsyncGenerator[Tuple[int, Dict], None]:
+    """
+    Enumerates the datapoints of a testset given as a list or as an async iterable.
+    """
+
+    if isinstance(testset_data, AsyncIterable):
+        index = 0
+        async for data_point in testset_data:
+            yield index, data_point
+            index += 1
+    else:
+        for index, data_point in enumerate(testset_data):
+            yield index, data_point
+
+
+async def batch_invoke(
+    uri: str, testset_data: List[Dict], parameters: Dict, rate_limit_config: Dict
+) -> List[InvokationResult]:
+    """
+    Invokes the LLm apps in batches, processing the testset data.
 
-        for result in results:
-            list_of_app_outputs.append(result)
-            print(f"Adding outputs to batch {start_idx}")
+    Args:
+        uri (str): The URI of the LLm app.
+        testset_data (List[Dict]): The testset data to be processed.
+        parameters (Dict): The parameters for the LLm app.
+        rate_limit_config (Dict): The rate limit configuration.
 
-        # Schedule the next batch with a delay
-        next_batch_start_idx = end_idx
-        if next_batch_start_idx < len(testset_data):
-            await asyncio.sleep(delay_between_batches)
-            await run_batch(next_batch_start_idx)
+    Returns:
+        List[InvokationResult]: The list of app outputs after running all batches.
+    """
 
-    # Start the first batch
-    await run_batch(0)
+    list_of_app_outputs: List[Optional[InvokationResult]] = [None] * len(
+        testset_data
+    )  # Outputs after running all batches, in testset order
+    async for index, result in stream_invoke(
+        uri, testset_data, parameters, rate_limit_config
+    ):
+        list_of_app_outputs[index] = result
 
-    return list_of_app_outputs
+    return list_of_app_outputs  # type: ignore
 
 
 async def get_parameters_from_openapi(uri: str) -> List[Dict]:
@@ -342,8 +539,8 @@ async def get_parameters_from_openapi(uri: str) -> List[Dict]:
 
 
 async def _get_openai_json_from_uri(uri):
-    async with aiohttp.ClientSession() as client:
-        resp = await client.get(uri, timeout=5)
-        resp_text = await resp.text()
+    async with app_client() as client:
+        async with client.get(uri, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            resp_text = await resp.text()
         json_data = json.loads(resp_text)
         return json_data
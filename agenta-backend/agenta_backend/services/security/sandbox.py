@@ -1,4 +1,17 @@
-from typing import Union, Text, Dict, Any
+import os
+import sys
+import time
+import signal
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from types import CodeType
+from typing import Union, Text, Dict, Any, Optional
+
+import billiard
+from billiard.pool import Pool
+from billiard.exceptions import TimeoutError as PoolTimeoutError
 
 from RestrictedPython import safe_builtins, compile_restricted, utility_builtins
 from RestrictedPython.Eval import (
@@ -10,6 +23,25 @@ from RestrictedPython.Guards import (
     full_write_guard,
 )
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Number of compiled evaluator codes kept in memory (least recently used are evicted)
+SANDBOX_CODE_CACHE_SIZE = int(os.environ.get("AGENTA_SANDBOX_CODE_CACHE_SIZE", "128"))
+# Number of worker processes running the custom code (0 runs it in the calling thread)
+SANDBOX_PROCESS_POOL_SIZE = int(os.environ.get("AGENTA_SANDBOX_PROCESS_POOL_SIZE", "0"))
+# Maximum duration of a custom code evaluation, in seconds
+SANDBOX_TIMEOUT = float(os.environ.get("AGENTA_SANDBOX_TIMEOUT", "30"))
+
+ALLOWED_IMPORTS = [
+    "math",
+    "random",
+    "datetime",
+    "json",
+    "requests",
+    "numpy",
+]
+
 
 def is_import_safe(python_code: Text) -> bool:
     """Checks if the imports in the python code contains a system-level import.
@@ -28,68 +60,111 @@ def is_import_safe(python_code: Text) -> bool:
     return True
 
 
-def execute_code_safely(
+class SandboxTimeoutError(Exception):
+    """Raised when custom code runs longer than the sandbox timeout."""
+
+
+_builtins: Optional[Dict[str, Any]] = None
+_builtins_lock = threading.Lock()
+
+
+def get_restricted_builtins() -> Dict[str, Any]:
+    """
+    Returns the built-ins available to the restricted code, built once per process.
+
+    Returns:
+        Dict[str, Any]: The safe built-ins, the allowed modules and the utility built-ins.
+    """
+
+    global _builtins
+    if _builtins is None:
+        with _builtins_lock:
+            if _builtins is None:
+                # Define the available built-ins
+                local_builtins = safe_builtins.copy()
+
+                # Add the __import__ built-in function to the local builtins
+                local_builtins["__import__"] = __import__
+
+                # Add the allowed modules to the local built-ins
+                for package_name in ALLOWED_IMPORTS:
+                    local_builtins[package_name] = __import__(package_name)
+                local_builtins.update(utility_builtins)
+                _builtins = local_builtins
+    return _builtins
+
+
+class CompiledCodeCache:
+    """
+    LRU cache of restricted bytecode, keyed by the SHA-256 hash of the source code.
+
+    The code of a custom code evaluator is the same for every datapoint of an
+    evaluation, so it only needs to be compiled once.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CodeType]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: Text) -> CodeType:
+        """
+        Returns the compiled bytecode of the code, compiling it on a cache miss.
+
+        Args:
+            code (Text): The Python code.
+
+        Returns:
+            CodeType: The restricted bytecode.
+        """
+
+        key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        with self._lock:
+            byte_code = self._entries.get(key)
+            if byte_code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return byte_code
+
+        # Compile the code in a restricted environment
+        byte_code = compile_restricted(code, filename="<inline>", mode="exec")
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = byte_code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return byte_code
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+compiled_code_cache = CompiledCodeCache(max_size=SANDBOX_CODE_CACHE_SIZE)
+
+
+def _run_code(
     app_params: Dict[str, str],
     inputs: Dict[str, str],
     output: Union[str, Dict[str, Any]],
-    correct_answer: str,  # for backward compatibility reasons
+    correct_answer: str,
     code: Text,
     datapoint: Dict[str, str],
 ) -> Union[float, None]:
-    """
-    Execute the provided Python code safely using RestrictedPython.
-
-    Args:
-        - app_params (Dict[str, str]): The parameters of the app variant.
-        - inputs (dict): Inputs to be used during code execution.
-        - output (str): The output of the app variant after being called.
-        - correct_answer (str): The correct answer (or target) of the app variant.
-        - code (Text): The Python code to be executed.
-        - datapoint (Dict[str, str]): The test datapoint.
-
-    Returns:
-    - (float): Result of the execution if successful. Should be between 0 and 1.
-    - None if execution fails or result is not a float between 0 and 1.
-    """
-    # Define the available built-ins
-    local_builtins = safe_builtins.copy()
-
-    # Add the __import__ built-in function to the local builtins
-    local_builtins["__import__"] = __import__
-
-    # Define supported packages
-    allowed_imports = [
-        "math",
-        "random",
-        "datetime",
-        "json",
-        "requests",
-        "numpy",
-    ]
-
-    # Create a dictionary to simulate allowed imports
-    allowed_modules = {}
-    for package_name in allowed_imports:
-        allowed_modules[package_name] = __import__(package_name)
-
-    # Add the allowed modules to the local built-ins
-    local_builtins.update(allowed_modules)
-    local_builtins.update(utility_builtins)
-
     # Define the environment for the code execution
     environment = {
         "_getiter_": default_guarded_getiter,
         "_getitem_": default_guarded_getitem,
         "_iter_unpack_sequence_": guarded_iter_unpack_sequence,
         "_write_": full_write_guard,
-        "__builtins__": local_builtins,
+        "__builtins__": get_restricted_builtins(),
     }
 
-    # Compile the code in a restricted environment
-    byte_code = compile_restricted(code, filename="<inline>", mode="exec")
-
     # Execute the code
-    exec(byte_code, environment)
+    exec(compiled_code_cache.get(code), environment)
 
     # Call the evaluation function, extract the result if it exists
     # and is a float between 0 and 1
@@ -99,8 +174,158 @@ def execute_code_safely(
             return result
         else:
             raise ValueError("Result is not a float between 0 and 1.")
+    except SandboxTimeoutError:
+        raise
     except Exception as e:
         result = environment["evaluate"](app_params, inputs, output, datapoint)
         if isinstance(result, float) and 0 <= result <= 1:
             return result
         return None
+
+
+def _timeout_error() -> SandboxTimeoutError:
+    return SandboxTimeoutError(
+        f"The custom code evaluation took more than {SANDBOX_TIMEOUT} seconds."
+    )
+
+
+def _raise_timeout(signum, frame):
+    raise _timeout_error()
+
+
+def _run_code_with_alarm(timeout: float, *args) -> Union[float, None]:
+    """
+    Runs the code in a pool worker process, interrupted with SIGALRM after `timeout` seconds.
+    """
+
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _run_code(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _run_code_with_trace(timeout: float, *args) -> Union[float, None]:
+    """
+    Runs the code in the calling thread, interrupted after `timeout` seconds.
+
+    Signals can only interrupt the main thread, so the lines of the custom code are
+    traced instead and the first line run after the deadline raises the timeout. Blocking
+    calls of the allowed modules (e.g. a request) are not interrupted.
+    """
+
+    deadline = time.monotonic() + timeout
+
+    def trace_lines(frame, event, arg):
+        if time.monotonic() > deadline:
+            raise _timeout_error()
+        return trace_lines
+
+    def trace_calls(frame, event, arg):
+        if frame.f_code.co_filename == "<inline>":
+            return trace_lines(frame, event, arg)
+        return None
+
+    previous_trace = sys.gettrace()
+    sys.settrace(trace_calls)
+    try:
+        return _run_code(*args)
+    finally:
+        sys.settrace(previous_trace)
+
+
+_process_pool: Optional[Pool] = None
+_process_pool_pid: Optional[int] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[Pool]:
+    """
+    Returns the process pool of the current process, if enabled with AGENTA_SANDBOX_PROCESS_POOL_SIZE.
+
+    The pool is a billiard pool (the multiprocessing fork used by Celery), which unlike the
+    pools of the standard library can be started from the daemonic processes of the
+    prefork Celery workers.
+
+    Returns:
+        Optional[Pool]: The pool, or None when custom code runs in the calling thread.
+    """
+
+    global _process_pool, _process_pool_pid
+    if SANDBOX_PROCESS_POOL_SIZE <= 0:
+        return None
+
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_pid != os.getpid():
+            _process_pool = Pool(
+                processes=SANDBOX_PROCESS_POOL_SIZE,
+                initializer=get_restricted_builtins,
+                context=billiard.get_context("spawn"),
+            )
+            _process_pool_pid = os.getpid()
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """
+    Stops the worker processes of the process pool, if it was started.
+    """
+
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_pid == os.getpid():
+            _process_pool.terminate()
+        _process_pool = None
+
+
+def execute_code_safely(
+    app_params: Dict[str, str],
+    inputs: Dict[str, str],
+    output: Union[str, Dict[str, Any]],
+    correct_answer: str,  # for backward compatibility reasons
+    code: Text,
+    datapoint: Dict[str, str],
+) -> Union[float, None]:
+    """
+    Execute the provided Python code safely using RestrictedPython.
+
+    The restricted bytecode is cached by code hash. When AGENTA_SANDBOX_PROCESS_POOL_SIZE
+    is set, the code runs in a pool of worker processes (so that evaluations run in
+    parallel across cores), otherwise in the calling thread. In both cases it is
+    interrupted after AGENTA_SANDBOX_TIMEOUT seconds.
+
+    Args:
+        - app_params (Dict[str, str]): The parameters of the app variant.
+        - inputs (dict): Inputs to be used during code execution.
+        - output (str): The output of the app variant after being called.
+        - correct_answer (str): The correct answer (or target) of the app variant.
+        - code (Text): The Python code to be executed.
+        - datapoint (Dict[str, str]): The test datapoint.
+
+    Returns:
+    - (float): Result of the execution if successful. Should be between 0 and 1.
+    - None if execution fails or result is not a float between 0 and 1.
+
+    Raises:
+        SandboxTimeoutError: If the code times out.
+    """
+
+    args = (app_params, inputs, output, correct_answer, code, datapoint)
+    try:
+        pool = get_process_pool()
+    except Exception:  # pylint: disable=broad-except
+        # e.g. too many open files, the next call tries to start the pool again
+        logger.exception("Could not start the sandbox process pool")
+        pool = None
+    if pool is None:
+        return _run_code_with_trace(SANDBOX_TIMEOUT, *args)
+
+    result = pool.apply_async(_run_code_with_alarm, (SANDBOX_TIMEOUT, *args))
+    try:
+        # The worker interrupts itself, the margin covers the inter-process overhead.
+        # A worker that dies (e.g. killed by the OOM killer) is replaced by the pool
+        # and its evaluation raises WorkerLostError.
+        return result.get(timeout=SANDBOX_TIMEOUT + 5)
+    except PoolTimeoutError:
+        raise _timeout_error()
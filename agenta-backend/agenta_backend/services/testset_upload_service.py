@@ -0,0 +1,271 @@
+import os
+import csv
+import json
+import codecs
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from fastapi import UploadFile
+
+
+# Uploads bigger than this are rejected while they are being read
+TESTSET_UPLOAD_MAX_SIZE = int(
+    os.environ.get("AGENTA_TESTSET_UPLOAD_MAX_SIZE", str(100 * 1024 * 1024))
+)
+TESTSET_UPLOAD_CHUNK_SIZE = 64 * 1024
+# Incomplete JSON rows up to this size are decoded again as soon as a closing brace
+# or bracket arrives, bigger ones only once their size doubled
+JSON_ROW_EAGER_DECODE_SIZE = 64 * 1024
+
+
+class TestsetUploadTooLargeError(Exception):
+    """Raised when an uploaded testset exceeds the maximum upload size."""
+
+    def __init__(self, max_size: int):
+        super().__init__(
+            f"The testset file exceeds the maximum size of {max_size} bytes"
+        )
+        self.max_size = max_size
+
+
+class TestsetUploadFormatError(ValueError):
+    """Raised when an uploaded testset cannot be parsed."""
+
+
+async def read_upload_chunks(
+    file: UploadFile,
+    max_size: int = TESTSET_UPLOAD_MAX_SIZE,
+    chunk_size: int = TESTSET_UPLOAD_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Reads an uploaded file chunk by chunk and decodes it as UTF-8.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_size (int): The maximum number of bytes to read.
+        chunk_size (int): The number of bytes to read at once.
+        on_progress (Callable[[int, Optional[int]], None], optional): Called after each chunk
+            with the number of bytes read so far and the size of the file, if known.
+
+    Yields:
+        str: The decoded chunks of the file.
+
+    Raises:
+        TestsetUploadTooLargeError: If the file is bigger than max_size.
+        TestsetUploadFormatError: If the file is not valid UTF-8.
+    """
+
+    if file.size is not None and file.size > max_size:
+        raise TestsetUploadTooLargeError(max_size)
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    bytes_read = 0
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            bytes_read += len(chunk)
+            if bytes_read > max_size:
+                raise TestsetUploadTooLargeError(max_size)
+
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                yield text
+            if on_progress is not None:
+                on_progress(bytes_read, file.size)
+            if not chunk:
+                return
+    except UnicodeDecodeError as e:
+        raise TestsetUploadFormatError(f"The testset file is not valid UTF-8: {e}")
+
+
+async def parse_csv_rows(chunks: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parses CSV rows incrementally, with the first row as header (like csv.DictReader).
+
+    Only complete records are handed to the CSV reader: a record ends at a line break
+    outside of a quoted field, i.e. once the number of quotes read since the start of
+    the record is even.
+
+    Args:
+        chunks (AsyncIterator[str]): The chunks of the CSV text.
+
+    Yields:
+        Dict[str, Any]: The rows, keyed by column name.
+    """
+
+    lines: Deque[str] = deque()
+    reader = csv.DictReader(_LineFeed(lines))
+    record: List[str] = []
+    quotes = 0
+    remainder = ""
+
+    def add_line(line: str) -> None:
+        nonlocal quotes
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            lines.extend(record)
+            record.clear()
+            quotes = 0
+
+    try:
+        async for chunk in chunks:
+            *complete_lines, remainder = (remainder + chunk).split("\n")
+            for line in complete_lines:
+                add_line(line + "\n")
+            for row in reader:
+                yield row
+
+        if remainder:
+            add_line(remainder)
+        if record:
+            lines.extend(record)  # Unterminated quoted field, left to the CSV reader
+        for row in reader:
+            yield row
+    except csv.Error as e:
+        raise TestsetUploadFormatError(f"The testset file is not valid CSV: {e}")
+
+
+class _LineFeed:
+    """
+    Iterator over a queue of lines that can be refilled after being exhausted.
+    """
+
+    def __init__(self, lines: Deque[str]):
+        self.lines = lines
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def parse_json_rows(chunks: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """
+    Parses JSON rows incrementally, from either a JSON array or newline-delimited JSON.
+
+    A row spanning several chunks is not decoded again after every chunk, which would
+    be quadratic in its size (see JSON_ROW_EAGER_DECODE_SIZE).
+
+    Args:
+        chunks (AsyncIterator[str]): The chunks of the JSON text.
+
+    Yields:
+        Any: The rows (elements of the array, or values of the lines).
+
+    Raises:
+        TestsetUploadFormatError: If the text is not a JSON array nor NDJSON.
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    is_array: Optional[bool] = None
+    finished = False
+    expects_comma = False  # An array element was decoded, a , or ] must follow
+    expects_element = False  # A , was read, an array element must follow
+    retry_size = 0  # The size the buffer must reach to decode an incomplete row again
+
+    def skip(characters: str) -> None:
+        nonlocal position
+        while position < len(buffer) and buffer[position] in characters:
+            position += 1
+
+    def format_error(message: str) -> TestsetUploadFormatError:
+        return TestsetUploadFormatError(
+            f"The testset file is not valid JSON: {message}"
+        )
+
+    def decode_rows(final: bool) -> List[Any]:
+        nonlocal position, is_array, finished, expects_comma, expects_element
+        nonlocal retry_size
+        rows = []
+        while not finished:
+            skip(" \t\r\n")
+            if position == len(buffer):
+                break
+
+            if is_array is None:
+                is_array = buffer[position] == "["
+                if is_array:
+                    position += 1
+                continue
+
+            if is_array:
+                if buffer[position] == "]" and not expects_element:
+                    finished = True
+                    break
+                if expects_comma:
+                    if buffer[position] != ",":
+                        raise format_error(f"expected , or ] at {buffer[position]!r}")
+                    position += 1
+                    expects_comma, expects_element = False, True
+                    continue
+                if buffer[position] in ",]":
+                    raise format_error(f"expected a value at {buffer[position]!r}")
+
+            try:
+                row, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise format_error(str(e))
+                # The row continues in the next chunks
+                retry_size = 2 * (len(buffer) - position)
+                break
+
+            if end == len(buffer) and not final:
+                break  # A number could continue in the next chunk
+            rows.append(row)
+            position = end
+            expects_comma, expects_element = bool(is_array), False
+        return rows
+
+    async for chunk in chunks:
+        buffer = buffer[position:] + chunk
+        position = 0
+        if len(buffer) < retry_size and (
+            len(buffer) > JSON_ROW_EAGER_DECODE_SIZE
+            or ("}" not in chunk and "]" not in chunk)
+        ):
+            continue  # Wait for more of the incomplete row before decoding it again
+        retry_size = 0
+        for row in decode_rows(final=False):
+            yield row
+
+    for row in decode_rows(final=True):
+        yield row
+    if is_array and not finished:
+        raise format_error("missing ]")
+
+
+async def stream_testset_rows(
+    file: UploadFile,
+    upload_type: Optional[str],
+    max_size: int = TESTSET_UPLOAD_MAX_SIZE,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streams the rows of an uploaded testset file without loading the whole file.
+
+    Args:
+        file (UploadFile): The uploaded CSV, JSON or NDJSON file.
+        upload_type (str, optional): "JSON" for JSON and NDJSON files, CSV otherwise.
+        max_size (int): The maximum size of the file, in bytes.
+        on_progress (Callable[[int, Optional[int]], None], optional): See read_upload_chunks.
+
+    Yields:
+        Dict[str, Any]: The rows of the testset.
+    """
+
+    chunks = read_upload_chunks(file, max_size=max_size, on_progress=on_progress)
+    if upload_type == "JSON":
+        rows = parse_json_rows(chunks)
+    else:
+        rows = parse_csv_rows(chunks)
+
+    async for row in rows:
+        yield row
@@ -1,9 +1,11 @@
+import os
 import asyncio
 import logging
 import traceback
-from typing import Any, Dict, List
+from typing import Any, AsyncIterable, Dict, List, Tuple, Union
 
 from celery import shared_task, states
+from celery.signals import worker_process_shutdown
 
 from agenta_backend.utils.common import isCloudEE
 from agenta_backend.services import (
@@ -12,7 +14,10 @@ from agenta_backend.services import (
     deployment_manager,
     aggregation_service,
 )
-from agenta_backend.models.api.evaluation_model import EvaluationStatusEnum
+from agenta_backend.models.api.evaluation_model import (
+    EvaluationStatusEnum,
+    LLMJudgeCacheStats,
+)
 from agenta_backend.models.shared_models import (
     AggregatedResult,
     CorrectAnswer,
@@ -22,31 +27,50 @@ from agenta_backend.models.shared_models import (
     InvokationResult,
     Error,
     Result,
+    TestsetStorageMode,
 )
 from agenta_backend.services.db_manager import (
-    create_new_evaluation_scenario,
+    create_new_evaluation_scenarios,
     fetch_app_by_id,
     fetch_app_variant_by_id,
     fetch_evaluation_by_id,
     fetch_evaluator_config,
     fetch_testset_by_id,
+    fetch_testset_csvdata,
+    iterate_testset_rows,
     get_deployment_by_id,
     update_evaluation,
     update_evaluation_with_aggregated_results,
     EvaluationScenarioResult,
     check_if_evaluation_contains_failed_evaluation_scenarios,
 )
+from agenta_backend.services.security import sandbox
 from agenta_backend.services.evaluator_manager import get_evaluators
+from agenta_backend.services.judge_cache_service import llm_judge_cache_stats
 
 if isCloudEE():
-    from agenta_backend.commons.models.db_models import AppDB_ as AppDB
+    from agenta_backend.commons.models.db_models import (
+        AppDB_ as AppDB,
+        EvaluatorConfigDB_ as EvaluatorConfigDB,
+    )
 else:
-    from agenta_backend.models.db_models import AppDB
+    from agenta_backend.models.db_models import AppDB, EvaluatorConfigDB
 
 # Set logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Configure the evaluation pipeline
+EVALUATION_PIPELINE_ENABLED = os.environ.get(
+    "AGENTA_EVALUATION_PIPELINE_ENABLED", "true"
+).lower() in ["true", "1"]
+EVALUATION_QUEUE_SIZE = int(os.environ.get("AGENTA_EVALUATION_QUEUE_SIZE", 100))
+EVALUATION_WORKERS = int(os.environ.get("AGENTA_EVALUATION_WORKERS", 32))
+EVALUATION_WRITE_BATCH_SIZE = int(
+    os.environ.get("AGENTA_EVALUATION_WRITE_BATCH_SIZE", 100)
+)
+EVALUATION_WINDOW_SIZE = int(os.environ.get("AGENTA_EVALUATION_WINDOW_SIZE", 1000))
+
 # Fetch all evaluators and precompute ground truth keys
 all_evaluators = get_evaluators()
 ground_truth_keys_dict = {
@@ -89,6 +113,10 @@ def evaluate(
 
     loop = asyncio.get_event_loop()
 
+    # Count the LLM judge calls answered from the cache during this evaluation
+    judge_cache_stats = LLMJudgeCacheStats()
+    llm_judge_cache_stats.set(judge_cache_stats)
+
     try:
         # 0. Update evaluation status to STARTED
         loop.run_until_complete(
@@ -131,164 +159,98 @@ def evaluate(
             for evaluator_config_db in evaluator_config_dbs
         }
 
-        # 3. Invoke the app
-        app_outputs: List[InvokationResult] = loop.run_until_complete(
-            llm_apps_service.batch_invoke(
-                uri,
-                testset_db.csvdata,  # type: ignore
-                app_variant_parameters,  # type: ignore
-                rate_limit_config,
-            )
-        )
-
-        # 4. Evaluate the app outputs
+        # 3. Invoke the app and evaluate its outputs
         openapi_parameters = loop.run_until_complete(
             llm_apps_service.get_parameters_from_openapi(uri + "/openapi.json")
         )
+        list_inputs = get_app_inputs(app_variant_parameters, openapi_parameters)
+        logger.debug(f"List of inputs: {list_inputs}")
+
+        scenario_context = {
+            "user_id": str(app.user_id),
+            "evaluation_id": evaluation_id,
+            "variant_id": variant_id,
+            "organization": str(app.organization_id) if isCloudEE() else None,
+            "workspace": str(app.workspace_id) if isCloudEE() else None,
+        }
 
-        for data_point, app_output in zip(testset_db.csvdata, app_outputs):  # type: ignore
-            # 1. We prepare the inputs
-            logger.debug(f"Preparing inputs for data point: {data_point}")
-            list_inputs = get_app_inputs(app_variant_parameters, openapi_parameters)
-            logger.debug(f"List of inputs: {list_inputs}")
-
-            inputs = [
-                EvaluationScenarioInput(
-                    name=input_item["name"],
-                    type="text",
-                    value=data_point.get(
-                        (
-                            input_item["name"]
-                            if input_item["type"] != "messages"
-                            else "chat"
-                        ),
-                        "",
-                    ),  # TODO: We need to remove the hardcoding of chat as name for chat inputs from the FE
+        if EVALUATION_PIPELINE_ENABLED:
+            # Testsets stored in rows mode are streamed instead of being fully loaded
+            if testset_db.storage_mode == TestsetStorageMode.ROWS.value:
+                testset_data = iterate_testset_rows(testset_id)
+            else:
+                testset_data = testset_db.csvdata
+
+            app_outputs = loop.run_until_complete(
+                run_evaluation_pipeline(
+                    uri=uri,
+                    testset_data=testset_data,  # type: ignore
+                    app_variant_parameters=app_variant_parameters,  # type: ignore
+                    list_inputs=list_inputs,
+                    rate_limit_config=rate_limit_config,
+                    evaluator_config_dbs=evaluator_config_dbs,
+                    evaluators_aggregated_data=evaluators_aggregated_data,
+                    lm_providers_keys=lm_providers_keys,
+                    scenario_context=scenario_context,
                 )
-                for input_item in list_inputs
-            ]
-            logger.debug(f"Inputs: {inputs}")
-
-            # 2. We skip the iteration if error invking the llm-app
-            if app_output.result.error:
-                print("There is an error when invoking the llm app so we need to skip")
-                error_results = [
-                    EvaluationScenarioResult(
-                        evaluator_config=str(evaluator_config_db.id),
-                        result=Result(
-                            type=app_output.result.type,
-                            value=None,
-                            error=Error(
-                                message=app_output.result.error.message,
-                                stacktrace=app_output.result.error.stacktrace,
-                            ),
-                        ),
-                    )
-                    for evaluator_config_db in evaluator_config_dbs
-                ]
-
-                loop.run_until_complete(
-                    create_new_evaluation_scenario(
-                        user_id=str(app.user_id),
-                        evaluation_id=evaluation_id,
-                        variant_id=variant_id,
-                        inputs=inputs,
-                        outputs=[
-                            EvaluationScenarioOutput(
-                                result=Result(
-                                    type="error",
-                                    value=None,
-                                    error=Error(
-                                        message=app_output.result.error.message,
-                                        stacktrace=app_output.result.error.stacktrace,
-                                    ),
-                                )
-                            )
-                        ],
-                        correct_answers=None,
-                        is_pinned=False,
-                        note="",
-                        results=error_results,
-                        organization=str(app.organization_id) if isCloudEE() else None,
-                        workspace=str(app.workspace_id) if isCloudEE() else None,
-                    )
+            )
+        else:
+            testset_data = loop.run_until_complete(fetch_testset_csvdata(testset_db))
+            app_outputs = loop.run_until_complete(
+                llm_apps_service.batch_invoke(
+                    uri,
+                    testset_data,
+                    app_variant_parameters,  # type: ignore
+                    rate_limit_config,
                 )
-                continue
-
-            # 3. We evaluate
-            evaluators_results: List[EvaluationScenarioResult] = []
+            )
 
-            # Loop over each evaluator configuration to gather the correct answers and evaluate
-            ground_truth_column_names = []
-            for evaluator_config_db in evaluator_config_dbs:
-                ground_truth_keys = ground_truth_keys_dict.get(
-                    evaluator_config_db.evaluator_key, []
+            # The data points of a batch are evaluated concurrently
+            for start in range(0, len(testset_data), EVALUATION_WRITE_BATCH_SIZE):
+                batch = list(
+                    zip(
+                        testset_data[start : start + EVALUATION_WRITE_BATCH_SIZE],
+                        app_outputs[start : start + EVALUATION_WRITE_BATCH_SIZE],
+                    )
                 )
-                ground_truth_column_names.extend(
-                    evaluator_config_db.settings_values.get(key, "")
-                    for key in ground_truth_keys
+                evaluation_scenarios = loop.run_until_complete(
+                    asyncio.gather(
+                        *[
+                            evaluate_app_output(
+                                data_point=data_point,
+                                app_output=app_output,
+                                list_inputs=list_inputs,
+                                evaluator_config_dbs=evaluator_config_dbs,
+                                app_variant_parameters=app_variant_parameters,  # type: ignore
+                                lm_providers_keys=lm_providers_keys,
+                                skip_batch_evaluators=True,
+                            )
+                            for data_point, app_output in batch
+                        ]
+                    )
                 )
-                logger.debug(f"Evaluating with evaluator: {evaluator_config_db}")
-
-                result = evaluators_service.evaluate(
-                    evaluator_key=evaluator_config_db.evaluator_key,
-                    output=app_output.result.value,
-                    data_point=data_point,
-                    settings_values=evaluator_config_db.settings_values,
-                    app_params=app_variant_parameters,  # type: ignore
-                    inputs=data_point,
-                    lm_providers_keys=lm_providers_keys,
+                loop.run_until_complete(
+                    add_batch_evaluators_results(
+                        data_points=[data_point for data_point, _ in batch],
+                        app_outputs=[app_output for _, app_output in batch],
+                        evaluation_scenarios=evaluation_scenarios,
+                        evaluator_config_dbs=evaluator_config_dbs,
+                        app_variant_parameters=app_variant_parameters,  # type: ignore
+                        lm_providers_keys=lm_providers_keys,
+                    )
                 )
+                for (_, app_output), evaluation_scenario in zip(
+                    batch, evaluation_scenarios
+                ):
+                    add_to_aggregated_data(
+                        evaluators_aggregated_data, app_output, evaluation_scenario
+                    )
 
-                # Update evaluators aggregated data
-                evaluator_results: List[Result] = evaluators_aggregated_data[
-                    str(evaluator_config_db.id)
-                ]["results"]
-                evaluator_results.append(result)
-
-                result_object = EvaluationScenarioResult(
-                    evaluator_config=str(evaluator_config_db.id),
-                    result=result,
-                )
-                logger.debug(f"Result: {result_object}")
-                evaluators_results.append(result_object)
-
-            all_correct_answers = [
-                (
-                    CorrectAnswer(
-                        key=ground_truth_column_name,
-                        value=data_point[ground_truth_column_name],
+                loop.run_until_complete(
+                    create_new_evaluation_scenarios(
+                        **scenario_context, evaluation_scenarios=evaluation_scenarios
                     )
-                    if ground_truth_column_name in data_point
-                    else CorrectAnswer(key=ground_truth_column_name, value="")
-                )
-                for ground_truth_column_name in ground_truth_column_names
-            ]
-
-            # 4. We save the result of the eval scenario in the db
-            loop.run_until_complete(
-                create_new_evaluation_scenario(
-                    user_id=str(app.user_id),
-                    evaluation_id=evaluation_id,
-                    variant_id=variant_id,
-                    inputs=inputs,
-                    outputs=[
-                        EvaluationScenarioOutput(
-                            result=Result(
-                                type="text", value=app_output.result.value["data"]
-                            ),
-                            latency=app_output.latency,
-                            cost=app_output.cost,
-                        )
-                    ],
-                    correct_answers=all_correct_answers,
-                    is_pinned=False,
-                    note="",
-                    results=evaluators_results,
-                    organization=str(app.organization_id) if isCloudEE() else None,
-                    workspace=str(app.workspace_id) if isCloudEE() else None,
                 )
-            )
 
         # Add average cost and latency
         average_latency = aggregation_service.aggregate_float_from_llm_app_response(
@@ -307,6 +269,7 @@ def evaluate(
                     "average_latency": average_latency.model_dump(),
                     "average_cost": average_cost.model_dump(),
                     "total_cost": total_cost.model_dump(),
+                    "llm_judge_cache": judge_cache_stats.model_dump(),
                 },
             )
         )
@@ -385,6 +348,426 @@ def evaluate(
         return
 
 
+async def evaluate_app_output(
+    data_point: Dict[str, Any],
+    app_output: InvokationResult,
+    list_inputs: List[Dict[str, str]],
+    evaluator_config_dbs: List[EvaluatorConfigDB],
+    app_variant_parameters: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+    skip_batch_evaluators: bool = False,
+) -> Dict[str, Any]:
+    """
+    Runs the evaluators on the output of the app for one data point, concurrently.
+
+    With skip_batch_evaluators, the evaluators of evaluators_service.BATCH_EVALUATORS
+    are left out, to be run on a batch of outputs by add_batch_evaluators_results.
+
+    Args:
+        data_point (Dict[str, Any]): The testset data point.
+        app_output (InvokationResult): The output of the app for the data point.
+        list_inputs (List[Dict[str, str]]): The inputs of the app, as returned by get_app_inputs.
+        evaluator_config_dbs (List[EvaluatorConfigDB]): The evaluators configurations.
+        app_variant_parameters (Dict[str, Any]): The parameters of the app variant.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+        skip_batch_evaluators (bool): Whether to leave out the evaluators that support batches.
+
+    Returns:
+        Dict[str, Any]: The fields of the evaluation scenario to create, i.e. inputs, outputs,
+        correct_answers, is_pinned, note and results.
+    """
+
+    # 1. We prepare the inputs
+    logger.debug(f"Preparing inputs for data point: {data_point}")
+    inputs = [
+        EvaluationScenarioInput(
+            name=input_item["name"],
+            type="text",
+            value=data_point.get(
+                (input_item["name"] if input_item["type"] != "messages" else "chat"),
+                "",
+            ),  # TODO: We need to remove the hardcoding of chat as name for chat inputs from the FE
+        )
+        for input_item in list_inputs
+    ]
+    logger.debug(f"Inputs: {inputs}")
+
+    # 2. We skip the evaluation if there was an error invoking the llm-app
+    if app_output.result.error:
+        logger.debug("There is an error when invoking the llm app so we need to skip")
+        error = Error(
+            message=app_output.result.error.message,
+            stacktrace=app_output.result.error.stacktrace,
+        )
+        return {
+            "inputs": inputs,
+            "outputs": [
+                EvaluationScenarioOutput(
+                    result=Result(type="error", value=None, error=error)
+                )
+            ],
+            "correct_answers": None,
+            "is_pinned": False,
+            "note": "",
+            "results": [
+                EvaluationScenarioResult(
+                    evaluator_config=str(evaluator_config_db.id),
+                    result=Result(type=app_output.result.type, value=None, error=error),
+                )
+                for evaluator_config_db in evaluator_config_dbs
+            ],
+        }
+
+    # 3. We evaluate
+    # Loop over each evaluator configuration to gather the correct answers
+    ground_truth_column_names = []
+    for evaluator_config_db in evaluator_config_dbs:
+        ground_truth_keys = ground_truth_keys_dict.get(
+            evaluator_config_db.evaluator_key, []
+        )
+        ground_truth_column_names.extend(
+            evaluator_config_db.settings_values.get(key, "")
+            for key in ground_truth_keys
+        )
+
+    row_evaluator_config_dbs = [
+        evaluator_config_db
+        for evaluator_config_db in evaluator_config_dbs
+        if not skip_batch_evaluators
+        or evaluator_config_db.evaluator_key not in evaluators_service.BATCH_EVALUATORS
+    ]
+    results = await asyncio.gather(
+        *[
+            evaluators_service.evaluate_async(
+                evaluator_key=evaluator_config_db.evaluator_key,
+                output=app_output.result.value,
+                data_point=data_point,
+                settings_values=evaluator_config_db.settings_values,
+                app_params=app_variant_parameters,
+                inputs=data_point,
+                lm_providers_keys=lm_providers_keys,
+            )
+            for evaluator_config_db in row_evaluator_config_dbs
+        ]
+    )
+    evaluators_results: List[EvaluationScenarioResult] = [
+        EvaluationScenarioResult(
+            evaluator_config=str(evaluator_config_db.id),
+            result=result,
+        )
+        for evaluator_config_db, result in zip(row_evaluator_config_dbs, results)
+    ]
+    logger.debug(f"Results: {evaluators_results}")
+
+    all_correct_answers = [
+        (
+            CorrectAnswer(
+                key=ground_truth_column_name,
+                value=data_point[ground_truth_column_name],
+            )
+            if ground_truth_column_name in data_point
+            else CorrectAnswer(key=ground_truth_column_name, value="")
+        )
+        for ground_truth_column_name in ground_truth_column_names
+    ]
+
+    return {
+        "inputs": inputs,
+        "outputs": [
+            EvaluationScenarioOutput(
+                result=Result(type="text", value=app_output.result.value["data"]),
+                latency=app_output.latency,
+                cost=app_output.cost,
+            )
+        ],
+        "correct_answers": all_correct_answers,
+        "is_pinned": False,
+        "note": "",
+        "results": evaluators_results,
+    }
+
+
+async def add_batch_evaluators_results(
+    data_points: List[Dict[str, Any]],
+    app_outputs: List[InvokationResult],
+    evaluation_scenarios: List[Dict[str, Any]],
+    evaluator_config_dbs: List[EvaluatorConfigDB],
+    app_variant_parameters: Dict[str, Any],
+    lm_providers_keys: Dict[str, Any],
+) -> None:
+    """
+    Runs the evaluators of evaluators_service.BATCH_EVALUATORS on a batch of app outputs
+    at once, and adds their results to the evaluation scenarios.
+
+    The CPU-bound batch evaluators run in a thread (see
+    evaluators_service.evaluate_batch_async), so that they do not stall the other stages
+    of the pipeline.
+
+    The scenarios are the ones returned by evaluate_app_output with skip_batch_evaluators;
+    their results are reordered like the evaluators configurations.
+
+    Args:
+        data_points (List[Dict[str, Any]]): The testset data point of each scenario.
+        app_outputs (List[InvokationResult]): The output of the app for each scenario.
+        evaluation_scenarios (List[Dict[str, Any]]): The evaluation scenarios to complete.
+        evaluator_config_dbs (List[EvaluatorConfigDB]): The evaluators configurations.
+        app_variant_parameters (Dict[str, Any]): The parameters of the app variant.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+    """
+
+    batch_evaluator_config_dbs = [
+        evaluator_config_db
+        for evaluator_config_db in evaluator_config_dbs
+        if evaluator_config_db.evaluator_key in evaluators_service.BATCH_EVALUATORS
+    ]
+    # Scenarios for which the app invocation failed already have their results
+    positions = [
+        position
+        for position, app_output in enumerate(app_outputs)
+        if not app_output.result.error
+    ]
+    if not batch_evaluator_config_dbs or not positions:
+        return
+
+    batch_data_points = [data_points[position] for position in positions]
+    batch_outputs = [app_outputs[position].result.value for position in positions]
+    results = await asyncio.gather(
+        *[
+            evaluators_service.evaluate_batch_async(
+                evaluator_key=evaluator_config_db.evaluator_key,
+                inputs=batch_data_points,
+                outputs=batch_outputs,
+                data_points=batch_data_points,
+                app_params=app_variant_parameters,
+                settings_values=evaluator_config_db.settings_values,
+                lm_providers_keys=lm_providers_keys,
+            )
+            for evaluator_config_db in batch_evaluator_config_dbs
+        ]
+    )
+    batch_results = {
+        str(evaluator_config_db.id): evaluator_results
+        for evaluator_config_db, evaluator_results in zip(
+            batch_evaluator_config_dbs, results
+        )
+    }
+
+    for batch_index, position in enumerate(positions):
+        evaluation_scenario = evaluation_scenarios[position]
+        row_results = {
+            result_object.evaluator_config: result_object
+            for result_object in evaluation_scenario["results"]
+        }
+        evaluation_scenario["results"] = [
+            (
+                EvaluationScenarioResult(
+                    evaluator_config=evaluator_config_id,
+                    result=batch_results[evaluator_config_id][batch_index],
+                )
+                if evaluator_config_id in batch_results
+                else row_results[evaluator_config_id]
+            )
+            for evaluator_config_id in (
+                str(evaluator_config_db.id)
+                for evaluator_config_db in evaluator_config_dbs
+            )
+        ]
+
+
+def add_to_aggregated_data(
+    evaluators_aggregated_data: Dict[str, Dict[str, Any]],
+    app_output: InvokationResult,
+    evaluation_scenario: Dict[str, Any],
+) -> None:
+    """
+    Adds the evaluators results of an evaluation scenario to the evaluators aggregated data.
+
+    Results of scenarios for which the app invocation failed are not aggregated.
+
+    Args:
+        evaluators_aggregated_data (Dict[str, Dict[str, Any]]): The evaluators aggregated data.
+        app_output (InvokationResult): The output of the app for the scenario.
+        evaluation_scenario (Dict[str, Any]): The scenario, as returned by evaluate_app_output.
+    """
+
+    if app_output.result.error:
+        return
+
+    for result_object in evaluation_scenario["results"]:
+        evaluators_aggregated_data[result_object.evaluator_config]["results"].append(
+            result_object.result
+        )
+
+
+async def run_evaluation_pipeline(
+    uri: str,
+    testset_data: Union[List[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    app_variant_parameters: Dict[str, Any],
+    list_inputs: List[Dict[str, str]],
+    rate_limit_config: Dict[str, int],
+    evaluator_config_dbs: List[EvaluatorConfigDB],
+    evaluators_aggregated_data: Dict[str, Dict[str, Any]],
+    lm_providers_keys: Dict[str, Any],
+    scenario_context: Dict[str, Any],
+) -> List[InvokationResult]:
+    """
+    Invokes the app, evaluates its outputs and saves the evaluation scenarios as a pipeline.
+
+    The pipeline has three stages connected by bounded queues:
+        1. the app is invoked and its outputs are streamed as soon as they are available,
+        2. concurrent workers run the evaluators on the outputs as they arrive,
+        3. a writer saves the evaluation scenarios in bulk micro-batches, in testset order,
+           after running the evaluators that support batches on each micro-batch at once.
+
+    Datapoints are only kept until their scenario is saved, so that testsets streamed
+    from the database (see `db_manager.iterate_testset_rows`) are never fully loaded.
+    The testset is read at most `EVALUATION_WINDOW_SIZE` datapoints ahead of the next
+    scenario to save, so that a stalled datapoint does not let the reorder buffer grow
+    with the rest of the testset.
+
+    Args:
+        uri (str): The URI of the app.
+        testset_data (Union[List[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]): The testset data.
+        app_variant_parameters (Dict[str, Any]): The parameters of the app variant.
+        list_inputs (List[Dict[str, str]]): The inputs of the app, as returned by get_app_inputs.
+        rate_limit_config (Dict[str, int]): Configuration for rate limiting.
+        evaluator_config_dbs (List[EvaluatorConfigDB]): The evaluators configurations.
+        evaluators_aggregated_data (Dict[str, Dict[str, Any]]): The evaluators aggregated data to fill.
+        lm_providers_keys (Dict[str, Any]): Keys for language model providers.
+        scenario_context (Dict[str, Any]): The fields shared by all the evaluation scenarios.
+
+    Returns:
+        List[InvokationResult]: The latency and cost of each app invocation, without their values.
+    """
+
+    outputs_queue: asyncio.Queue = asyncio.Queue(maxsize=EVALUATION_QUEUE_SIZE)
+    scenarios_queue: asyncio.Queue = asyncio.Queue(maxsize=EVALUATION_QUEUE_SIZE)
+    invocations_metrics: List[InvokationResult] = []
+    data_points: Dict[int, Dict[str, Any]] = {}
+    window = asyncio.Semaphore(EVALUATION_WINDOW_SIZE)
+
+    async def read_testset_data():
+        async for index, data_point in llm_apps_service.enumerate_testset_data(
+            testset_data
+        ):
+            # Released by the writer once the scenario is next in testset order
+            await window.acquire()
+            data_points[index] = data_point
+            yield data_point
+
+    async def invoke_app():
+        async for index, app_output in llm_apps_service.stream_invoke(
+            uri, read_testset_data(), app_variant_parameters, rate_limit_config
+        ):
+            await outputs_queue.put((index, app_output))
+        for _ in range(EVALUATION_WORKERS):
+            await outputs_queue.put(None)
+
+    async def evaluate_app_outputs():
+        while True:
+            item = await outputs_queue.get()
+            if item is None:
+                await scenarios_queue.put(None)
+                return
+
+            index, app_output = item
+            data_point = data_points.pop(index)
+            evaluation_scenario = await evaluate_app_output(
+                data_point=data_point,
+                app_output=app_output,
+                list_inputs=list_inputs,
+                evaluator_config_dbs=evaluator_config_dbs,
+                app_variant_parameters=app_variant_parameters,
+                lm_providers_keys=lm_providers_keys,
+                skip_batch_evaluators=True,
+            )
+            invocations_metrics.append(
+                InvokationResult(
+                    result=Result(type=app_output.result.type),
+                    latency=app_output.latency,
+                    cost=app_output.cost,
+                )
+            )
+            await scenarios_queue.put(
+                (index, (data_point, app_output, evaluation_scenario))
+            )
+
+    async def save_scenarios_batch(ready_scenarios: List[Tuple[Any, ...]]):
+        data_points_batch, app_outputs, evaluation_scenarios = (
+            list(values) for values in zip(*ready_scenarios)
+        )
+        await add_batch_evaluators_results(
+            data_points=data_points_batch,
+            app_outputs=app_outputs,
+            evaluation_scenarios=evaluation_scenarios,
+            evaluator_config_dbs=evaluator_config_dbs,
+            app_variant_parameters=app_variant_parameters,
+            lm_providers_keys=lm_providers_keys,
+        )
+        for app_output, evaluation_scenario in zip(app_outputs, evaluation_scenarios):
+            add_to_aggregated_data(
+                evaluators_aggregated_data, app_output, evaluation_scenario
+            )
+        await create_new_evaluation_scenarios(
+            **scenario_context, evaluation_scenarios=evaluation_scenarios
+        )
+
+    async def save_evaluation_scenarios():
+        pending_scenarios: Dict[int, Tuple[Any, ...]] = {}
+        ready_scenarios: List[Tuple[Any, ...]] = []
+        next_index = 0
+        finished_workers = 0
+        while finished_workers < EVALUATION_WORKERS:
+            item = await scenarios_queue.get()
+            if item is None:
+                finished_workers += 1
+                continue
+
+            index, scenario = item
+            pending_scenarios[index] = scenario
+
+            # Scenarios are saved in testset order
+            while next_index in pending_scenarios:
+                ready_scenarios.append(pending_scenarios.pop(next_index))
+                next_index += 1
+                window.release()
+
+            if len(ready_scenarios) >= EVALUATION_WRITE_BATCH_SIZE:
+                await save_scenarios_batch(ready_scenarios)
+                ready_scenarios = []
+
+        if ready_scenarios:
+            await save_scenarios_batch(ready_scenarios)
+
+    stages = [
+        asyncio.ensure_future(invoke_app()),
+        asyncio.ensure_future(save_evaluation_scenarios()),
+    ] + [
+        asyncio.ensure_future(evaluate_app_outputs()) for _ in range(EVALUATION_WORKERS)
+    ]
+    try:
+        await asyncio.gather(*stages)
+    finally:
+        for stage in stages:
+            stage.cancel()
+
+    return invocations_metrics
+
+
+@worker_process_shutdown.connect
+def close_app_client_session(**kwargs):
+    """
+    Closes the clients used to invoke the llm apps and to evaluate their outputs,
+    and stops the processes running the custom code evaluators, when the worker
+    process exits.
+    """
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(llm_apps_service.close_client_session())
+    loop.run_until_complete(evaluators_service.close_evaluators_clients())
+    sandbox.shutdown_process_pool()
+
+
 async def aggregate_evaluator_results(
     evaluators_aggregated_data: dict,
 ) -> List[AggregatedResult]:
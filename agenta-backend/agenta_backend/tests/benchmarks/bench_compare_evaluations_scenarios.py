@@ -0,0 +1,203 @@
+"""
+Benchmark of the grouping of compared evaluation scenarios by testset input.
+
+Compares the previous linear scan of every scenario for every input with the hash
+index built in one pass, from the scenarios (in memory) or from the
+(input_name, input_value, scenario_id) rows of the SQL query over the inputs JSONB.
+
+With --database, the evaluations are also stored in the database of POSTGRES_URI and
+compare_evaluations_scenarios is timed end to end (queries included), loading every
+scenario or only the scenarios matched in SQL.
+
+Usage:
+    python -m agenta_backend.tests.benchmarks.bench_compare_evaluations_scenarios --evaluations 5 --rows 2000 [--database]
+"""
+
+import time
+import asyncio
+import argparse
+
+from sqlalchemy import insert
+
+from agenta_backend.models.api.evaluation_model import (
+    EvaluationScenario,
+    EvaluationScenarioInput,
+)
+from agenta_backend.services.evaluation_service import (
+    extract_inputs_values_from_testset,
+    find_scenarios_by_input,
+    index_scenarios_inputs_by_input,
+)
+
+
+def find_scenarios_by_input_with_scan(formatted_inputs, all_scenarios):
+    """The implementation of find_scenarios_by_input before the hash index."""
+
+    results = []
+    flattened_scenarios = [
+        scenario for sublist in all_scenarios for scenario in sublist
+    ]
+    for formatted_input in formatted_inputs:
+        input_name = formatted_input["input_name"]
+        input_value = formatted_input["input_value"]
+        matching_scenarios = [
+            scenario
+            for scenario in flattened_scenarios
+            if any(
+                input_item.name == input_name and input_item.value == input_value
+                for input_item in scenario.inputs
+            )
+        ]
+        results.append(
+            {
+                "input_name": input_name,
+                "input_value": input_value,
+                "scenarios": matching_scenarios,
+            }
+        )
+
+    return {
+        "inputs": formatted_inputs,
+        "data": results,
+    }
+
+
+async def bench_database(testset, evaluations: int) -> None:
+    from agenta_backend.models.db.postgres_engine import db_engine
+    from agenta_backend.models.db_models import (
+        EvaluationDB,
+        EvaluationScenarioDB,
+        EvaluationScenarioResultDB,
+        TestSetDB,
+    )
+    from agenta_backend.services import evaluation_service
+
+    async with db_engine.get_session() as session:
+        testset_db = TestSetDB(name="bench_compare_evaluations", csvdata=testset)
+        session.add(testset_db)
+        await session.flush()
+        evaluations_dbs = [
+            EvaluationDB(testset_id=testset_db.id) for _ in range(evaluations)
+        ]
+        session.add_all(evaluations_dbs)
+        await session.flush()
+        for evaluation_db in evaluations_dbs:
+            result = await session.execute(
+                insert(EvaluationScenarioDB).returning(
+                    EvaluationScenarioDB.id, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        "evaluation_id": evaluation_db.id,
+                        "inputs": [
+                            {"name": name, "type": "text", "value": value}
+                            for name, value in data_point.items()
+                        ],
+                        "outputs": [{"result": {"type": "text", "value": "output"}}],
+                        "correct_answers": [],
+                    }
+                    for data_point in testset
+                ],
+            )
+            await session.execute(
+                insert(EvaluationScenarioResultDB),
+                [
+                    {
+                        "evaluation_scenario_id": scenario_id,
+                        "result": {"type": "bool", "value": True},
+                    }
+                    for scenario_id in result.scalars().all()
+                ],
+            )
+        await session.commit()
+
+    evaluations_ids = [str(evaluation_db.id) for evaluation_db in evaluations_dbs]
+    try:
+        durations = {}
+        responses = {}
+        for use_sql_index in [False, True, False, True]:  # the first runs warm up
+            start = time.perf_counter()
+            responses[
+                use_sql_index
+            ] = await evaluation_service.compare_evaluations_scenarios(
+                evaluations_ids, use_sql_index=use_sql_index
+            )
+            durations[use_sql_index] = time.perf_counter() - start
+    finally:
+        async with db_engine.get_session() as session:
+            for evaluation_db in evaluations_dbs:
+                await session.delete(evaluation_db)
+            await session.delete(testset_db)
+            await session.commit()
+        await db_engine.close_db()
+
+    assert responses[True] == responses[False]
+    print(f"all scenarios loaded, with the database: {durations[False]:.3f}s")
+    print(f"matched scenarios loaded, with the database: {durations[True]:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evaluations", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--database", action="store_true")
+    args = parser.parse_args()
+
+    testset = [
+        {"country": f"country {row}", "language": f"language {row % 50}"}
+        for row in range(args.rows)
+    ]
+    formatted_inputs = extract_inputs_values_from_testset(testset)
+    all_scenarios = [
+        [
+            EvaluationScenario(
+                id=f"{evaluation}-{row}",
+                evaluation_id=str(evaluation),
+                inputs=[
+                    EvaluationScenarioInput(name=name, type="text", value=value)
+                    for name, value in data_point.items()
+                ],
+                outputs=[],
+                results=[],
+            )
+            for row, data_point in enumerate(testset)
+        ]
+        for evaluation in range(args.evaluations)
+    ]
+    scenarios_inputs = [
+        (input_item.name, input_item.value, scenario.id)
+        for scenarios in all_scenarios
+        for scenario in scenarios
+        for input_item in scenario.inputs
+    ]
+
+    start = time.perf_counter()
+    expected = find_scenarios_by_input_with_scan(formatted_inputs, all_scenarios)
+    scan_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = find_scenarios_by_input(formatted_inputs, all_scenarios)
+    index_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scenarios_index = index_scenarios_inputs_by_input(scenarios_inputs, all_scenarios)
+    sql_indexed = find_scenarios_by_input(
+        formatted_inputs, all_scenarios, scenarios_index=scenarios_index
+    )
+    sql_index_duration = time.perf_counter() - start
+
+    assert indexed == expected and sql_indexed == expected
+    print(
+        f"{args.evaluations} evaluations x {args.rows} rows "
+        f"({len(formatted_inputs)} inputs)"
+    )
+    print(f"linear scan: {scan_duration:.3f}s")
+    print(f"hash index: {index_duration:.3f}s")
+    print(f"hash index from SQL rows: {sql_index_duration:.3f}s")
+
+    if args.database:
+        asyncio.run(bench_database(testset, args.evaluations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark of the llm apps invocation throughput, with and without the shared client session.
+
+A stub llm app is served locally and invoked for every row of a generated testset.
+
+Usage:
+    python -m agenta_backend.tests.benchmarks.bench_llm_apps_service --rows 2000 --batch-size 50
+"""
+
+import time
+import asyncio
+import argparse
+
+from aiohttp import web
+
+from agenta_backend.services import llm_apps_service
+
+
+OPENAPI_SCHEMA = {
+    "paths": {
+        "/generate": {
+            "post": {
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Body_generate"}
+                        }
+                    }
+                }
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Body_generate": {
+                "properties": {
+                    "question": {"x-parameter": "input"},
+                    "temperature": {"x-parameter": "float", "default": 0.5},
+                }
+            }
+        }
+    },
+}
+
+
+def create_stub_app(latency: float) -> web.Application:
+    async def openapi(request: web.Request) -> web.Response:
+        return web.json_response(OPENAPI_SCHEMA)
+
+    async def generate(request: web.Request) -> web.Response:
+        payload = await request.json()
+        await asyncio.sleep(latency)
+        return web.json_response(
+            {"message": f"answer to {payload['question']}", "cost": 0.0, "latency": 0}
+        )
+
+    app = web.Application()
+    app.router.add_get("/openapi.json", openapi)
+    app.router.add_post("/generate", generate)
+    return app
+
+
+async def run_benchmark(
+    uri: str, rows: int, batch_size: int, pool_enabled: bool
+) -> float:
+    testset_data = [{"question": f"question {index}"} for index in range(rows)]
+    rate_limit_config = {
+        "batch_size": batch_size,
+        "max_retries": 1,
+        "retry_delay": 0,
+        "delay_between_batches": 0,
+    }
+
+    llm_apps_service.APP_CLIENT_POOL_ENABLED = pool_enabled
+    start = time.perf_counter()
+    results = await llm_apps_service.batch_invoke(
+        uri, testset_data, {"temperature": 0.5}, rate_limit_config
+    )
+    elapsed = time.perf_counter() - start
+    await llm_apps_service.close_client_session()
+
+    errors = sum(1 for result in results if result.result.error)
+    assert errors == 0, f"{errors} invocations failed"
+    return rows / elapsed
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner = web.AppRunner(create_stub_app(args.latency), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    uri = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for label, pool_enabled in [
+            ("per-call sessions", False),
+            ("shared session", True),
+        ]:
+            rows_per_second = await run_benchmark(
+                uri, args.rows, args.batch_size, pool_enabled
+            )
+            print(f"{label:>20}: {rows_per_second:10.1f} rows/sec")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""
+Benchmark of the deterministic string evaluators on a testset with long outputs.
+
+Compares the previous pure-Python dynamic programming Levenshtein distance with the
+bit-parallel implementation, and the evaluation of a whole column of outputs row by
+row (`evaluate`) with the batch API (`evaluate_batch`).
+
+Usage:
+    python -m agenta_backend.tests.benchmarks.bench_string_evaluators --rows 200 --length 4000
+"""
+
+import time
+import random
+import string
+import argparse
+
+from agenta_backend.services.evaluators_service import (
+    evaluate,
+    evaluate_batch,
+    levenshtein_distance,
+)
+
+
+def levenshtein_distance_with_dynamic_programming(s1, s2):
+    """The implementation of levenshtein_distance before the bit-parallel algorithm."""
+
+    if len(s1) < len(s2):
+        return levenshtein_distance_with_dynamic_programming(s2, s1)
+
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+
+    return previous_row[-1]
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase + " ") for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--length", type=int, default=4000)
+    parser.add_argument("--dp-rows", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    outputs = [random_text(rng, args.length) for _ in range(args.rows)]
+    data_points = [
+        {"correct_answer": random_text(rng, args.length)} for _ in range(args.rows)
+    ]
+    inputs = [{} for _ in range(args.rows)]
+
+    start = time.perf_counter()
+    for output, data_point in zip(outputs[: args.dp_rows], data_points):
+        levenshtein_distance_with_dynamic_programming(
+            output, data_point["correct_answer"]
+        )
+    dp_time = (time.perf_counter() - start) / args.dp_rows
+
+    start = time.perf_counter()
+    for output, data_point in zip(outputs, data_points):
+        levenshtein_distance(output, data_point["correct_answer"])
+    bit_parallel_time = (time.perf_counter() - start) / args.rows
+
+    print(f"Levenshtein distance of {args.length} characters strings, per row:")
+    print(f"  dynamic programming: {dp_time * 1000:10.2f} ms")
+    print(f"  bit-parallel:        {bit_parallel_time * 1000:10.2f} ms")
+
+    evaluators = {
+        "auto_levenshtein_distance": {
+            "correct_answer_key": "correct_answer",
+            "threshold": 100,
+        },
+        "auto_similarity_match": {
+            "correct_answer_key": "correct_answer",
+            "similarity_threshold": 0.5,
+        },
+        "auto_regex_test": {"regex_pattern": "a+b+c", "regex_should_match": True},
+        "auto_contains_any": {"substrings": "abc, xyz, qq", "case_sensitive": False},
+        "auto_starts_with": {"prefix": "a", "case_sensitive": False},
+    }
+    print(f"\nEvaluation of {args.rows} outputs:")
+    for evaluator_key, settings_values in evaluators.items():
+        start = time.perf_counter()
+        for output, data_point in zip(outputs, data_points):
+            evaluate(evaluator_key, {}, output, data_point, {}, settings_values, {})
+        rows_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        evaluate_batch(
+            evaluator_key, inputs, outputs, data_points, {}, settings_values, {}
+        )
+        batch_time = time.perf_counter() - start
+
+        print(
+            f"  {evaluator_key:28} evaluate: {rows_time * 1000:9.2f} ms"
+            f"   evaluate_batch: {batch_time * 1000:9.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+import pytest
+
+from agenta_backend.utils.concurrency import AdaptiveConcurrencyLimiter, TokenBucket
+
+
+def test_adaptive_concurrency_limiter_increases_limit_on_success():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+
+    for _ in range(20):
+        limiter.record(latency=0.1)
+
+    assert limiter.limit == 4
+
+
+def test_adaptive_concurrency_limiter_decreases_limit_when_overloaded():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+
+    limiter.record(latency=0.1, overloaded=True)
+    assert limiter.limit == 4
+
+    # A burst of overload signals only decreases the limit once
+    limiter.record(latency=0.1, overloaded=True)
+    assert limiter.limit == 4
+
+
+def test_adaptive_concurrency_limiter_decreases_limit_when_latency_spikes():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8)
+
+    for _ in range(10):
+        limiter.record(latency=0.01)
+    for _ in range(10):
+        limiter.record(latency=0.2)
+
+    assert limiter.limit < 8
+    assert limiter.limit >= limiter.min_limit
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    token_bucket = TokenBucket(rate=20, capacity=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        await token_bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # 2 tokens are available right away, the 4 others are refilled at 20 tokens/sec
+    assert elapsed >= 0.15
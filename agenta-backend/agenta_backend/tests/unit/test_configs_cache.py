@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException, Response
+
+from agenta_backend.routers import configs_router
+from agenta_backend.services import configs_cache, db_manager
+
+BASE_ID = "018f4a6e-3c2b-7d4e-9f1a-2b3c4d5e6f70"
+APP_ID = "018f4a6e-3c2b-7d4e-9f1a-2b3c4d5e6f71"
+
+
+@pytest.fixture
+def cache():
+    cache = configs_cache.ConfigsCache(ttl=60)
+    with patch.object(configs_cache, "_configs_cache", cache):
+        yield cache
+
+
+@pytest.fixture
+def fetch_config_by_environment():
+    environment = SimpleNamespace(app_id=APP_ID, name="production")
+    variant_revision = SimpleNamespace(
+        base_id=BASE_ID,
+        revision=3,
+        config_name="default",
+        config_parameters={"temperature": 0.5},
+    )
+    with patch.object(
+        db_manager,
+        "fetch_config_by_environment",
+        AsyncMock(return_value=(environment, variant_revision)),
+    ) as fetch_config_by_environment:
+        yield fetch_config_by_environment
+
+
+async def get_config(if_none_match=None, **kwargs):
+    request = SimpleNamespace(
+        headers={"if-none-match": if_none_match} if if_none_match else {}
+    )
+    response = Response()
+    result = await configs_router.get_config(
+        request, response, base_id=BASE_ID, **kwargs
+    )
+    return result, response
+
+
+@pytest.mark.asyncio
+async def test_configs_are_resolved_once(cache, fetch_config_by_environment):
+    for _ in range(3):
+        config, response = await get_config(environment_name="production")
+        assert config.config_name == "default"
+        assert config.current_version == 3
+        assert config.parameters == {"temperature": 0.5}
+        assert response.headers["ETag"]
+
+    fetch_config_by_environment.assert_awaited_once_with(
+        base_id=BASE_ID, environment_name="production"
+    )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_configs_are_not_modified(cache, fetch_config_by_environment):
+    _, response = await get_config(environment_name="production")
+    etag = response.headers["ETag"]
+
+    not_modified, _ = await get_config(
+        environment_name="production", if_none_match=f'"other", W/{etag}'
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+
+    fetch_config_by_environment.return_value[1].config_parameters = {"temperature": 0.9}
+    cache.invalidate(app_id=APP_ID)
+    config, response = await get_config(
+        environment_name="production", if_none_match=etag
+    )
+    assert config.parameters == {"temperature": 0.9}
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_configs_of_other_bases_are_rejected(cache, fetch_config_by_environment):
+    fetch_config_by_environment.return_value[1].base_id = APP_ID
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_config(environment_name="production")
+    assert exc_info.value.status_code == 400
+    assert cache.get(BASE_ID, "production", None) is None
+
+
+@pytest.mark.asyncio
+async def test_deployments_invalidate_the_configs_of_their_app(cache):
+    cache.set(BASE_ID, "production", None, APP_ID, {"current_version": 1})
+    cache.set(BASE_ID, None, "default", APP_ID, {"current_version": 1})
+    cache.set("other-base", "production", None, "other-app", {"current_version": 1})
+
+    app_variant_db = SimpleNamespace(
+        id=BASE_ID, app_id=APP_ID, revision=1, base_id=BASE_ID
+    )
+    with patch.object(
+        db_manager, "fetch_app_variant_by_id", AsyncMock(return_value=app_variant_db)
+    ), patch.object(
+        db_manager, "fetch_app_variant_revision_by_variant", AsyncMock()
+    ), patch.object(
+        db_manager, "get_deployment_by_appid", AsyncMock()
+    ), patch.object(
+        db_manager, "get_user", AsyncMock()
+    ), patch.object(
+        db_manager, "create_environment_revision", AsyncMock()
+    ), patch.object(
+        db_manager.db_engine, "get_session"
+    ) as get_session:
+        session = get_session.return_value.__aenter__.return_value
+        session.execute = AsyncMock(return_value=MagicMock())
+        session.commit = AsyncMock()
+        await db_manager.deploy_to_environment(
+            "production", BASE_ID, user_uid="user-uid"
+        )
+
+    assert cache.get(BASE_ID, "production", None) is None
+    assert cache.get(BASE_ID, None, "default") is None
+    assert cache.get("other-base", "production", None) is not None
+
+
+def test_etags_ignore_the_order_of_parameters():
+    assert configs_cache.compute_etag(
+        {"parameters": {"a": 1, "b": 2}}
+    ) == configs_cache.compute_etag({"parameters": {"b": 2, "a": 1}})
+    assert configs_cache.etag_matches("*", '"etag"')
+    assert not configs_cache.etag_matches(None, '"etag"')
@@ -0,0 +1,74 @@
+import io
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from agenta_backend.services import container_manager
+from agenta_backend.models.api.api_models import Image, ImageBuildStatusEnum
+
+
+def make_upload():
+    return SimpleNamespace(filename="app.tar.gz", file=io.BytesIO(b"tar" * 1000))
+
+
+def make_app(name="app"):
+    return SimpleNamespace(id=f"{name}-id", app_name=name, user_id="user-id")
+
+
+@pytest.mark.asyncio
+async def test_image_build_streams_logs_and_returns_image():
+    release = threading.Event()
+
+    def build_image_job(app_name, base_name, tar_path, image_name, *args, log):
+        assert tar_path.read_bytes() == b"tar" * 1000
+        log("Step 1/2 : FROM python:3.9")
+        release.wait(5)
+        log("Step 2/2 : COPY . .")
+        return Image(type="image", docker_id="sha256:1", tags=image_name)
+
+    with patch.object(container_manager, "build_image_job", build_image_job):
+        build = await container_manager.submit_image_build(
+            make_app(), "v1", make_upload()
+        )
+        assert container_manager.get_image_build(build.build_id) is build
+
+        logs = []
+        async for line in build.follow_logs():
+            logs.append(line)
+            release.set()
+
+    assert logs == ["Step 1/2 : FROM python:3.9", "Step 2/2 : COPY . ."]
+    assert build.status == ImageBuildStatusEnum.BUILD_FINISHED
+    assert build.to_api().image.tags == "agentaai/app_v1:latest"
+
+
+@pytest.mark.asyncio
+async def test_image_builds_are_capped_and_report_failures():
+    running, max_running = 0, 0
+    lock = threading.Lock()
+
+    def build_image_job(app_name, *args, log):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        threading.Event().wait(0.05)
+        with lock:
+            running -= 1
+        raise HTTPException(status_code=500, detail=f"{app_name} failed")
+
+    with patch.object(container_manager, "build_image_job", build_image_job):
+        results = await asyncio.gather(
+            *[
+                container_manager.build_image(make_app(f"app{i}"), "v1", make_upload())
+                for i in range(6)
+            ],
+            return_exceptions=True,
+        )
+
+    assert max_running == container_manager.IMAGE_BUILDS_MAX_CONCURRENCY
+    assert [result.detail for result in results] == [f"app{i} failed" for i in range(6)]
@@ -0,0 +1,185 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from agenta_backend.services import docker_runtime
+
+
+@pytest.fixture
+def docker_client():
+    client = MagicMock()
+    with patch.object(docker_runtime, "get_docker_client", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def image_index():
+    index = docker_runtime.ImageIndex(ttl=60)
+    with patch.object(docker_runtime, "image_index", index):
+        yield index
+
+
+@pytest.mark.asyncio
+async def test_start_container_does_not_block_the_event_loop(docker_client):
+    container = MagicMock(id="container-id")
+    container.show = AsyncMock(return_value={"State": {"Status": "running"}})
+    docker_client.containers.run = AsyncMock(return_value=container)
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    with patch.dict("os.environ", {"DOMAIN_NAME": "http://localhost"}):
+        result = await docker_runtime.start_container(
+            image_name="agenta-server/app_v1:latest",
+            uri_path="user/app/v1",
+            container_name="app-v1-user",
+            env_vars={"AGENTA_HOST": "http://host.docker.internal"},
+        )
+    ticker.cancel()
+
+    assert ticks > 10  # other coroutines ran during the start check delay
+    assert result == {
+        "uri": "http://localhost/user/app/v1",
+        "container_id": "container-id",
+        "container_name": "app-v1-user",
+    }
+    config = docker_client.containers.run.call_args.kwargs["config"]
+    assert config["Image"] == "agenta-server/app_v1:latest"
+    assert config["Env"] == ["AGENTA_HOST=http://host.docker.internal"]
+    assert config["HostConfig"]["NetworkMode"] == "agenta-network"
+
+
+@pytest.mark.asyncio
+async def test_start_container_raises_when_the_container_exits(docker_client):
+    container = MagicMock(id="container-id")
+    container.show = AsyncMock(return_value={"State": {"Status": "exited"}})
+    container.log = AsyncMock(return_value=["ModuleNotFoundError\n"])
+    docker_client.containers.run = AsyncMock(return_value=container)
+
+    with patch.object(docker_runtime, "CONTAINER_START_CHECK_DELAY", 0):
+        with pytest.raises(Exception, match="ModuleNotFoundError"):
+            await docker_runtime.start_container(
+                image_name="agenta-server/app_v1:latest",
+                uri_path="user/app/v1",
+                container_name="app-v1-user",
+                env_vars=None,
+            )
+
+
+@pytest.mark.asyncio
+async def test_list_images_only_returns_tagged_registry_images(
+    docker_client, image_index
+):
+    docker_client.images.list = AsyncMock(
+        return_value=[
+            {"Id": "sha256:1", "RepoTags": ["agenta-server/app_v1:latest"]},
+            {"Id": "sha256:2", "RepoTags": ["<none>:<none>"]},
+            {"Id": "sha256:3", "RepoTags": None},
+            {"Id": "sha256:4", "RepoTags": ["postgres:16"]},
+        ]
+    )
+
+    with patch.object(docker_runtime, "agenta_registry_repo", "agenta-server"):
+        images = await docker_runtime.list_images()
+
+    assert [(image.docker_id, image.tags) for image in images] == [
+        ("sha256:1", "agenta-server/app_v1:latest")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_image_index_looks_up_missing_images_directly(docker_client, image_index):
+    docker_client.images.inspect = AsyncMock(
+        return_value={"Id": "sha256:1", "RepoTags": ["agenta-server/app_v1:latest"]}
+    )
+    docker_client.images.list = AsyncMock()
+
+    for _ in range(3):
+        image = await docker_runtime.find_image_by_tag("agenta-server/app_v1:latest")
+        assert image.docker_id == "sha256:1"
+    assert (await docker_runtime.find_image_by_docker_id("sha256:1")).tags == (
+        "agenta-server/app_v1:latest"
+    )
+
+    docker_client.images.inspect.assert_awaited_once()
+    docker_client.images.list.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_image_exists_confirms_moved_tags(docker_client, image_index):
+    image_index.add("sha256:old", ["agenta-server/app_v1:latest"])
+    docker_client.images.inspect = AsyncMock(
+        return_value={"Id": "sha256:new", "RepoTags": ["agenta-server/app_v1:latest"]}
+    )
+
+    assert await docker_runtime.image_exists(
+        "sha256:new", "agenta-server/app_v1:latest"
+    )
+    assert not await docker_runtime.image_exists(
+        "sha256:old", "agenta-server/app_v1:latest"
+    )
+
+
+@pytest.mark.asyncio
+async def test_image_index_is_rebuilt_after_changes(docker_client, image_index):
+    docker_client.images.list = AsyncMock(
+        return_value=[{"Id": "sha256:1", "RepoTags": ["agenta-server/app_v1:latest"]}]
+    )
+
+    with patch.object(docker_runtime, "agenta_registry_repo", "agenta-server"):
+        await docker_runtime.list_images()
+        await docker_runtime.list_images()
+        assert docker_client.images.list.await_count == 1
+
+        image_index.discard("agenta-server/app_v1:latest")  # e.g. an untag event
+        await docker_runtime.list_images()
+        assert docker_client.images.list.await_count == 2
+
+        image_index.ttl = -1
+        image_index.invalidate()
+        await docker_runtime.list_images()
+        assert docker_client.images.list.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_watch_image_events_resubscribes_when_docker_is_unreachable(image_index):
+    image_index.add("sha256:1", ["agenta-server/app_v1:latest"])
+    image_index.add("sha256:2", ["agenta-server/app_v2:latest"])
+    events = asyncio.Queue()
+    events.put_nowait({"Actor": {"ID": "sha256:2"}})
+    client = MagicMock()
+    client.events.subscribe.return_value.get = events.get
+    client.events.stop = AsyncMock()
+    docker_clients = [AssertionError(), client]
+
+    def get_docker_client():
+        docker_client = docker_clients.pop(0)
+        if isinstance(docker_client, Exception):
+            raise docker_client
+        return docker_client
+
+    with patch.object(
+        docker_runtime, "get_docker_client", side_effect=get_docker_client
+    ), patch.object(docker_runtime, "DOCKER_IMAGE_EVENTS_RETRY_DELAY", 0):
+        watcher = asyncio.create_task(docker_runtime.watch_image_events())
+        await asyncio.sleep(0.05)
+        assert not watcher.done()
+
+        # The index was invalidated after the failure, then kept up to date
+        assert not image_index._tags_by_id
+        image_index.add("sha256:3", ["agenta-server/app_v3:latest"])
+        events.put_nowait({"Actor": {"ID": "sha256:3"}})
+        await asyncio.sleep(0.05)
+        assert "sha256:3" not in image_index._tags_by_id
+
+        watcher.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await watcher
+    client.events.stop.assert_awaited_once()
@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from agenta_backend.services.embeddings_service import (
+    DiskEmbeddingsCache,
+    EmbeddingsBatcher,
+    MemoryEmbeddingsCache,
+    cosine_similarities,
+    get_embeddings,
+)
+
+
+class FakeEmbeddingsClient:
+    """
+    Fake OpenAI client embedding a text as the unit vector of its length.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    async def create(self, model, input):
+        self.requests.append(list(input))
+        data = []
+        for index, text in enumerate(input):
+            vector = [0.0] * 8
+            vector[len(text) % 8] = 1.0
+            data.append(SimpleNamespace(index=index, embedding=vector))
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_batches_requests_and_caches_embeddings():
+    client = FakeEmbeddingsClient()
+    cache = MemoryEmbeddingsCache()
+    texts = ["a", "bb", "ccc", "a", "dddd", "eeeee"]
+
+    vectors = await get_embeddings(texts, client, cache=cache, batch_size=2)
+
+    assert vectors.shape == (6, 8)
+    assert np.array_equal(vectors[0], vectors[3])
+    assert vectors[2][3] == 1.0
+    assert client.requests == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+    await get_embeddings(texts + ["ffffff"], client, cache=cache)
+    assert client.requests[-1] == ["ffffff"]
+
+
+@pytest.mark.asyncio
+async def test_disk_embeddings_cache_persists_vectors(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    vector = np.arange(4, dtype=np.float32)
+
+    await DiskEmbeddingsCache(path).set_many({"key": vector})
+    vectors = await DiskEmbeddingsCache(path).get_many(["key", "missing"])
+
+    assert list(vectors) == ["key"]
+    assert np.array_equal(vectors["key"], vector)
+
+
+@pytest.mark.asyncio
+async def test_embeddings_batcher_merges_concurrent_requests():
+    client = FakeEmbeddingsClient()
+    batcher = EmbeddingsBatcher(client, cache=MemoryEmbeddingsCache(), max_wait=0.01)
+
+    results = await asyncio.gather(
+        *[batcher.embed([f"output {index}", "answer"]) for index in range(20)]
+    )
+
+    assert len(client.requests) == 1
+    assert sorted(client.requests[0]) == sorted(
+        [f"output {index}" for index in range(20)] + ["answer"]
+    )
+    assert all(vectors.shape == (2, 8) for vectors in results)
+
+
+def test_cosine_similarities_is_computed_per_row():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]])
+    other_vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.6, 0.8]])
+
+    assert np.allclose(cosine_similarities(vectors, other_vectors), [1.0, 0.0, 1.0])
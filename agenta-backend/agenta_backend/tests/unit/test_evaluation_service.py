@@ -0,0 +1,194 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agenta_backend.models.api.evaluation_model import (
+    EvaluationScenario,
+    EvaluationScenarioInput,
+)
+from agenta_backend.routers import evaluation_router
+from agenta_backend.services import evaluation_service
+from agenta_backend.services.evaluation_service import (
+    find_scenarios_by_input,
+    index_scenarios_inputs_by_input,
+    remove_duplicates,
+)
+
+
+def make_scenario(scenario_id: str, inputs: dict) -> EvaluationScenario:
+    return EvaluationScenario(
+        id=scenario_id,
+        evaluation_id="evaluation-id",
+        inputs=[
+            EvaluationScenarioInput(name=name, type="text", value=value)
+            for name, value in inputs.items()
+        ],
+        outputs=[],
+        results=[],
+    )
+
+
+def test_find_scenarios_by_input_groups_scenarios_of_all_evaluations():
+    messages = [{"role": "user", "content": "Hi"}]
+    all_scenarios = [
+        [
+            make_scenario("1", {"country": "France", "messages": messages}),
+            make_scenario("2", {"country": "Italy", "messages": []}),
+        ],
+        [
+            make_scenario("3", {"country": "France", "messages": messages}),
+            make_scenario("4", {"country": "France", "messages": []}),
+        ],
+    ]
+    formatted_inputs = [
+        {"input_name": "country", "input_value": "France"},
+        {"input_name": "messages", "input_value": messages},
+        {"input_name": "country", "input_value": "Spain"},
+    ]
+
+    results = find_scenarios_by_input(formatted_inputs, all_scenarios)
+
+    assert [
+        [scenario.id for scenario in result["scenarios"]] for result in results["data"]
+    ] == [
+        ["1", "3", "4"],
+        ["1", "3"],
+        [],
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_sql_index", [False, True])
+async def test_compare_evaluations_scenarios_response_shape(use_sql_index):
+    scenarios = {
+        "evaluation-1": [make_scenario("1", {"country": "France"})],
+        "evaluation-2": [make_scenario("2", {"country": "France"})],
+    }
+    db_manager = evaluation_service.db_manager
+    with patch.object(
+        db_manager,
+        "fetch_evaluation_by_id",
+        AsyncMock(return_value=SimpleNamespace(testset_id="testset-id")),
+    ), patch.object(db_manager, "fetch_testset_by_id", AsyncMock()), patch.object(
+        db_manager,
+        "fetch_testset_csvdata",
+        AsyncMock(
+            return_value=[
+                {"country": "France", "correct_answer": "Paris"},
+                {"country": "France", "correct_answer": "Paris"},
+            ]
+        ),
+    ), patch.object(
+        db_manager,
+        "fetch_evaluation_scenarios_ids_by_input",
+        AsyncMock(
+            return_value=[("country", "France", "1"), ("country", "France", "2")]
+        ),
+    ) as fetch_evaluation_scenarios_ids_by_input, patch.object(
+        db_manager,
+        "fetch_evaluation_scenarios_by_ids",
+        AsyncMock(
+            return_value=[
+                SimpleNamespace(id="1", evaluation_id="evaluation-1"),
+                SimpleNamespace(id="2", evaluation_id="evaluation-2"),
+            ]
+        ),
+    ) as fetch_evaluation_scenarios_by_ids, patch.object(
+        evaluation_service.converters,
+        "evaluation_scenario_db_to_pydantic",
+        AsyncMock(
+            side_effect=lambda evaluation_scenario_db, evaluation_id: scenarios[
+                evaluation_id
+            ][0]
+        ),
+    ), patch.object(
+        evaluation_service,
+        "fetch_evaluation_scenarios_for_evaluation",
+        AsyncMock(side_effect=lambda evaluation_id: scenarios[evaluation_id]),
+    ) as fetch_evaluation_scenarios_for_evaluation:
+        response = await evaluation_service.compare_evaluations_scenarios(
+            ["evaluation-1", "evaluation-2"], use_sql_index=use_sql_index
+        )
+
+    if use_sql_index:
+        # Only the matched scenarios are loaded, for the unique testset inputs
+        fetch_evaluation_scenarios_ids_by_input.assert_awaited_once_with(
+            ["evaluation-1", "evaluation-2"], [("country", "France")]
+        )
+        fetch_evaluation_scenarios_by_ids.assert_awaited_once_with(["1", "2"])
+        fetch_evaluation_scenarios_for_evaluation.assert_not_awaited()
+
+    assert response == {
+        "inputs": [{"input_name": "country", "input_value": "France"}],
+        "data": [
+            {
+                "input_name": "country",
+                "input_value": "France",
+                "scenarios": scenarios["evaluation-1"] + scenarios["evaluation-2"],
+            }
+        ],
+    }
+
+
+def test_index_scenarios_inputs_by_input_matches_in_memory_index():
+    all_scenarios = [
+        [make_scenario("1", {"country": "France"})],
+        [make_scenario("2", {"country": "France"})],
+    ]
+    scenarios_inputs = [("country", "France", "1"), ("country", "France", "2")]
+    formatted_inputs = [{"input_name": "country", "input_value": "France"}]
+
+    scenarios_index = index_scenarios_inputs_by_input(scenarios_inputs, all_scenarios)
+
+    assert find_scenarios_by_input(
+        formatted_inputs, all_scenarios, scenarios_index=scenarios_index
+    ) == find_scenarios_by_input(formatted_inputs, all_scenarios)
+
+
+def test_remove_duplicates_supports_unhashable_values():
+    csvdata = [
+        {"country": "France", "messages": [{"role": "user"}]},
+        {"country": "France", "messages": [{"role": "user"}]},
+        {"country": "Italy", "messages": []},
+    ]
+
+    assert remove_duplicates(csvdata) == [csvdata[0], csvdata[2]]
+
+
+def test_fetch_evaluation_scenarios_rejects_malformed_cursors():
+    app = FastAPI()
+    app.include_router(evaluation_router.router, prefix="/evaluations")
+    with patch.object(
+        evaluation_router.db_manager, "fetch_evaluation_by_id", AsyncMock()
+    ) as fetch_evaluation_by_id:
+        response = TestClient(app).get(
+            "/evaluations/evaluation-id/evaluation_scenarios/",
+            params={"cursor": "not-a-uuid", "limit": 10},
+        )
+
+    assert response.status_code == 422
+    fetch_evaluation_by_id.assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"evaluator_config_id": "not-a-uuid"},
+        {"result_value": "true"},
+    ],
+)
+def test_fetch_evaluation_scenarios_rejects_malformed_filters(params):
+    app = FastAPI()
+    app.include_router(evaluation_router.router, prefix="/evaluations")
+    with patch.object(
+        evaluation_router.db_manager, "fetch_evaluation_by_id", AsyncMock()
+    ) as fetch_evaluation_by_id:
+        response = TestClient(app).get(
+            "/evaluations/evaluation-id/evaluation_scenarios/", params=params
+        )
+
+    assert response.status_code == 422
+    fetch_evaluation_by_id.assert_not_awaited()
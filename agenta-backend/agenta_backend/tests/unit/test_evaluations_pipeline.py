@@ -0,0 +1,437 @@
+import asyncio
+import threading
+
+import pytest
+from celery.signals import worker_process_shutdown
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+
+from agenta_backend.services import embeddings_service, evaluators_service
+from agenta_backend.services.embeddings_service import EmbeddingsCache
+from agenta_backend.tasks.evaluations import run_evaluation_pipeline
+from agenta_backend.models.shared_models import InvokationResult, Result, Error
+
+
+def make_app_output(value: str, latency: float = 0.1, cost: float = 0.01):
+    return InvokationResult(
+        result=Result(type="text", value={"data": value}, error=None),
+        latency=latency,
+        cost=cost,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_pipeline_saves_scenarios_in_testset_order():
+    """
+    Test that the evaluation pipeline evaluates every app output and saves the
+    evaluation scenarios in testset order, even when the app outputs are
+    streamed out of order.
+    """
+
+    testset_data = [
+        {"question": f"question {index}", "correct_answer": f"answer {index}"}
+        for index in range(7)
+    ]
+    evaluator_config_db = SimpleNamespace(
+        id="evaluator-config-id",
+        evaluator_key="auto_exact_match",
+        settings_values={"correct_answer_key": "correct_answer"},
+    )
+    evaluators_aggregated_data = {
+        "evaluator-config-id": {"evaluator_key": "auto_exact_match", "results": []}
+    }
+
+    async def stream_invoke_side_effect(uri, testset_data, parameters, config):
+        async for _ in testset_data:
+            pass
+        for index in [2, 0, 1, 5, 3, 6, 4]:
+            if index == 3:
+                yield index, InvokationResult(
+                    result=Result(type="error", error=Error(message="App failed"))
+                )
+            else:
+                yield index, make_app_output(f"answer {index}")
+
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.stream_invoke",
+        new=stream_invoke_side_effect,
+    ), patch(
+        "agenta_backend.tasks.evaluations.create_new_evaluation_scenarios",
+        new_callable=AsyncMock,
+    ) as mock_create_new_evaluation_scenarios, patch(
+        "agenta_backend.tasks.evaluations.EVALUATION_WRITE_BATCH_SIZE", 2
+    ):
+        invocations_metrics = await run_evaluation_pipeline(
+            uri="http://example.com",
+            testset_data=testset_data,
+            app_variant_parameters={},
+            list_inputs=[{"name": "question", "type": "input"}],
+            rate_limit_config={},
+            evaluator_config_dbs=[evaluator_config_db],
+            evaluators_aggregated_data=evaluators_aggregated_data,
+            lm_providers_keys={},
+            scenario_context={"evaluation_id": "evaluation-id"},
+        )
+
+    saved_batches = [
+        call.kwargs for call in mock_create_new_evaluation_scenarios.call_args_list
+    ]
+    assert all(batch["evaluation_id"] == "evaluation-id" for batch in saved_batches)
+    assert all(len(batch["evaluation_scenarios"]) >= 2 for batch in saved_batches[:-1])
+
+    saved_scenarios = [
+        scenario
+        for batch in saved_batches
+        for scenario in batch["evaluation_scenarios"]
+    ]
+    assert [scenario["inputs"][0].value for scenario in saved_scenarios] == [
+        f"question {index}" for index in range(7)
+    ]
+    assert saved_scenarios[3]["outputs"][0].result.type == "error"
+    assert saved_scenarios[0]["results"][0].result.value is True
+
+    # Failed invocations are not aggregated
+    assert len(evaluators_aggregated_data["evaluator-config-id"]["results"]) == 6
+    assert len(invocations_metrics) == 7
+    assert all(metrics.result.value is None for metrics in invocations_metrics)
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_pipeline_streams_testset_rows():
+    """
+    Test that the evaluation pipeline accepts testset rows streamed as an async iterable.
+    """
+
+    async def iterate_testset_rows():
+        for index in range(3):
+            yield {"question": f"question {index}", "correct_answer": "answer"}
+
+    async def stream_invoke_side_effect(uri, testset_data, parameters, config):
+        index = 0
+        async for _ in testset_data:
+            yield index, make_app_output("answer")
+            index += 1
+
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.stream_invoke",
+        new=stream_invoke_side_effect,
+    ), patch(
+        "agenta_backend.tasks.evaluations.create_new_evaluation_scenarios",
+        new_callable=AsyncMock,
+    ) as mock_create_new_evaluation_scenarios:
+        await run_evaluation_pipeline(
+            uri="http://example.com",
+            testset_data=iterate_testset_rows(),
+            app_variant_parameters={},
+            list_inputs=[{"name": "question", "type": "input"}],
+            rate_limit_config={},
+            evaluator_config_dbs=[],
+            evaluators_aggregated_data={},
+            lm_providers_keys={},
+            scenario_context={"evaluation_id": "evaluation-id"},
+        )
+
+    saved_scenarios = [
+        scenario
+        for call in mock_create_new_evaluation_scenarios.call_args_list
+        for scenario in call.kwargs["evaluation_scenarios"]
+    ]
+    assert [scenario["inputs"][0].value for scenario in saved_scenarios] == [
+        "question 0",
+        "question 1",
+        "question 2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_pipeline_bounds_rows_read_ahead_of_a_stalled_row():
+    """
+    Test that the testset is not read further than the window ahead of a stalled
+    first row, and that every scenario is saved in order once the row completes.
+    """
+
+    testset_data = [{"question": f"question {index}"} for index in range(10)]
+    read_rows = []
+    rows_read_while_stalled = []
+
+    async def stream_invoke_side_effect(uri, testset_data, parameters, config):
+        outputs = asyncio.Queue()
+
+        async def invoke_rows():
+            async for _ in testset_data:
+                read_rows.append(len(read_rows))
+                if read_rows[-1] > 0:
+                    await outputs.put((read_rows[-1], make_app_output("answer")))
+            await outputs.put(None)
+
+        invocations = asyncio.ensure_future(invoke_rows())
+
+        # The first row stalls until no more rows are read
+        while True:
+            try:
+                yield await asyncio.wait_for(outputs.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                break
+        rows_read_while_stalled.append(len(read_rows))
+        yield 0, make_app_output("answer")
+
+        while (item := await outputs.get()) is not None:
+            yield item
+        await invocations
+
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.stream_invoke",
+        new=stream_invoke_side_effect,
+    ), patch(
+        "agenta_backend.tasks.evaluations.create_new_evaluation_scenarios",
+        new_callable=AsyncMock,
+    ) as mock_create_new_evaluation_scenarios, patch(
+        "agenta_backend.tasks.evaluations.EVALUATION_WINDOW_SIZE", 4
+    ), patch(
+        "agenta_backend.tasks.evaluations.EVALUATION_WRITE_BATCH_SIZE", 3
+    ):
+        await run_evaluation_pipeline(
+            uri="http://example.com",
+            testset_data=testset_data,
+            app_variant_parameters={},
+            list_inputs=[{"name": "question", "type": "input"}],
+            rate_limit_config={},
+            evaluator_config_dbs=[],
+            evaluators_aggregated_data={},
+            lm_providers_keys={},
+            scenario_context={"evaluation_id": "evaluation-id"},
+        )
+
+    assert rows_read_while_stalled == [4]
+    saved_scenarios = [
+        scenario
+        for call in mock_create_new_evaluation_scenarios.call_args_list
+        for scenario in call.kwargs["evaluation_scenarios"]
+    ]
+    assert [scenario["inputs"][0].value for scenario in saved_scenarios] == [
+        f"question {index}" for index in range(10)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_pipeline_evaluates_write_batches_at_once():
+    """
+    Test that the evaluators supporting batches are run once per write batch, and
+    that the results of each scenario keep the order of the evaluators configurations.
+    """
+
+    testset_data = [
+        {"question": f"question {index}", "correct_answer": f"answer {index}"}
+        for index in range(5)
+    ]
+    evaluator_config_dbs = [
+        SimpleNamespace(
+            id="exact-match-id",
+            evaluator_key="auto_exact_match",
+            settings_values={"correct_answer_key": "correct_answer"},
+        ),
+        SimpleNamespace(
+            id="contains-json-id",
+            evaluator_key="auto_contains_json",
+            settings_values={},
+        ),
+        SimpleNamespace(
+            id="regex-test-id",
+            evaluator_key="auto_regex_test",
+            settings_values={"regex_pattern": "^answer", "regex_should_match": True},
+        ),
+    ]
+    evaluators_aggregated_data = {
+        str(config.id): {"evaluator_key": config.evaluator_key, "results": []}
+        for config in evaluator_config_dbs
+    }
+
+    async def stream_invoke_side_effect(uri, testset_data, parameters, config):
+        index = 0
+        async for _ in testset_data:
+            if index == 1:
+                yield index, InvokationResult(
+                    result=Result(type="error", error=Error(message="App failed"))
+                )
+            else:
+                yield index, make_app_output("answer 0")
+            index += 1
+
+    evaluate_batch = evaluators_service.evaluate_batch
+    evaluation_threads = set()
+
+    def evaluate_batch_side_effect(**kwargs):
+        evaluation_threads.add(threading.get_ident())
+        return evaluate_batch(**kwargs)
+
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.stream_invoke",
+        new=stream_invoke_side_effect,
+    ), patch(
+        "agenta_backend.tasks.evaluations.create_new_evaluation_scenarios",
+        new_callable=AsyncMock,
+    ) as mock_create_new_evaluation_scenarios, patch(
+        "agenta_backend.tasks.evaluations.EVALUATION_WRITE_BATCH_SIZE", 3
+    ), patch(
+        "agenta_backend.tasks.evaluations.evaluators_service.evaluate_batch",
+        side_effect=evaluate_batch_side_effect,
+    ) as mock_evaluate_batch:
+        await run_evaluation_pipeline(
+            uri="http://example.com",
+            testset_data=testset_data,
+            app_variant_parameters={},
+            list_inputs=[{"name": "question", "type": "input"}],
+            rate_limit_config={},
+            evaluator_config_dbs=evaluator_config_dbs,
+            evaluators_aggregated_data=evaluators_aggregated_data,
+            lm_providers_keys={},
+            scenario_context={"evaluation_id": "evaluation-id"},
+        )
+
+    # Two write batches of 3 and 2 scenarios, each with one failed or two successful
+    # invocations, evaluated once by each of the two batch evaluators
+    assert [
+        len(call.kwargs["outputs"]) for call in mock_evaluate_batch.call_args_list
+    ] == [2] * 4
+    # The batch evaluators do not block the event loop
+    assert threading.get_ident() not in evaluation_threads
+
+    saved_scenarios = [
+        scenario
+        for call in mock_create_new_evaluation_scenarios.call_args_list
+        for scenario in call.kwargs["evaluation_scenarios"]
+    ]
+    assert len(saved_scenarios) == 5
+    for scenario in saved_scenarios:
+        assert [result.evaluator_config for result in scenario["results"]] == [
+            "exact-match-id",
+            "contains-json-id",
+            "regex-test-id",
+        ]
+    assert [
+        scenario["results"][0].result.value
+        for index, scenario in enumerate(saved_scenarios)
+        if index != 1
+    ] == [True, False, False, False]
+    assert saved_scenarios[2]["results"][2].result.value is True
+    assert saved_scenarios[1]["results"][0].result.error.message == "App failed"
+
+    # Failed invocations are not aggregated
+    assert all(
+        len(data["results"]) == 4 for data in evaluators_aggregated_data.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_evaluation_pipeline_scores_semantic_similarity_per_write_batch():
+    """
+    Test that the semantic similarity of a write batch is computed from one embeddings
+    request and one vectorized scoring.
+    """
+
+    testset_data = [
+        {"question": f"question {index}", "correct_answer": "x" * index}
+        for index in range(5)
+    ]
+    evaluator_config_db = SimpleNamespace(
+        id="semantic-similarity-id",
+        evaluator_key="auto_semantic_similarity",
+        settings_values={"correct_answer_key": "correct_answer"},
+    )
+    evaluators_aggregated_data = {
+        "semantic-similarity-id": {
+            "evaluator_key": "auto_semantic_similarity",
+            "results": [],
+        }
+    }
+
+    embeddings_requests = []
+
+    async def create_embeddings(model, input):
+        # Texts are embedded as the unit vector of their length
+        embeddings_requests.append(list(input))
+        data = []
+        for index, text in enumerate(input):
+            vector = [0.0] * 8
+            vector[len(text) % 8] = 1.0
+            data.append(SimpleNamespace(index=index, embedding=vector))
+        return SimpleNamespace(data=data)
+
+    async def stream_invoke_side_effect(uri, testset_data, parameters, config):
+        index = 0
+        async for _ in testset_data:
+            yield index, make_app_output("x" * (index % 2 * 2))
+            index += 1
+
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.stream_invoke",
+        new=stream_invoke_side_effect,
+    ), patch(
+        "agenta_backend.tasks.evaluations.create_new_evaluation_scenarios",
+        new_callable=AsyncMock,
+    ) as mock_create_new_evaluation_scenarios, patch(
+        "agenta_backend.tasks.evaluations.EVALUATION_WRITE_BATCH_SIZE", 3
+    ), patch.object(
+        evaluators_service,
+        "get_openai_client",
+        return_value=SimpleNamespace(
+            embeddings=SimpleNamespace(create=create_embeddings)
+        ),
+    ), patch.object(
+        embeddings_service, "get_embeddings_cache", return_value=EmbeddingsCache()
+    ), patch.object(
+        evaluators_service,
+        "cosine_similarities",
+        wraps=evaluators_service.cosine_similarities,
+    ) as mock_cosine_similarities:
+        await run_evaluation_pipeline(
+            uri="http://example.com",
+            testset_data=testset_data,
+            app_variant_parameters={},
+            list_inputs=[{"name": "question", "type": "input"}],
+            rate_limit_config={},
+            evaluator_config_dbs=[evaluator_config_db],
+            evaluators_aggregated_data=evaluators_aggregated_data,
+            lm_providers_keys={"OPENAI_API_KEY": "sk-key"},
+            scenario_context={"evaluation_id": "evaluation-id"},
+        )
+
+    # One request (of the distinct texts) and one scoring of the 3 and 2 scenarios
+    # of each write batch
+    assert [sorted(texts) for texts in embeddings_requests] == [
+        ["", "x", "xx"],
+        ["", "xx", "xxx", "xxxx"],
+    ]
+    assert [len(call.args[0]) for call in mock_cosine_similarities.call_args_list] == [
+        3,
+        2,
+    ]
+
+    saved_scenarios = [
+        scenario
+        for call in mock_create_new_evaluation_scenarios.call_args_list
+        for scenario in call.kwargs["evaluation_scenarios"]
+    ]
+    assert [scenario["results"][0].result.value for scenario in saved_scenarios] == [
+        1.0,
+        0.0,
+        0.0,
+        0.0,
+        0.0,
+    ]
+    assert len(evaluators_aggregated_data["semantic-similarity-id"]["results"]) == 5
+
+
+def test_worker_process_shutdown_stops_the_sandbox_process_pool():
+    with patch(
+        "agenta_backend.tasks.evaluations.llm_apps_service.close_client_session",
+        new_callable=AsyncMock,
+    ), patch(
+        "agenta_backend.tasks.evaluations.evaluators_service.close_evaluators_clients",
+        new_callable=AsyncMock,
+    ), patch(
+        "agenta_backend.tasks.evaluations.sandbox.shutdown_process_pool"
+    ) as mock_shutdown_process_pool:
+        worker_process_shutdown.send(sender=None, pid=0, exitcode=0)
+
+    mock_shutdown_process_pool.assert_called_once_with()
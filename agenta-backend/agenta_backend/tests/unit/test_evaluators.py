@@ -1,10 +1,20 @@
 import os
+import json
+import random
+import asyncio
+import weakref
 import pytest
+from unittest.mock import patch
+
+import httpx
 
 from test_traces import simple_rag_trace
 
+from agenta_backend.models.shared_models import Result
+from agenta_backend.services import evaluators_service
 from agenta_backend.services.evaluators_service import (
     auto_levenshtein_distance,
+    levenshtein_distance,
     auto_starts_with,
     auto_ends_with,
     auto_contains,
@@ -395,3 +405,146 @@ def test_rag_context_relevancy_evaluator(settings_values, expected_min, expected
         # - raised by evaluator (agenta) -> TypeError
         assert not isinstance(result.value, float) or not isinstance(result.value, int)
         assert result.error.message == "Error during RAG Context Relevancy evaluation"
+
+
+@pytest.mark.asyncio
+async def test_evaluate_async_bounds_concurrent_evaluations():
+    running = 0
+    max_running = 0
+
+    async def slow_evaluator(*args):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return Result(type="number", value=1.0)
+
+    with patch.object(
+        evaluators_service, "EVALUATORS_MAX_CONCURRENCY", 3
+    ), patch.object(
+        evaluators_service, "_semaphores", weakref.WeakKeyDictionary()
+    ), patch.dict(
+        evaluators_service.ASYNC_EVALUATOR_FUNCTIONS,
+        {"auto_ai_critique": slow_evaluator},
+    ):
+        results = await asyncio.gather(
+            *[
+                evaluators_service.evaluate_async(
+                    "auto_ai_critique", {}, "output", {}, {}, {}, {}
+                )
+                for _ in range(10)
+            ]
+        )
+
+    assert [result.value for result in results] == [1.0] * 10
+    assert max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_evaluate_async_webhook_uses_shared_client():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"score": 0.5})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(evaluators_service, "get_http_client", return_value=client):
+        results = await asyncio.gather(
+            *[
+                evaluators_service.evaluate_async(
+                    "auto_webhook_test",
+                    {"question": "q"},
+                    "output",
+                    {"correct_answer": "answer"},
+                    {},
+                    {
+                        "webhook_url": "http://webhook.example.com",
+                        "correct_answer_key": "correct_answer",
+                    },
+                    {},
+                )
+                for _ in range(3)
+            ]
+        )
+    await client.aclose()
+
+    assert [result.value for result in results] == [0.5] * 3
+    assert requests[0] == {
+        "correct_answer": "answer",
+        "output": "output",
+        "inputs": {"question": "q"},
+    }
+
+
+def reference_levenshtein_distance(s1, s2):
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(
+                min(
+                    previous_row[j + 1] + 1,
+                    current_row[j] + 1,
+                    previous_row[j] + (c1 != c2),
+                )
+            )
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def test_levenshtein_distance_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(2000):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 20)))
+        s2 = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 90)))
+        assert levenshtein_distance(s1, s2) == reference_levenshtein_distance(s1, s2)
+
+    assert levenshtein_distance("a" * 10, "a", max_distance=3) > 3
+
+
+@pytest.mark.parametrize(
+    "evaluator_key, settings_values",
+    [
+        ("auto_exact_match", {"correct_answer_key": "correct_answer"}),
+        ("auto_regex_test", {"regex_pattern": "^h", "regex_should_match": True}),
+        ("auto_regex_test", {"regex_pattern": "(", "regex_should_match": True}),
+        ("auto_starts_with", {"prefix": "HE", "case_sensitive": False}),
+        ("auto_ends_with", {"suffix": "d", "case_sensitive": True}),
+        ("auto_contains", {"substring": "LO", "case_sensitive": False}),
+        ("auto_contains_any", {"substrings": "foo, world", "case_sensitive": True}),
+        ("auto_contains_all", {"substrings": "hello,world", "case_sensitive": True}),
+        ("auto_levenshtein_distance", {"correct_answer_key": "correct_answer"}),
+        (
+            "auto_levenshtein_distance",
+            {"correct_answer_key": "correct_answer", "threshold": 2},
+        ),
+        (
+            "auto_similarity_match",
+            {"correct_answer_key": "correct_answer", "similarity_threshold": 0.3},
+        ),
+        ("auto_similarity_match", {"correct_answer_key": "missing_column"}),
+    ],
+)
+def test_evaluate_batch_matches_evaluate(evaluator_key, settings_values):
+    outputs = ["hello world", {"data": "Hello there"}, "", "world hello", "hell"]
+    data_points = [{"correct_answer": "hello world"}] * 4 + [{"correct_answer": ""}]
+    inputs = [{} for _ in outputs]
+
+    results = evaluators_service.evaluate_batch(
+        evaluator_key, inputs, outputs, data_points, {}, settings_values, {}
+    )
+    expected = [
+        evaluators_service.evaluate(
+            evaluator_key, {}, output, data_point, {}, settings_values, {}
+        )
+        for output, data_point in zip(outputs, data_points)
+    ]
+
+    assert [(result.type, result.value) for result in results] == [
+        (result.type, result.value) for result in expected
+    ]
+    assert [result.error and result.error.message for result in results] == [
+        result.error and result.error.message for result in expected
+    ]
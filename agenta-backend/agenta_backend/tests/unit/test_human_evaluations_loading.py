@@ -0,0 +1,80 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agenta_backend.models import converters
+from agenta_backend.services import db_manager, evaluation_service
+
+
+def make_human_evaluation():
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        app_id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        user=SimpleNamespace(username="user"),
+        status="EVALUATION_FINISHED",
+        evaluation_type="human_a_b_testing",
+        testset_id=uuid.uuid4(),
+        testset=SimpleNamespace(name="testset"),
+        created_at="2024-01-01",
+        updated_at="2024-01-01",
+    )
+
+
+def make_evaluation_variant(variant_name: str, revision: int):
+    return SimpleNamespace(
+        variant_id=uuid.uuid4(),
+        variant=SimpleNamespace(variant_name=variant_name),
+        variant_revision_id=uuid.uuid4(),
+        variant_revision=SimpleNamespace(revision=revision),
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_human_evaluations_loads_variants_in_bulk():
+    evaluations = [make_human_evaluation() for _ in range(50)]
+    evaluations_variants = {
+        str(evaluation.id): [
+            make_evaluation_variant(f"app.v{index}", index),
+            make_evaluation_variant("app.default", 1),
+        ]
+        for index, evaluation in enumerate(evaluations)
+    }
+
+    with patch.object(
+        db_manager, "list_human_evaluations", AsyncMock(return_value=evaluations)
+    ), patch.object(
+        db_manager,
+        "fetch_human_evaluations_variants",
+        AsyncMock(return_value=evaluations_variants),
+    ) as fetch_bulk, patch.object(
+        db_manager, "fetch_human_evaluation_variants", AsyncMock()
+    ) as fetch_one:
+        human_evaluations = await evaluation_service.fetch_list_human_evaluations(
+            app_id=str(uuid.uuid4())
+        )
+
+    fetch_bulk.assert_awaited_once()
+    fetch_one.assert_not_awaited()
+    assert human_evaluations[7].variant_names == ["app.v7", "app.default"]
+    assert human_evaluations[7].revisions == ["7", "1"]
+
+
+@pytest.mark.asyncio
+async def test_simple_evaluation_output_fetches_variants_when_not_given():
+    evaluation = make_human_evaluation()
+    evaluation_variant = make_evaluation_variant("app.v1", 1)
+
+    with patch.object(
+        db_manager,
+        "fetch_human_evaluation_variants",
+        AsyncMock(return_value=[evaluation_variant]),
+    ) as fetch_one:
+        output = await converters.human_evaluation_db_to_simple_evaluation_output(
+            evaluation
+        )
+
+    fetch_one.assert_awaited_once()
+    assert output.variant_ids == [str(evaluation_variant.variant_id)]
@@ -0,0 +1,67 @@
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agenta_backend.services import db_manager, ids_mapping_cache
+
+
+@pytest.fixture
+def cache():
+    cache = ids_mapping_cache.IDsMappingCache(max_size=100, backend="memory")
+    with patch.object(ids_mapping_cache, "_ids_mapping_cache", cache):
+        yield cache
+
+
+def test_is_object_id_matches_bson():
+    from bson import ObjectId
+
+    object_ids = [str(ObjectId()), "65a5bd2c9dbf8d1b8d6d5c2e"]
+    other_ids = [str(uuid.uuid4()), uuid.uuid4().hex, "65a5bd2c9dbf8d1b8d6d5c2z", ""]
+
+    assert all(ids_mapping_cache.is_object_id(object_id) for object_id in object_ids)
+    assert not any(ids_mapping_cache.is_object_id(other_id) for other_id in other_ids)
+
+
+@pytest.mark.asyncio
+async def test_get_object_uuid_returns_uuids_without_querying(cache):
+    app_id = str(uuid.uuid4())
+
+    with patch.object(db_manager, "fetch_corresponding_objects_uuids") as fetch:
+        assert await db_manager.get_object_uuid(app_id, "app_db") == app_id
+
+    fetch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_objects_uuids_resolves_legacy_ids_once(cache):
+    app_uuid, other_app_uuid = str(uuid.uuid4()), str(uuid.uuid4())
+    fetch = AsyncMock(
+        return_value={
+            "65a5bd2c9dbf8d1b8d6d5c2e": app_uuid,
+            "65a5bd2c9dbf8d1b8d6d5c2f": other_app_uuid,
+        }
+    )
+
+    with patch.object(db_manager, "fetch_corresponding_objects_uuids", fetch):
+        object_ids = ["65a5bd2c9dbf8d1b8d6d5c2e", app_uuid, "65a5bd2c9dbf8d1b8d6d5c2f"]
+        assert await db_manager.get_objects_uuids(object_ids, "app_db") == [
+            app_uuid,
+            app_uuid,
+            other_app_uuid,
+        ]
+        assert (
+            await db_manager.get_object_uuid("65a5bd2c9dbf8d1b8d6d5c2e", "app_db")
+            == app_uuid
+        )
+
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_object_uuid_fails_for_unknown_legacy_ids(cache):
+    with patch.object(
+        db_manager, "fetch_corresponding_objects_uuids", AsyncMock(return_value={})
+    ):
+        with pytest.raises(AssertionError):
+            await db_manager.get_object_uuid("65a5bd2c9dbf8d1b8d6d5c2e", "app_db")
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agenta_backend.services import evaluators_service, judge_cache_service
+from agenta_backend.models.api.evaluation_model import LLMJudgeCacheStats
+
+
+@pytest.fixture
+def memory_cache():
+    cache = judge_cache_service.MemoryLLMJudgeCache()
+    with patch.object(judge_cache_service, "_llm_judge_cache", cache):
+        yield cache
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_expires_and_evicts_entries():
+    cache = judge_cache_service.MemoryLLMJudgeCache(ttl=60, max_size=2)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")
+
+    assert await cache.get("b") is None  # least recently used
+    assert await cache.get("a") == "1"
+
+    expired_cache = judge_cache_service.MemoryLLMJudgeCache(ttl=-1)
+    await expired_cache.set("a", "1")
+    assert await expired_cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_llm_judge_call_counts_hits_and_misses(memory_cache):
+    stats = LLMJudgeCacheStats()
+    judge_cache_service.llm_judge_cache_stats.set(stats)
+    call = AsyncMock(return_value=0.75)
+
+    for payload in [{"output": "a"}, {"output": "a"}, {"output": "b"}]:
+        await judge_cache_service.cached_llm_judge_call(
+            "rag_faithfulness", "model", "template", payload, call
+        )
+    response = await judge_cache_service.cached_llm_judge_call(
+        "rag_faithfulness", "model", "template", {"output": "a"}, call
+    )
+
+    assert response == 0.75
+    assert call.await_count == 2
+    assert stats == LLMJudgeCacheStats(hits=2, misses=2)
+
+
+@pytest.mark.asyncio
+async def test_auto_ai_critique_reuses_cached_critique(memory_cache):
+    create = AsyncMock(
+        return_value=SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" 8 "))]
+        )
+    )
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    arguments = dict(
+        inputs={"country": "France"},
+        output="Paris",
+        data_point={"correct_answer": "Paris"},
+        app_params={},
+        settings_values={
+            "prompt_template": "Rate the answer",
+            "correct_answer_key": "correct_answer",
+        },
+        lm_providers_keys={"OPENAI_API_KEY": "key"},
+    )
+
+    with patch.object(evaluators_service, "get_openai_client", return_value=client):
+        first = await evaluators_service.auto_ai_critique_async(**arguments)
+        second = await evaluators_service.auto_ai_critique_async(**arguments)
+        arguments["output"] = "Lyon"
+        third = await evaluators_service.auto_ai_critique_async(**arguments)
+
+    assert first.value == second.value == third.value == "8"
+    assert create.await_count == 2
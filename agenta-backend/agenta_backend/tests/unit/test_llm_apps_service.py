@@ -160,3 +160,53 @@ async def test_batch_invoke_generic_exception():
         assert len(results) == 1
         assert results[0].result.type == "error"
         assert results[0].result.error.message == "Max retries reached"
+
+
+@pytest.mark.asyncio
+async def test_batch_invoke_slow_datapoint_does_not_stall_others():
+    """
+    Test that the invocations are scheduled through a sliding window.
+
+    The first datapoint only completes once the third one has been invoked, which
+    would never happen if the datapoints were invoked in lock-step batches.
+    """
+    with patch(
+        "agenta_backend.services.llm_apps_service.get_parameters_from_openapi",
+        new_callable=AsyncMock,
+    ) as mock_get_parameters_from_openapi, patch(
+        "agenta_backend.services.llm_apps_service.invoke_app", new_callable=AsyncMock
+    ) as mock_invoke_app:
+        mock_get_parameters_from_openapi.return_value = [
+            {"name": "param1", "type": "input"},
+        ]
+        third_datapoint_invoked = asyncio.Event()
+
+        async def invoke_app_side_effect(
+            uri, datapoint, parameters, openapi_parameters
+        ):
+            if datapoint["id"] == 1:
+                await asyncio.wait_for(third_datapoint_invoked.wait(), timeout=5)
+            if datapoint["id"] == 3:
+                third_datapoint_invoked.set()
+            return InvokationResult(
+                result=Result(type="text", value=f"Success {datapoint['id']}"),
+                status_code=200,
+            )
+
+        mock_invoke_app.side_effect = invoke_app_side_effect
+
+        testset_data = [{"id": index, "param1": "value1"} for index in range(1, 5)]
+        rate_limit_config = {
+            "batch_size": 2,
+            "max_retries": 1,
+            "retry_delay": 0,
+            "delay_between_batches": 0,
+        }
+
+        results = await batch_invoke(
+            "http://example.com", testset_data, {}, rate_limit_config
+        )
+
+        assert [result.result.value for result in results] == [
+            f"Success {index}" for index in range(1, 5)
+        ]
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from billiard.pool import Pool
+
+from agenta_backend.services.security import sandbox
+
+
+EVALUATOR_CODE = """
+def evaluate(app_params, inputs, output, correct_answer):
+    return 1.0 if output == correct_answer else 0.0
+"""
+
+SLOW_EVALUATOR_CODE = """
+def evaluate(app_params, inputs, output, correct_answer):
+    while True:
+        pass
+"""
+
+
+def run(code, output, correct_answer="Paris"):
+    return sandbox.execute_code_safely(
+        app_params={},
+        inputs={"country": "France"},
+        output=output,
+        correct_answer=correct_answer,
+        code=code,
+        datapoint={"correct_answer": correct_answer},
+    )
+
+
+def test_execute_code_safely_compiles_code_once():
+    sandbox.compiled_code_cache.clear()
+    misses = sandbox.compiled_code_cache.misses
+
+    assert run(EVALUATOR_CODE, "Paris") == 1.0
+    assert run(EVALUATOR_CODE, "Rome") == 0.0
+    assert sandbox.compiled_code_cache.misses == misses + 1
+
+
+def test_compiled_code_cache_evicts_least_recently_used():
+    cache = sandbox.CompiledCodeCache(max_size=2)
+
+    first = cache.get("a = 1")
+    cache.get("b = 2")
+    assert cache.get("a = 1") is first
+    cache.get("c = 3")
+
+    assert cache.get("a = 1") is first
+    cache.get("b = 2")
+    assert cache.misses == 4  # "b = 2" was evicted and recompiled
+
+
+def test_execute_code_safely_in_process_pool_with_timeout(monkeypatch):
+    monkeypatch.setattr(sandbox, "SANDBOX_PROCESS_POOL_SIZE", 2)
+    monkeypatch.setattr(sandbox, "SANDBOX_TIMEOUT", 1.0)
+    try:
+        assert run(EVALUATOR_CODE, "Paris") == 1.0
+        with pytest.raises(sandbox.SandboxTimeoutError):
+            run(SLOW_EVALUATOR_CODE, "Paris")
+        assert run(EVALUATOR_CODE, "Rome") == 0.0
+    finally:
+        sandbox.shutdown_process_pool()
+
+
+def test_execute_code_safely_in_calling_thread_with_timeout(monkeypatch):
+    monkeypatch.setattr(sandbox, "SANDBOX_TIMEOUT", 0.2)
+    errors = []
+
+    def run_slow_code():
+        try:
+            run(SLOW_EVALUATOR_CODE, "Paris")
+        except sandbox.SandboxTimeoutError as e:
+            errors.append(e)
+
+    # Custom code evaluations run in a thread of the event loop (see evaluate_async)
+    thread = threading.Thread(target=run_slow_code)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert run(EVALUATOR_CODE, "Paris") == 1.0
+
+
+def run_in_process_pool():
+    sandbox.SANDBOX_PROCESS_POOL_SIZE = 2
+    sandbox.SANDBOX_TIMEOUT = 1.0
+    try:
+        results = [run(EVALUATOR_CODE, "Paris"), sandbox._process_pool is not None]
+        try:
+            run(SLOW_EVALUATOR_CODE, "Paris")
+        except sandbox.SandboxTimeoutError:
+            results.append("timeout")
+        return results
+    finally:
+        sandbox.shutdown_process_pool()
+
+
+def test_execute_code_safely_in_process_pool_of_daemonic_process():
+    # Like the processes of prefork Celery workers, which cannot start
+    # the process pools of the standard library
+    with Pool(1) as celery_worker_processes:
+        assert celery_worker_processes.apply(run_in_process_pool) == [
+            1.0,
+            True,
+            "timeout",
+        ]
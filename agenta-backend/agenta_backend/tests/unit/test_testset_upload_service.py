@@ -0,0 +1,130 @@
+import io
+import csv
+import json
+import pytest
+from unittest.mock import patch
+
+from fastapi import UploadFile
+
+from agenta_backend.services import testset_upload_service
+from agenta_backend.services.testset_upload_service import (
+    parse_csv_rows,
+    parse_json_rows,
+    read_upload_chunks,
+    stream_testset_rows,
+)
+
+
+async def split_text(text: str, chunk_size: int):
+    for start in range(0, len(text), chunk_size):
+        yield text[start : start + chunk_size]
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+async def test_parse_csv_rows_matches_dict_reader(chunk_size):
+    csv_text = (
+        'question,answer\n"What is ""agenta""?","An LLMOps\nplatform"\n'
+        "What is 1+1?,2\r\n\nplain,row"
+    )
+
+    rows = await collect(parse_csv_rows(split_text(csv_text, chunk_size)))
+
+    assert rows == list(csv.DictReader(io.StringIO(csv_text)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 5, 1000])
+async def test_parse_json_rows_reads_arrays_and_ndjson(chunk_size):
+    rows = [{"question": "What is [agenta]?", "answer": "a } platform"}, {"n": 12}]
+
+    array_rows = await collect(
+        parse_json_rows(split_text(json.dumps(rows), chunk_size))
+    )
+    ndjson_text = "\n".join(json.dumps(row) for row in rows) + "\n"
+    ndjson_rows = await collect(parse_json_rows(split_text(ndjson_text, chunk_size)))
+
+    assert array_rows == rows
+    assert ndjson_rows == rows
+
+
+@pytest.mark.asyncio
+async def test_parse_json_rows_rejects_truncated_array():
+    with pytest.raises(testset_upload_service.TestsetUploadFormatError):
+        await collect(parse_json_rows(split_text('[{"a": 1}, {"a"', 4)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+@pytest.mark.parametrize(
+    "json_text",
+    ['[{"a": 1} {"a": 2}]', "[,{}]", "[{},,{}]", "[{},]", "[,]", '[{"a": 1}}]'],
+)
+async def test_parse_json_rows_requires_one_comma_between_elements(
+    json_text, chunk_size
+):
+    with pytest.raises(testset_upload_service.TestsetUploadFormatError):
+        await collect(parse_json_rows(split_text(json_text, chunk_size)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"text": "x" * 500_000},
+        {"items": [{"n": index} for index in range(50_000)]},
+    ],
+)
+async def test_parse_json_rows_does_not_decode_long_rows_after_every_chunk(row):
+    rows = [{"n": 1}, row, {"n": 2}]
+    decoder = json.JSONDecoder()
+    decoder_raw_decode = json.JSONDecoder.raw_decode
+    decoded_sizes = []
+
+    def raw_decode(text, position):
+        decoded_sizes.append(len(text) - position)
+        return decoder_raw_decode(decoder, text, position)
+
+    with patch.object(
+        testset_upload_service.json.JSONDecoder, "raw_decode", side_effect=raw_decode
+    ):
+        assert (
+            await collect(parse_json_rows(split_text(json.dumps(rows), 1000))) == rows
+        )
+
+    # Decoding the long row again after each of its chunks would scan ~1000x its size
+    assert sum(decoded_sizes) < 10 * len(json.dumps(row))
+
+
+@pytest.mark.asyncio
+async def test_read_upload_chunks_enforces_size_limit_and_reports_progress():
+    content = "é" * 100
+    progress = []
+
+    def on_progress(bytes_read, size):
+        progress.append(bytes_read)
+
+    file = UploadFile(io.BytesIO(content.encode("utf-8")))
+    chunks = read_upload_chunks(file, chunk_size=7, on_progress=on_progress)
+    assert "".join(await collect(chunks)) == content
+    assert progress[-1] == 200
+
+    file = UploadFile(io.BytesIO(content.encode("utf-8")))
+    with pytest.raises(testset_upload_service.TestsetUploadTooLargeError):
+        await collect(read_upload_chunks(file, max_size=150, chunk_size=7))
+
+
+@pytest.mark.asyncio
+async def test_stream_testset_rows_parses_csv_upload():
+    file = UploadFile(io.BytesIO(b"country,capital\nFrance,Paris\nItaly,Rome\n"))
+
+    rows = await collect(stream_testset_rows(file, upload_type="CSV"))
+
+    assert rows == [
+        {"country": "France", "capital": "Paris"},
+        {"country": "Italy", "capital": "Rome"},
+    ]
@@ -0,0 +1,288 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import insert
+
+from agenta_backend.routers import evaluation_router
+from agenta_backend.services import db_manager, evaluation_service
+from agenta_backend.models.db.postgres_engine import db_engine
+from agenta_backend.models.api.api_models import Result
+from agenta_backend.models.db_models import (
+    EvaluationDB,
+    EvaluationScenarioDB,
+    EvaluatorConfigDB,
+    TestSetDB,
+)
+from agenta_backend.models.api.evaluation_model import (
+    EvaluationScenarioInput,
+    EvaluationScenarioOutput,
+    EvaluationScenarioResult,
+)
+
+
+async def create_compared_evaluations(csvdata, scenarios_inputs):
+    """
+    Creates a testset and one evaluation per list of scenarios inputs.
+    """
+
+    async with db_engine.get_session() as session:
+        testset = TestSetDB(name="compared_evaluations_testset", csvdata=csvdata)
+        session.add(testset)
+        await session.flush()
+
+        evaluations_ids = []
+        for evaluation_scenarios_inputs in scenarios_inputs:
+            evaluation = EvaluationDB(testset_id=testset.id)
+            session.add(evaluation)
+            await session.flush()
+            await session.execute(
+                insert(EvaluationScenarioDB),
+                [
+                    {
+                        "evaluation_id": evaluation.id,
+                        "inputs": [
+                            {"name": name, "type": "text", "value": value}
+                            for name, value in inputs.items()
+                        ],
+                        "outputs": [],
+                        "correct_answers": [],
+                    }
+                    for inputs in evaluation_scenarios_inputs
+                ],
+            )
+            evaluations_ids.append(str(evaluation.id))
+
+        await session.commit()
+        return evaluations_ids
+
+
+@pytest.mark.asyncio
+async def test_fetch_evaluation_scenarios_ids_by_input():
+    messages = [{"role": "user", "content": "Hi"}]
+    evaluations_ids = await create_compared_evaluations(
+        csvdata=[],
+        scenarios_inputs=[
+            [
+                {"country": "France", "messages": messages},
+                {"country": "Italy", "messages": []},
+            ],
+            [{"country": "France", "messages": messages}, {"country": "Spain"}],
+        ],
+    )
+
+    scenarios_inputs = await db_manager.fetch_evaluation_scenarios_ids_by_input(
+        evaluations_ids[::-1], [("country", "France"), ("messages", messages)]
+    )
+
+    # Only the matched inputs are returned, in the order of the given evaluations
+    assert [
+        (input_name, input_value) for input_name, input_value, _ in scenarios_inputs
+    ] == [
+        ("country", "France"),
+        ("messages", messages),
+        ("country", "France"),
+        ("messages", messages),
+    ]
+    scenarios = await db_manager.fetch_evaluation_scenarios_by_ids(
+        [scenario_id for _, _, scenario_id in scenarios_inputs]
+    )
+    assert [str(scenario.evaluation_id) for scenario in scenarios] == [
+        evaluations_ids[0],
+        evaluations_ids[1],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compare_evaluations_scenarios_matches_inputs_in_sql():
+    csvdata = [
+        {"country": "France", "correct_answer": "Paris"},
+        {"country": "Italy", "correct_answer": "Rome"},
+    ]
+    evaluations_ids = await create_compared_evaluations(
+        csvdata=csvdata,
+        scenarios_inputs=[
+            [{"country": "France"}, {"country": "Italy"}],
+            [{"country": "Italy"}, {"country": "Germany"}],
+        ],
+    )
+
+    in_memory = await evaluation_service.compare_evaluations_scenarios(
+        evaluations_ids, use_sql_index=False
+    )
+    in_sql = await evaluation_service.compare_evaluations_scenarios(
+        evaluations_ids, use_sql_index=True
+    )
+
+    assert in_sql == in_memory
+    assert [len(result["scenarios"]) for result in in_sql["data"]] == [1, 2]
+
+
+async def create_evaluation_with_evaluators(user, app_variant, evaluator_keys):
+    """
+    Creates an evaluation of the app variant and one evaluator config per key.
+    """
+
+    async with db_engine.get_session() as session:
+        evaluation = EvaluationDB(
+            app_id=app_variant.app_id, user_id=user.id, variant_id=app_variant.id
+        )
+        evaluator_configs = [
+            EvaluatorConfigDB(name=key, evaluator_key=key, user_id=user.id)
+            for key in evaluator_keys
+        ]
+        session.add_all([evaluation, *evaluator_configs])
+        await session.commit()
+        return str(evaluation.id), [
+            str(evaluator_config.id) for evaluator_config in evaluator_configs
+        ]
+
+
+def make_evaluation_scenario(question, answer, results):
+    return {
+        "inputs": [
+            EvaluationScenarioInput(name="question", type="text", value=question)
+        ],
+        "outputs": [EvaluationScenarioOutput(result=answer)],
+        "correct_answers": [],
+        "results": [
+            EvaluationScenarioResult(
+                evaluator_config=evaluator_config_id, result=result
+            )
+            for evaluator_config_id, result in results.items()
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_new_evaluation_scenarios_links_results_in_input_order(
+    get_first_user_app,
+):
+    app_variant, user, *_ = await get_first_user_app
+    evaluation_id, evaluator_configs_ids = await create_evaluation_with_evaluators(
+        user, app_variant, ["auto_exact_match", "auto_regex_test"]
+    )
+    evaluation_scenarios = [
+        make_evaluation_scenario(
+            f"question {index}",
+            Result(type="text", value=f"answer {index}"),
+            {
+                evaluator_config_id: Result(type="number", value=index * 10 + position)
+                for position, evaluator_config_id in enumerate(evaluator_configs_ids)
+            },
+        )
+        for index in range(50)
+    ]
+
+    scenarios_ids = await db_manager.create_new_evaluation_scenarios(
+        user_id=str(user.id),
+        evaluation_id=evaluation_id,
+        variant_id=str(app_variant.id),
+        evaluation_scenarios=evaluation_scenarios,
+    )
+
+    # The IDs are returned in input order, and scenarios are fetched in that order
+    scenarios = await db_manager.fetch_evaluation_scenarios(evaluation_id)
+    assert [str(scenario.id) for scenario in scenarios] == scenarios_ids
+    for index, scenario in enumerate(scenarios):
+        assert scenario.inputs[0]["value"] == f"question {index}"
+        assert scenario.outputs[0]["result"]["value"] == f"answer {index}"
+        assert {
+            str(result.evaluator_config_id): result.result["value"]
+            for result in scenario.results
+        } == {
+            evaluator_config_id: index * 10 + position
+            for position, evaluator_config_id in enumerate(evaluator_configs_ids)
+        }
+
+
+@pytest.mark.asyncio
+async def test_fetch_evaluation_scenarios_filters_and_projects_scenarios(
+    get_first_user_app,
+):
+    app_variant, user, *_ = await get_first_user_app
+    evaluation_id, (exact_match_id, regex_id) = await create_evaluation_with_evaluators(
+        user, app_variant, ["auto_exact_match", "auto_regex_test"]
+    )
+    error = Result(type="error", error={"message": "Failed"})
+    await db_manager.create_new_evaluation_scenarios(
+        user_id=str(user.id),
+        evaluation_id=evaluation_id,
+        variant_id=str(app_variant.id),
+        evaluation_scenarios=[
+            make_evaluation_scenario(
+                "question 0",
+                Result(type="text", value="answer 0"),
+                {
+                    exact_match_id: Result(type="bool", value=True),
+                    regex_id: Result(type="bool", value=False),
+                },
+            ),
+            make_evaluation_scenario(
+                "question 1",
+                Result(type="text", value="answer 1"),
+                {exact_match_id: Result(type="bool", value=False), regex_id: error},
+            ),
+            make_evaluation_scenario("question 2", error, {}),
+        ],
+    )
+
+    app = FastAPI()
+    app.include_router(evaluation_router.router, prefix="/evaluations")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def fetch_questions(**params):
+            response = await client.get(
+                f"/evaluations/{evaluation_id}/evaluation_scenarios/", params=params
+            )
+            assert response.status_code == 200, response.text
+            return [scenario["inputs"][0]["value"] for scenario in response.json()]
+
+        assert await fetch_questions(evaluator_config_id=exact_match_id) == [
+            "question 0",
+            "question 1",
+        ]
+        assert await fetch_questions(
+            evaluator_config_id=exact_match_id, result_value="true"
+        ) == ["question 0"]
+        assert await fetch_questions(
+            evaluator_config_id=regex_id, result_value="false"
+        ) == ["question 0"]
+        assert await fetch_questions(has_error=True) == ["question 1", "question 2"]
+        assert await fetch_questions(has_error=False) == ["question 0"]
+
+        # Only the requested fields are returned, page by page
+        response = await client.get(
+            f"/evaluations/{evaluation_id}/evaluation_scenarios/",
+            params={"fields": ["inputs", "results"], "limit": 2},
+        )
+        assert response.status_code == 200
+        scenarios = response.json()
+        assert [set(scenario) for scenario in scenarios] == [
+            {"id", "evaluation_id", "inputs", "results"}
+        ] * 2
+        assert [len(scenario["results"]) for scenario in scenarios] == [2, 2]
+        assert response.headers["X-Next-Cursor"] == scenarios[-1]["id"]
+
+        response = await client.get(
+            f"/evaluations/{evaluation_id}/evaluation_scenarios/",
+            params={
+                "fields": ["inputs"],
+                "limit": 2,
+                "cursor": response.headers["X-Next-Cursor"],
+            },
+        )
+        assert [scenario["inputs"][0]["value"] for scenario in response.json()] == [
+            "question 2"
+        ]
+        assert "X-Next-Cursor" not in response.headers
+
+        # Malformed or incomplete filters are rejected
+        for params in [
+            {"evaluator_config_id": "not-a-uuid"},
+            {"result_value": "true"},
+        ]:
+            response = await client.get(
+                f"/evaluations/{evaluation_id}/evaluation_scenarios/", params=params
+            )
+            assert response.status_code == 422
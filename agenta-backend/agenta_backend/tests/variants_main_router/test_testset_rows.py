@@ -0,0 +1,119 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from unittest.mock import patch
+
+from agenta_backend.routers import testset_router
+from agenta_backend.services import db_manager
+
+
+def make_rows(count):
+    return [
+        {"question": f"question {index}", "answer": f"answer {index}"}
+        for index in range(count)
+    ]
+
+
+async def stream_rows(rows):
+    for row in rows:
+        yield row
+
+
+async def create_testset(get_first_user_app, rows):
+    _, user, app, *_ = await get_first_user_app
+
+    # Testsets of 5 rows or more are stored in rows mode, inserted 2 rows at a time
+    with patch.object(db_manager, "TESTSET_ROWS_STORAGE_THRESHOLD", 5), patch.object(
+        db_manager, "TESTSET_ROWS_INSERT_BATCH_SIZE", 2
+    ):
+        return await db_manager.create_testset_from_rows(
+            app, user.uid, "streamed_testset", stream_rows(rows)
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "rows_count, storage_mode", [(0, "json"), (4, "json"), (5, "rows"), (7, "rows")]
+)
+async def test_create_testset_from_rows_switches_to_rows_mode_at_threshold(
+    get_first_user_app, rows_count, storage_mode
+):
+    rows = make_rows(rows_count)
+
+    testset, count = await create_testset(get_first_user_app, rows)
+
+    assert count == rows_count
+    assert testset.storage_mode == storage_mode
+    assert testset.csvdata == (rows if storage_mode == "json" else None)
+    assert await db_manager.fetch_testset_csvdata(testset) == rows
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows_count", [4, 7])
+async def test_fetch_testset_rows_paginates_by_position(get_first_user_app, rows_count):
+    rows = make_rows(rows_count)
+    testset, _ = await create_testset(get_first_user_app, rows)
+
+    first_page = await db_manager.fetch_testset_rows(str(testset.id), limit=3)
+    assert first_page == list(enumerate(rows))[:3]
+
+    next_page = await db_manager.fetch_testset_rows(
+        str(testset.id), after=first_page[-1][0], limit=3
+    )
+    assert next_page == list(enumerate(rows))[3:6]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows_count", [4, 7])
+async def test_fetch_testset_rows_projects_columns(get_first_user_app, rows_count):
+    rows = make_rows(rows_count)
+    testset, _ = await create_testset(get_first_user_app, rows)
+
+    page = await db_manager.fetch_testset_rows(
+        str(testset.id), after=1, limit=2, columns=["answer", "missing"]
+    )
+
+    assert page == [
+        (position, {"answer": rows[position]["answer"], "missing": None})
+        for position in [2, 3]
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rows_count", [4, 7])
+async def test_iterate_testset_rows_yields_rows_in_order(
+    get_first_user_app, rows_count
+):
+    rows = make_rows(rows_count)
+    testset, _ = await create_testset(get_first_user_app, rows)
+
+    assert [
+        row async for row in db_manager.iterate_testset_rows(str(testset.id), 2)
+    ] == rows
+    assert [
+        row
+        async for row in db_manager.iterate_testset_rows(
+            str(testset.id), 2, columns=["question"]
+        )
+    ] == [{"question": row["question"]} for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_get_testset_rows_rejects_malformed_testset_ids(get_first_user_app):
+    testset, _ = await create_testset(get_first_user_app, make_rows(7))
+
+    app = FastAPI()
+    app.include_router(testset_router.router, prefix="/testsets")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(
+            f"/testsets/{testset.id}/rows/", params={"limit": 4, "columns": "answer"}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "rows": [{"answer": f"answer {index}"} for index in range(4)],
+            "next_cursor": 3,
+        }
+
+        response = await client.get("/testsets/not-a-uuid/rows/")
+        assert response.status_code == 422
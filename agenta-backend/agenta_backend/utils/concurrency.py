@@ -0,0 +1,119 @@
+import time
+import asyncio
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are added at a constant `rate` (per second) up to `capacity`; each
+    acquisition consumes one token and waits until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("The rate of a token bucket must be positive.")
+
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token is available and consumes it.
+        """
+
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limiter whose limit adapts to the observed latency and overload signals (AIMD).
+
+    The limit grows additively (by about one slot per limit's worth of successful calls)
+    and is cut multiplicatively when a call is reported as overloaded (e.g. HTTP 429/503)
+    or when the recent latency exceeds `latency_tolerance` times the long-run latency.
+    Decreases are spaced by the recent latency, so that a single burst of failures
+    only counts once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit or initial_limit, self.min_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+
+        self.in_flight = 0
+        self.recent_latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.last_decrease_at = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """
+        Waits until a slot is available under the current limit and takes it.
+        """
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        """
+        Releases a slot taken with `acquire`.
+        """
+
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Adapts the limit to the outcome of a call.
+
+        Args:
+            latency (float): The duration of the call, in seconds.
+            overloaded (bool): Whether the callee reported being overloaded.
+        """
+
+        if self.recent_latency is None or self.baseline_latency is None:
+            self.recent_latency = self.baseline_latency = latency
+        else:
+            self.recent_latency += self.smoothing * (latency - self.recent_latency)
+            self.baseline_latency += (
+                self.smoothing / 10 * (latency - self.baseline_latency)
+            )
+
+        congested = self.recent_latency > self.latency_tolerance * self.baseline_latency
+        if overloaded or congested:
+            now = time.monotonic()
+            if now - self.last_decrease_at >= self.recent_latency:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self.last_decrease_at = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
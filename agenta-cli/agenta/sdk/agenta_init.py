@@ -4,6 +4,7 @@ import toml
 from typing import Optional
 
 from agenta.sdk.utils.globals import set_global
+from agenta.sdk.config_cache import ConfigCache
 from agenta.client.backend.client import AgentaApi
 from agenta.sdk.tracing.llm_tracing import Tracing
 from agenta.client.exceptions import APIRequestError
@@ -96,6 +97,7 @@ class Config:
             self.client = AgentaApi(
                 base_url=self.host + "/api", api_key=api_key if api_key else ""
             )
+            self.cache = ConfigCache(host=self.host, api_key=api_key)
 
     def register_default(self, overwrite=False, **kwargs):
         """alias for default"""
@@ -141,30 +143,58 @@ class Config:
     def pull(
         self, config_name: str = "default", environment_name: Optional[str] = None
     ):
-        """Pulls the parameters for the app variant from the server and sets them to the config"""
-        if not self.persist and (
-            config_name != "default" or environment_name is not None
-        ):
-            raise ValueError(
-                "Cannot pull the configuration from the server since the app_name and base_name are not provided."
-            )
-        if self.persist:
+        """Pulls the parameters for the app variant from the server and sets them to the config
+
+        The configuration is cached (see `ConfigCache`), so that the server is only
+        requested when it is not cached yet or is stale.
+        """
+        config = None
+        if self._can_pull(config_name, environment_name):
             try:
-                if environment_name:
-                    config = self.client.configs.get_config(
-                        base_id=self.base_id, environment_name=environment_name
-                    )
-
-                else:
-                    config = self.client.configs.get_config(
-                        base_id=self.base_id,
-                        config_name=config_name,
-                    )
+                config = self.cache.get(
+                    base_id=self.base_id,
+                    environment_name=environment_name,
+                    config_name=None if environment_name else config_name,
+                )
             except Exception as ex:
                 logger.warning(
                     "Failed to pull the configuration from the server with error: %s",
                     str(ex),
                 )
+        self._set_pulled(config)
+
+    async def apull(
+        self, config_name: str = "default", environment_name: Optional[str] = None
+    ):
+        """Pulls the parameters for the app variant from the server without blocking the event loop
+
+        Same as `pull`, with the configuration fetched asynchronously when it is not cached.
+        """
+        config = None
+        if self._can_pull(config_name, environment_name):
+            try:
+                config = await self.cache.aget(
+                    base_id=self.base_id,
+                    environment_name=environment_name,
+                    config_name=None if environment_name else config_name,
+                )
+            except Exception as ex:
+                logger.warning(
+                    "Failed to pull the configuration from the server with error: %s",
+                    str(ex),
+                )
+        self._set_pulled(config)
+
+    def _can_pull(self, config_name: str, environment_name: Optional[str]) -> bool:
+        if not self.persist and (
+            config_name != "default" or environment_name is not None
+        ):
+            raise ValueError(
+                "Cannot pull the configuration from the server since the app_name and base_name are not provided."
+            )
+        return self.persist
+
+    def _set_pulled(self, config) -> None:
         try:
             self.set(**{"current_version": config.current_version, **config.parameters})
         except Exception as ex:
@@ -184,6 +214,7 @@ class Config:
                 "api_key",
                 "persist",
                 "client",
+                "cache",
             ]
         }
 
@@ -0,0 +1,292 @@
+# Stdlib Imports
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Own Imports
+from agenta.client.backend.client import AgentaApi, AsyncAgentaApi
+from agenta.client.backend.types.get_config_response import GetConfigResponse
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class ConfigKey(NamedTuple):
+    base_id: str
+    environment_name: Optional[str] = None
+    config_name: Optional[str] = None
+    version: Optional[str] = None
+
+
+class ConfigCache(object):
+    """Caches the configurations fetched from the backend, with stale-while-revalidate.
+
+    A configuration younger than `ttl` seconds is returned as is. An older one is
+    still returned, while a single background request (a task of the event loop
+    with `aget`, a thread with `get`) refreshes it, until it is `ttl + max_staleness`
+    seconds old; it is then fetched again before returning. Failed refreshes keep
+    the cached configuration.
+
+    Configurations are invalidated with `invalidate` (e.g. from a deployment
+    webhook), and can also be refreshed every `poll_interval` seconds by a
+    background thread, so that deployments are picked up without waiting for a
+    request to find the configuration stale.
+
+    Args:
+        host (str): The URL of the backend
+        api_key (str): The API Key of the backend host
+        ttl (float): How long a configuration is used without being refreshed (in seconds)
+        max_staleness (float): How long a configuration is used while being refreshed, after its TTL (in seconds)
+        poll_interval (Optional[float]): The interval at which the cached configurations are refreshed (in seconds, no polling if None)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        api_key: Optional[str] = "",
+        ttl: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.host = host
+        self.api_key = api_key if api_key else ""
+        self.ttl = (
+            ttl
+            if ttl is not None
+            else float(os.environ.get("AGENTA_CONFIG_CACHE_TTL", "30"))
+        )
+        self.max_staleness = (
+            max_staleness
+            if max_staleness is not None
+            else float(os.environ.get("AGENTA_CONFIG_CACHE_MAX_STALENESS", "300"))
+        )
+        if poll_interval is None and os.environ.get(
+            "AGENTA_CONFIG_CACHE_POLL_INTERVAL"
+        ):
+            poll_interval = float(os.environ["AGENTA_CONFIG_CACHE_POLL_INTERVAL"])
+        self.poll_interval = poll_interval
+
+        self._entries: Dict[ConfigKey, Tuple[float, GetConfigResponse]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self._client: Optional[AgentaApi] = None
+        self._async_clients: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )  # event loop -> (pid, client)
+        self._pending: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )  # event loop -> {key: future}
+        self._poller: Optional[threading.Thread] = None
+
+    @property
+    def client(self) -> AgentaApi:
+        if self._client is None:
+            self._client = AgentaApi(base_url=self.host + "/api", api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncAgentaApi:
+        """Returns the async client of the running event loop (and process)"""
+
+        loop = asyncio.get_running_loop()
+        pid, client = self._async_clients.get(loop, (None, None))
+        if client is None or pid != os.getpid():
+            client = AsyncAgentaApi(base_url=self.host + "/api", api_key=self.api_key)
+            self._async_clients[loop] = (os.getpid(), client)
+        return client
+
+    def _lookup(self, key: ConfigKey) -> Tuple[Optional[GetConfigResponse], bool]:
+        """Returns the cached configuration (if still usable) and whether it is stale"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        age = time.monotonic() - entry[0]
+        if age > self.ttl + self.max_staleness:
+            return None, False
+        return entry[1], age > self.ttl
+
+    def _store(self, key: ConfigKey, config: GetConfigResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), config)
+        self._ensure_poller()
+
+    def _fetch(self, key: ConfigKey) -> GetConfigResponse:
+        config = self.client.configs.get_config(
+            base_id=key.base_id,
+            config_name=key.config_name,
+            environment_name=key.environment_name,
+        )
+        self._store(key, config)
+        return config
+
+    async def _afetch(self, key: ConfigKey) -> GetConfigResponse:
+        config = await self.async_client.configs.get_config(
+            base_id=key.base_id,
+            config_name=key.config_name,
+            environment_name=key.environment_name,
+        )
+        self._store(key, config)
+        return config
+
+    def _start_refresh(self, key: ConfigKey) -> bool:
+        """Returns whether the caller should refresh the configuration (once at a time per key)"""
+
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: ConfigKey) -> None:
+        try:
+            self._fetch(key)
+        except Exception as ex:
+            logger.warning(
+                "Failed to refresh the configuration %s with error: %s", key, ex
+            )
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _arefresh(self, key: ConfigKey) -> None:
+        try:
+            await self._afetch(key)
+        except Exception as ex:
+            logger.warning(
+                "Failed to refresh the configuration %s with error: %s", key, ex
+            )
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(
+        self,
+        base_id: str,
+        environment_name: Optional[str] = None,
+        config_name: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> GetConfigResponse:
+        """Returns a configuration, fetching it synchronously if it is not cached
+
+        Args:
+            base_id (str): The ID of the base
+            environment_name (Optional[str]): The environment the configuration is deployed to
+            config_name (Optional[str]): The name of the configuration
+            version (Optional[str]): The version of the configuration
+
+        Returns:
+            GetConfigResponse: The configuration
+        """
+
+        key = ConfigKey(base_id, environment_name, config_name, version)
+        config, stale = self._lookup(key)
+        if config is None:
+            return self._fetch(key)
+        if stale and self._start_refresh(key):
+            threading.Thread(
+                target=self._refresh,
+                args=(key,),
+                name="agenta-config-refresh",
+                daemon=True,
+            ).start()
+        return config
+
+    async def aget(
+        self,
+        base_id: str,
+        environment_name: Optional[str] = None,
+        config_name: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> GetConfigResponse:
+        """Returns a configuration, fetching it asynchronously if it is not cached
+
+        Concurrent requests for a configuration that is not cached share one fetch.
+
+        Args:
+            base_id (str): The ID of the base
+            environment_name (Optional[str]): The environment the configuration is deployed to
+            config_name (Optional[str]): The name of the configuration
+            version (Optional[str]): The version of the configuration
+
+        Returns:
+            GetConfigResponse: The configuration
+        """
+
+        key = ConfigKey(base_id, environment_name, config_name, version)
+        config, stale = self._lookup(key)
+        if config is not None:
+            if stale and self._start_refresh(key):
+                task = asyncio.ensure_future(self._arefresh(key))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return config
+
+        pending = self._pending.setdefault(asyncio.get_running_loop(), {})
+        if key not in pending:
+            pending[key] = asyncio.ensure_future(self._afetch(key))
+            pending[key].add_done_callback(lambda _: pending.pop(key, None))
+        return await asyncio.shield(pending[key])
+
+    def invalidate(
+        self,
+        base_id: Optional[str] = None,
+        environment_name: Optional[str] = None,
+        config_name: Optional[str] = None,
+    ) -> None:
+        """Removes cached configurations, so that they are fetched again on their next use
+
+        Args:
+            base_id (Optional[str]): Only the configurations of this base (all if None)
+            environment_name (Optional[str]): Only the configuration deployed to this environment
+            config_name (Optional[str]): Only the configuration with this name
+        """
+
+        with self._lock:
+            for key in list(self._entries):
+                if (
+                    (base_id is None or key.base_id == base_id)
+                    and (
+                        environment_name is None
+                        or key.environment_name == environment_name
+                    )
+                    and (config_name is None or key.config_name == config_name)
+                ):
+                    del self._entries[key]
+
+    def _ensure_poller(self) -> None:
+        """Starts the polling thread, if enabled (once per process)"""
+
+        if not self.poll_interval or (
+            self._poller is not None and self._poller.is_alive()
+        ):
+            return
+
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(
+                    target=self._poll, name="agenta-config-poller", daemon=True
+                )
+                self._poller.start()
+
+    def _poll(self) -> None:
+        """Refreshes all the cached configurations every poll_interval seconds"""
+
+        while True:
+            time.sleep(self.poll_interval)  # type: ignore
+            with self._lock:
+                keys = list(self._entries)
+            for key in keys:
+                try:
+                    self._fetch(key)
+                except Exception as ex:
+                    logger.warning(
+                        "Failed to poll the configuration %s with error: %s", key, ex
+                    )
@@ -1,12 +1,12 @@
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Type, TypeVar
+from typing import Dict, Optional, Type, TypeVar
 
 import yaml
 from pydantic import BaseModel, ValidationError
 
-from agenta.client.backend.client import AgentaApi
+from agenta.sdk.config_cache import ConfigCache
 from agenta.sdk.decorators.llm_entrypoint import route_context
 
 from . import AgentaSingleton
@@ -20,7 +20,7 @@ AVAILABLE_ENVIRONMENTS = ["development", "production", "staging"]
 
 
 class ConfigManager:
-    client = None
+    cache: Optional[ConfigCache] = None
 
     @staticmethod
     def get_from_route(schema: Type[T]) -> T:
@@ -66,6 +66,31 @@ class ConfigManager:
         else:
             raise ValueError("Either config, environment or variant must be provided")
 
+    @staticmethod
+    async def aget_from_route(schema: Type[T]) -> T:
+        """
+        Same as `get_from_route`, with the configuration fetched asynchronously when it is not cached.
+        """
+        context = route_context.get()
+        if context.get("config") and (
+            context.get("environment") or context.get("variant")
+        ):
+            raise ValueError(
+                "Either config, environment or variant must be provided. Not both."
+            )
+        if context.get("config"):
+            return schema(**context["config"])
+        elif context.get("environment"):
+            return await ConfigManager.aget_from_registry(
+                schema, environment=context["environment"]
+            )
+        elif context.get("variant"):
+            return await ConfigManager.aget_from_registry(
+                schema, variant=context["variant"]
+            )
+        else:
+            raise ValueError("Either config, environment or variant must be provided")
+
     @staticmethod
     def get_from_registry(
         schema: Type[T],
@@ -97,43 +122,50 @@ class ConfigManager:
             Exception: For any other errors during the process (e.g., API communication issues).
 
         Note:
-            Either environment or variant must be provided, but not both.
+            Either environment or variant must be provided, but not both. The configuration
+            is cached (see `ConfigCache`), so that the server is only requested when it
+            is not cached yet or is stale.
         """
-        if not ConfigManager.client:
-            try:
-                ConfigManager.client = AgentaApi(
-                    base_url=singleton.host + "/api",
-                    api_key=singleton.api_key if singleton.api_key else "",
-                )
-            except Exception as ex:
-                logger.error(
-                    "Failed to initialize Agenta client with error: %s", str(ex)
-                )
-                raise
-        if not environment and not variant:
-            raise ValueError("Either environment or variant must be provided")
+        config_key = ConfigManager._get_registry_key(environment, version, variant)
         try:
-            if environment:
-                if version:
-                    raise NotImplementedError(
-                        "Getting config for a specific version is not implemented yet."
-                    )
-                else:
-                    assert (
-                        environment in AVAILABLE_ENVIRONMENTS
-                    ), f"Environment must be in {AVAILABLE_ENVIRONMENTS}"
-                    config = ConfigManager.client.configs.get_config(
-                        base_id=singleton.base_id, environment_name=environment
-                    )
-            elif variant:
-                config = ConfigManager.client.configs.get_config(
-                    base_id=singleton.base_id, config_name=variant
-                )
+            config = ConfigManager._get_cache().get(
+                base_id=singleton.base_id, **config_key
+            )
+        except Exception as ex:
+            logger.error(
+                "Failed to pull the configuration from the server with error: %s",
+                str(ex),
+            )
+            raise
+
+        try:
+            result = schema(**config.parameters)
+        except ValidationError as ex:
+            logger.error("Failed to validate the configuration with error: %s", str(ex))
+            raise
+        return result
+
+    @staticmethod
+    async def aget_from_registry(
+        schema: Type[T],
+        environment: Optional[str] = None,
+        version: Optional[str] = None,
+        variant: Optional[str] = None,
+    ) -> T:
+        """
+        Same as `get_from_registry`, with the configuration fetched asynchronously when it is not cached.
+        """
+        config_key = ConfigManager._get_registry_key(environment, version, variant)
+        try:
+            config = await ConfigManager._get_cache().aget(
+                base_id=singleton.base_id, **config_key
+            )
         except Exception as ex:
             logger.error(
                 "Failed to pull the configuration from the server with error: %s",
                 str(ex),
             )
+            raise
 
         try:
             result = schema(**config.parameters)
@@ -142,6 +174,31 @@ class ConfigManager:
             raise
         return result
 
+    @staticmethod
+    def _get_cache() -> ConfigCache:
+        if not ConfigManager.cache:
+            ConfigManager.cache = ConfigCache(
+                host=singleton.host, api_key=singleton.api_key
+            )
+        return ConfigManager.cache
+
+    @staticmethod
+    def _get_registry_key(
+        environment: Optional[str], version: Optional[str], variant: Optional[str]
+    ) -> Dict[str, Optional[str]]:
+        if not environment and not variant:
+            raise ValueError("Either environment or variant must be provided")
+        if environment:
+            if version:
+                raise NotImplementedError(
+                    "Getting config for a specific version is not implemented yet."
+                )
+            assert (
+                environment in AVAILABLE_ENVIRONMENTS
+            ), f"Environment must be in {AVAILABLE_ENVIRONMENTS}"
+            return {"environment_name": environment}
+        return {"config_name": variant}
+
     @staticmethod
     def get_from_yaml(filename: str, schema: Type[T]) -> T:
         """
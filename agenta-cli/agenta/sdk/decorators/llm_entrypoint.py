@@ -9,8 +9,10 @@ import inspect
 import argparse
 import asyncio
 import traceback
+import threading
 import functools
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
 from typing import Any, Callable, Dict, Optional, Tuple, List
 from importlib.metadata import version
@@ -71,6 +73,60 @@ logging.setLevel("DEBUG")
 
 route_context = contextvars.ContextVar("route_context", default={})
 
+# How synchronous entrypoints are executed: "inline" (on the event loop, one request
+# at a time) or "thread" (in a thread pool, so that requests are served concurrently).
+# With "thread", apps must not rely on the global `ag.config` being request-specific.
+SYNC_EXECUTION_MODE = os.environ.get("AGENTA_SYNC_EXECUTION_MODE", "inline").lower()
+# The number of threads running synchronous entrypoints (Python's default if unset)
+SYNC_EXECUTION_MAX_WORKERS = (
+    int(os.environ["AGENTA_SYNC_EXECUTION_MAX_WORKERS"])
+    if os.environ.get("AGENTA_SYNC_EXECUTION_MAX_WORKERS")
+    else None
+)
+
+# How long a request waits for the spans of its trace to close, before dumping
+# the trace (in seconds, 0 to not wait)
+TRACE_COMPLETION_TIMEOUT = float(os.environ.get("AGENTA_TRACE_COMPLETION_TIMEOUT", 1))
+
+_sync_executor: Optional[ThreadPoolExecutor] = None
+_sync_executor_lock = threading.Lock()
+
+
+def get_sync_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool running synchronous entrypoints (created once per process)"""
+
+    global _sync_executor
+    if _sync_executor is None:
+        with _sync_executor_lock:
+            if _sync_executor is None:
+                _sync_executor = ThreadPoolExecutor(
+                    max_workers=SYNC_EXECUTION_MAX_WORKERS,
+                    thread_name_prefix="agenta-entrypoint",
+                )
+    return _sync_executor
+
+
+async def run_in_thread(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a synchronous function in the thread pool, without blocking the event loop.
+
+    The function runs in a copy of the current context, so that the tracing context
+    (and the spans of the `@instrument`-ed functions it calls) and the route context
+    of the request are propagated to the thread.
+
+    Args:
+        func (Callable[..., Any]): The synchronous function
+        args: The positional arguments of the function
+        kwargs: The keyword arguments of the function
+
+    Returns:
+        Any: The result of the function
+    """
+
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_sync_executor(), functools.partial(context.run, func, *args, **kwargs)
+    )
+
 
 @contextmanager
 def route_context_manager(
@@ -246,11 +302,11 @@ class entrypoint(BaseDecorator):
             }
             if not config_schema:
                 if "environment" in kwargs and kwargs["environment"] is not None:
-                    ag.config.pull(environment_name=kwargs["environment"])
+                    await ag.config.apull(environment_name=kwargs["environment"])
                 elif "config" in kwargs and kwargs["config"] is not None:
-                    ag.config.pull(config_name=kwargs["config"])
+                    await ag.config.apull(config_name=kwargs["config"])
                 else:
-                    ag.config.pull(config_name="default")
+                    await ag.config.apull(config_name="default")
 
             # Set the configuration and environment of the LLM app parent span at run-time
             ag.tracing.update_baggage(
@@ -355,16 +411,12 @@ class entrypoint(BaseDecorator):
         try:
             """Note: The following block is for backward compatibility.
             It allows functions to work seamlessly whether they are synchronous or asynchronous.
-            For synchronous functions, it calls them directly, while for asynchronous functions,
-            it awaits their execution.
+            For synchronous functions, it calls them directly (or in the thread pool, with
+            AGENTA_SYNC_EXECUTION_MODE=thread), while for asynchronous functions, it awaits
+            their execution.
             """
             logging.info(f"Using Agenta Python SDK version {version('agenta')}")
 
-            WAIT_FOR_SPANS = True
-            TIMEOUT = 1
-            TIMESTEP = 0.1
-            NOFSTEPS = TIMEOUT / TIMESTEP
-
             data = None
             trace = None
 
@@ -376,16 +428,14 @@ class entrypoint(BaseDecorator):
 
             if is_coroutine_function:
                 result = await func(*args, **func_params["params"])
+            elif SYNC_EXECUTION_MODE == "thread":
+                result = await run_in_thread(func, *args, **func_params["params"])
             else:
                 result = func(*args, **func_params["params"])
 
             if token is not None:
-                if WAIT_FOR_SPANS:
-                    remaining_steps = NOFSTEPS
-
-                    while not ag.tracing.is_trace_ready() and remaining_steps > 0:
-                        await asyncio.sleep(TIMESTEP)
-                        remaining_steps -= 1
+                if TRACE_COMPLETION_TIMEOUT > 0:
+                    await ag.tracing.wait_for_trace(timeout=TRACE_COMPLETION_TIMEOUT)
 
                 trace = ag.tracing.dump_trace()
 
@@ -2,7 +2,7 @@
 import inspect
 import traceback
 from functools import wraps
-from typing import Any, Callable, Optional, List, Union
+from typing import Any, Callable, Dict, Optional, List, Union
 
 # Own Imports
 import agenta as ag
@@ -14,6 +14,28 @@ from agenta.sdk.utils.debug import debug, DEBUG, SHIFT
 logging.setLevel("DEBUG")
 
 
+def make_redactor(
+    blacklist: Union[List[str], bool]
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Returns the function removing the ignored keys from the inputs or outputs of a span.
+    Args:
+        blacklist (Union[List[str], bool]): The keys to ignore, all of them if True, none if False
+
+    Returns:
+        Callable[[Dict[str, Any]], Dict[str, Any]]: The redaction function
+    """
+
+    if blacklist is False:
+        return lambda io: io
+    if not isinstance(blacklist, list):
+        return lambda io: {}
+
+    ignored_keys = frozenset(blacklist)
+    return lambda io: {
+        key: value for key, value in io.items() if key not in ignored_keys
+    }
+
+
 class instrument(BaseDecorator):
     """Decorator class for monitoring llm apps functions.
 
@@ -49,29 +71,19 @@ class instrument(BaseDecorator):
         self.ignore_outputs = ignore_outputs
 
     def __call__(self, func: Callable[..., Any]):
+        # The signature of the function and the redaction of its inputs and outputs
+        # are resolved once, when it is decorated, and not on every call
         is_coroutine_function = inspect.iscoroutinefunction(func)
+        func_args = tuple(inspect.getfullargspec(func).args)
+        redact_inputs = make_redactor(self.ignore_inputs)
+        redact_outputs = make_redactor(self.ignore_outputs)
 
         def get_inputs(*args, **kwargs):
-            func_args = inspect.getfullargspec(func).args
-            input_dict = {name: value for name, value in zip(func_args, args)}
+            input_dict = dict(zip(func_args, args))
             input_dict.update(kwargs)
 
             return input_dict
 
-        def redact(io, blacklist):
-            return {
-                key: io[key]
-                for key in io.keys()
-                if key
-                not in (
-                    blacklist
-                    if isinstance(blacklist, list)
-                    else []
-                    if blacklist is False
-                    else io.keys()
-                )
-            }
-
         def patch(result):
             TRACE_DEFAULT_KEY = "__default__"
 
@@ -81,6 +93,9 @@ class instrument(BaseDecorator):
             if not isinstance(result, dict):
                 outputs = {TRACE_DEFAULT_KEY: result}
             else:
+                # the span keeps its own copy of the outputs
+                outputs = dict(result)
+
                 # PATCH : if result is a legacy dict, clean it up
                 if (
                     "message" in result.keys()
@@ -99,13 +114,13 @@ class instrument(BaseDecorator):
             async def wrapped_func(*args, **kwargs):
                 with ag.tracing.Context(
                     name=func.__name__,
-                    input=redact(get_inputs(*args, **kwargs), self.ignore_inputs),
+                    input=redact_inputs(get_inputs(*args, **kwargs)),
                     spankind=self.spankind,
                     config=self.config,
                 ):
                     result = await func(*args, **kwargs)
 
-                    ag.tracing.store_outputs(redact(patch(result), self.ignore_outputs))
+                    ag.tracing.store_outputs(redact_outputs(patch(result)))
 
                     return result
 
@@ -116,13 +131,13 @@ class instrument(BaseDecorator):
             def wrapped_func(*args, **kwargs):
                 with ag.tracing.Context(
                     name=func.__name__,
-                    input=redact(get_inputs(*args, **kwargs), self.ignore_inputs),
+                    input=redact_inputs(get_inputs(*args, **kwargs)),
                     spankind=self.spankind,
                     config=self.config,
                 ):
                     result = func(*args, **kwargs)
 
-                    ag.tracing.store_outputs(redact(patch(result), self.ignore_outputs))
+                    ag.tracing.store_outputs(redact_outputs(patch(result)))
 
                     return result
 
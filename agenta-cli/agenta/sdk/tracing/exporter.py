@@ -0,0 +1,142 @@
+# Stdlib Imports
+import os
+import gzip
+import json
+import random
+import asyncio
+import weakref
+from logging import Logger
+from typing import Sequence
+
+# Third Party Imports
+import httpx
+
+# Own Imports
+from agenta.client.backend.types.create_span import CreateSpan
+from agenta.client.backend.core.jsonable_encoder import jsonable_encoder
+
+
+class TracesExporter(object):
+    """Sends traces to the observability API.
+
+    All the requests of a process and event loop go through one long-lived HTTP
+    client, so that connections are kept alive and reused across traces instead of
+    being opened for each trace. Failed requests (network errors, 408, 429 and 5xx
+    responses) are retried with exponential backoff and jitter, and request bodies
+    larger than `compression_threshold` bytes can be gzip-compressed.
+
+    Args:
+        host (str): The URL of the backend API
+        api_key (str): The API Key of the backend host
+        logger (Logger): The logger
+        max_retries (int): The maximum number of retries of a failed request
+        retry_delay (float): The delay before the first retry, doubled at each retry (in seconds)
+        timeout (float): The timeout of the requests (in seconds)
+        max_connections (int): The maximum number of connections kept open to the backend
+        compress (bool): Whether to gzip-compress the request bodies
+        compression_threshold (int): The minimum size of a request body to compress it (in bytes)
+    """
+
+    RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+    def __init__(
+        self,
+        host: str,
+        api_key: str,
+        logger: Logger,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        timeout: float = 120,
+        max_connections: int = 10,
+        compress: bool = False,
+        compression_threshold: int = 1024,
+    ):
+        self.host = host
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.compress = compress
+        self.compression_threshold = compression_threshold
+        self._logger = logger
+        self._clients: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )  # event loop -> (pid, client)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Returns the long-lived HTTP client of the running event loop (and process)
+
+        Returns:
+            httpx.AsyncClient: async client
+        """
+
+        loop = asyncio.get_running_loop()
+        pid, client = self._clients.get(loop, (None, None))
+        if client is None or pid != os.getpid() or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self.host,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._clients[loop] = (os.getpid(), client)
+        return client
+
+    async def export(self, trace_id: str, spans: Sequence[CreateSpan]) -> None:
+        """Sends the spans of a trace.
+
+        Args:
+            trace_id (str): The ID of the trace
+            spans (Sequence[CreateSpan]): The spans of the trace
+
+        Raises:
+            httpx.HTTPError: If the request still fails after all the retries
+        """
+
+        headers = {"Authorization": self.api_key, "Content-Type": "application/json"}
+        content = json.dumps(
+            jsonable_encoder({"trace": trace_id, "spans": spans})
+        ).encode("utf-8")
+        if self.compress and len(content) >= self.compression_threshold:
+            content = gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+
+        retries = 0
+        while True:
+            try:
+                response = await self.client.post(
+                    "observability/trace/", content=content, headers=headers
+                )
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return
+                error: Exception = httpx.HTTPStatusError(
+                    f"Server responded with {response.status_code}",
+                    request=response.request,
+                    response=response,
+                )
+            except httpx.TransportError as exc:
+                error = exc
+
+            if retries >= self.max_retries:
+                raise error
+
+            delay = self.retry_delay * 2**retries * (1 - 0.25 * random.random())
+            self._logger.warning(
+                f"Sending trace {trace_id} failed ({error}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            retries += 1
+
+    async def close(self) -> None:
+        """
+        Closes the HTTP client of the running event loop.
+        """
+
+        _, client = self._clients.pop(asyncio.get_running_loop(), (None, None))
+        if client is not None:
+            await client.aclose()
@@ -1,6 +1,5 @@
 import os
 import copy
-import json
 from uuid import uuid4
 
 import traceback
@@ -13,6 +12,7 @@ from contextlib import contextmanager
 from agenta.sdk.tracing.tracing_context import tracing_context, TracingContext
 from agenta.sdk.tracing.logger import llm_logger as logging
 from agenta.sdk.tracing.tasks_manager import TaskQueue
+from agenta.sdk.tracing.exporter import TracesExporter
 from agenta.client.backend.client import AsyncAgentaApi
 from agenta.client.backend.client import AsyncObservabilityClient
 from agenta.client.backend.types.create_span import (
@@ -20,6 +20,9 @@ from agenta.client.backend.types.create_span import (
     LlmTokens,
 )
 from agenta.client.backend.types.span_status_code import SpanStatusCode
+from agenta.client.backend.core.datetime_utils import serialize_datetime
+
+from pydantic_core import to_jsonable_python
 
 from bson.objectid import ObjectId
 
@@ -31,6 +34,47 @@ from agenta.sdk.utils.debug import debug
 logging.setLevel("DEBUG")
 
 
+SPAN_FIELDS = tuple(CreateSpan.model_fields)
+
+
+def serialize_span(span: CreateSpan) -> Dict[str, Any]:
+    """
+    Serializes a span to a JSON-compatible dict, like `json.loads(span.json())` but in one pass.
+
+    Only the fields that were set are serialized. Timestamps are serialized like the backend
+    client does, primitive values are kept as is, and only the other values (e.g. the inputs
+    and outputs) go through pydantic.
+
+    Args:
+        span (CreateSpan): The span.
+
+    Returns:
+        Dict[str, Any]: The serialized span.
+    """
+
+    fields_set = span.model_fields_set
+    serialized_span = {}
+
+    for name in SPAN_FIELDS:
+        if name not in fields_set:
+            continue
+
+        value = getattr(span, name)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            serialized_span[name] = value
+        elif isinstance(value, datetime):
+            serialized_span[name] = serialize_datetime(value)
+        elif isinstance(value, LlmTokens):
+            serialized_span[name] = value.model_dump(by_alias=True, exclude_unset=True)
+        else:
+            serialized_span[name] = to_jsonable_python(value)
+
+    if span.model_extra:
+        serialized_span.update(to_jsonable_python(span.model_extra))
+
+    return serialized_span
+
+
 class SingletonMeta(type):
     """
     Thread-safe implementation of Singleton.
@@ -67,6 +111,10 @@ class Tracing(metaclass=SingletonMeta):
         api_key (str): The API Key of the backend host
         tasks_manager (TaskQueue): The tasks manager dedicated to handling asynchronous tasks
         max_workers (int): The maximum number of workers to run tracing
+
+    The traces are sent in the background by the tasks manager, through the long-lived
+    client of the traces exporter. Set AGENTA_TRACING_COMPRESSION=true to gzip-compress
+    them (the backend, or a proxy in front of it, must accept gzip-encoded requests).
     """
 
     def __init__(
@@ -82,6 +130,13 @@ class Tracing(metaclass=SingletonMeta):
         self.tasks_manager = TaskQueue(
             max_workers if max_workers else 4, logger=logging
         )
+        self.exporter = TracesExporter(
+            host=self.host,
+            api_key=self.api_key,
+            logger=logging,
+            compress=os.environ.get("AGENTA_TRACING_COMPRESSION", "false").lower()
+            in ["true", "1"],
+        )
         self.baggage = None
 
     @property
@@ -199,11 +254,27 @@ class Tracing(metaclass=SingletonMeta):
     def is_trace_ready(self):
         tracing = tracing_context.get()
 
-        are_spans_ready = [
-            (span.end_time == span.start_time) for span in tracing.spans.values()
-        ]
+        return tracing.open_spans == 0
+
+    async def wait_for_trace(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until all the spans of the current trace are closed, without polling.
 
-        return all(are_spans_ready)
+        Args:
+            timeout (Optional[float]): The deadline (in seconds, no deadline if None).
+
+        Returns:
+            bool: Whether the trace is ready, False if spans were still open at the deadline.
+        """
+        tracing = tracing_context.get()
+
+        is_trace_ready = await tracing.wait_for_spans(timeout)
+        if not is_trace_ready:
+            logging.warning(
+                f"Trace {tracing.trace_id} dumped with {tracing.open_spans} open span(s)"
+            )
+
+        return is_trace_ready
 
     @debug()
     def close_trace(self) -> None:
@@ -284,6 +355,7 @@ class Tracing(metaclass=SingletonMeta):
             span.parent_span_id = tracing.active_span.id  # type: ignore
 
         tracing.spans[span.id] = span
+        tracing.span_opened(span.id)
 
         if active:
             tracing.active_span = span
@@ -376,6 +448,8 @@ class Tracing(metaclass=SingletonMeta):
                 tracing.active_span = parent_span
         ### --- TO BE CLEANED --- <<<
 
+        tracing_context.get().span_closed(span.id)
+
         logging.info(f"Closed  span  {span.id} {spankind}")
 
     @debug()
@@ -447,7 +521,7 @@ class Tracing(metaclass=SingletonMeta):
         """
         Collects and organizes tracing information into a dictionary.
         This function retrieves the current tracing context and extracts relevant data such as `trace_id`, `cost`, `tokens`, and `latency` for the whole trace.
-        It also dumps detailed span information using the `dump_spans` method and includes it in the trace dictionary.
+        It also dumps detailed span information using `serialize_span`, in the same pass, and includes it in the trace dictionary.
         If an error occurs during the process, it logs the error message and stack trace.
 
         Returns:
@@ -460,22 +534,22 @@ class Tracing(metaclass=SingletonMeta):
 
             trace["trace_id"] = tracing.trace_id
 
+            spans = []
             for span in tracing.spans.values():
+                serialized_span = serialize_span(span)
+
                 if span.parent_span_id is None:
                     trace["cost"] = span.cost
                     trace["usage"] = (
-                        None if span.tokens is None else json.loads(span.tokens.json())
+                        None
+                        if span.tokens is None
+                        else dict(serialized_span.get("tokens") or {})
                     )
                     trace["latency"] = (span.end_time - span.start_time).total_seconds()
 
-            spans = (
-                []
-                if len(tracing.spans) == 0
-                else [json.loads(span.json()) for span in tracing.spans.values()]
-            )
+                spans.append(serialized_span)
 
-            if spans is not None:
-                trace["spans"] = spans
+            trace["spans"] = spans
 
         except Exception as e:
             logging.error(e)
@@ -579,14 +653,10 @@ class Tracing(metaclass=SingletonMeta):
         self.tasks_manager.add_task(
             tracing.trace_id,
             "send-trace",
-            # mock_create_traces(
-            self.client.create_traces(
-                trace=tracing.trace_id, spans=spans  # type: ignore
-            ),
-            self.client,
+            self.exporter.export(trace_id=tracing.trace_id, spans=spans),  # type: ignore
         )
 
-        logging.info(f"Sent    trace {tracing.trace_id}")
+        logging.info(f"Queued  trace {tracing.trace_id}")
 
     def _update_span_cost(self, span: CreateSpan, cost: Optional[float]) -> None:
         if span is not None and cost is not None and isinstance(cost, float):
@@ -1,9 +1,12 @@
 # Stdlib Imports
+import os
+import time
 import queue
+import atexit
 import asyncio
+import threading
 from logging import Logger
-from typing import Coroutine, Optional, Union
-from concurrent.futures import ThreadPoolExecutor
+from typing import Coroutine, List, Optional, Union
 
 # Own Imports
 from agenta.client.backend.types.error import Error
@@ -22,7 +25,7 @@ class AsyncTask(object):
         coroutine_id: str,
         coroutine_type: str,
         coroutine: Coroutine,
-        client: AsyncObservabilityClient,
+        client: Optional[AsyncObservabilityClient] = None,
     ):
         self.coroutine_id = coroutine_id
         self.coroutine_type = coroutine_type
@@ -53,77 +56,181 @@ class AsyncTask(object):
 
 
 class TaskQueue(object):
-    """Stores a list of AsyncTask instances.
+    """Runs AsyncTask instances in the background, on a long-lived sender thread.
+
+    Adding a task only puts it in a bounded in-memory queue, so that it never blocks
+    the caller (e.g. a request closing its trace). The sender thread drains the queue
+    in batches of up to `max_batch_size` tasks and runs each batch on its own event
+    loop, with at most `num_workers` tasks running concurrently. When the queue is
+    full, new tasks are dropped. Pending tasks are flushed when the process exits.
 
     Args:
-        tasks (List[AsyncTasks]): list of async task instances
+        num_workers (int): the maximum number of tasks running concurrently
+        logger (Logger): the logger
+        max_queue_size (int): the maximum number of pending tasks
+        max_batch_size (int): the maximum number of tasks taken from the queue at once
 
     Example Usage:
         ```python
-        queue = TaskQueue()
-        queue.add_task(long_running_task(1))
-        queue.add_task(long_running_task(2))
+        queue = TaskQueue(num_workers=4, logger=logger)
+        queue.add_task("1", "long-running-task", long_running_task(1), client)
+        queue.add_task("2", "long-running-task", long_running_task(2), client)
+        queue.flush()
         ```
     """
 
-    def __init__(self, num_workers: int, logger: Logger):
-        self.tasks = queue.Queue()  # type: ignore
+    def __init__(
+        self,
+        num_workers: int,
+        logger: Logger,
+        max_queue_size: int = 1000,
+        max_batch_size: int = 100,
+    ):
+        self.tasks = queue.Queue(maxsize=max_queue_size)  # type: ignore
+        self.dropped_tasks = 0
         self._logger = logger
-        self._thread_pool = ThreadPoolExecutor(max_workers=num_workers)
+        self._num_workers = num_workers
+        self._max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.shutdown)
 
     def add_task(
         self,
         coroutine_id: str,
         coroutine_type: str,
         coroutine: Coroutine,
-        obs_client: AsyncObservabilityClient,
-    ) -> AsyncTask:
-        """Adds a new task to be executed.
+        obs_client: Optional[AsyncObservabilityClient] = None,
+    ) -> Optional[AsyncTask]:
+        """Adds a new task to be executed in the background, without waiting for it.
 
         Args:
             coroutine_id (str): The Id of the coroutine
             coroutine_type (str): The type of coroutine
             coroutine (Coroutine): async task
-            obs_client (AsyncObservabilityClient): The async observability client
+            obs_client (Optional[AsyncObservabilityClient]): The async observability client
 
         Returns:
-            AsyncTask: task to be executed
+            AsyncTask: task to be executed, or None if the queue is full and the task was dropped
         """
 
         task = AsyncTask(coroutine_id, coroutine_type, coroutine, obs_client)
-        self.tasks.put(task)
-        return self._worker()
+        self._ensure_worker()
+        try:
+            self.tasks.put_nowait(task)
+        except queue.Full:
+            self.dropped_tasks += 1
+            coroutine.close()
+            self._logger.warning(
+                f"Task queue is full, dropping task '{coroutine_type}' {coroutine_id} "
+                f"({self.dropped_tasks} tasks dropped so far)"
+            )
+            return None
+        return task
+
+    def _ensure_worker(self) -> None:
+        """
+        Starts the sender thread, once per process (threads do not survive a fork).
+        """
+
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._worker, name="agenta-tasks-queue", daemon=True
+                )
+                self._thread.start()
 
     def _worker(self):
         """
-        Runs task gotten from the queue in a thread pool.
+        Runs the tasks gotten from the queue, in batches, on a dedicated event loop.
         """
 
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         while True:
-            task: AsyncTask = self.tasks.get()  # type: ignore
+            batch: List[Optional[AsyncTask]] = [self.tasks.get()]
+            while len(batch) < self._max_batch_size:
+                try:
+                    batch.append(self.tasks.get_nowait())
+                except queue.Empty:
+                    break
+
+            tasks = [task for task in batch if task is not None]
             try:
-                future = self._thread_pool.submit(asyncio.run, task.run())
-                future.result()
-            except Exception as exc:
-                self._logger.error(
-                    f"Task '{task.coroutine_type}' failed with error: {str(exc)}"
-                )
-                break
+                loop.run_until_complete(self._run_batch(tasks))
             finally:
-                self.tasks.task_done()
-                break
+                for _ in batch:
+                    self.tasks.task_done()
+
+            if len(tasks) < len(batch):  # Stopped by shutdown
+                loop.close()
+                return
+
+    async def _run_batch(self, tasks: List[AsyncTask]) -> None:
+        """
+        Runs a batch of tasks concurrently, with at most num_workers at once.
+        """
+
+        semaphore = asyncio.Semaphore(self._num_workers)
+
+        async def run(task: AsyncTask):
+            async with semaphore:
+                try:
+                    await task.run()
+                except Exception as exc:
+                    self._logger.error(
+                        f"Task '{task.coroutine_type}' failed with error: {str(exc)}"
+                    )
+
+        await asyncio.gather(*[run(task) for task in tasks])
 
     def _get_size(self) -> int:
         """Returns the approximate number of items in the queue."""
 
         return self.tasks.qsize()
 
-    def flush(self) -> None:
-        """Clears all items from the queue."""
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all the tasks in the queue have been executed.
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait (no limit if None)
+
+        Returns:
+            bool: whether all the tasks have been executed
+        """
 
         q_size = self._get_size()
         self._logger.info("Flushing queue...")
-        with self.tasks.mutex:  # acts as a lock to ensure that only one thread can access the queue
-            self.tasks.join()
-            self._logger.info(f"Queue with {q_size} items flushed successfully")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.tasks.all_tasks_done:
+            while self.tasks.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._logger.warning(
+                        f"Queue flush timed out with {self.tasks.unfinished_tasks} items left"
+                    )
+                    return False
+                self.tasks.all_tasks_done.wait(remaining)
+
+        self._logger.info(f"Queue with {q_size} items flushed successfully")
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Flushes the queue and stops the sender thread (called when the process exits).
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait for the pending tasks
+        """
+
+        if self._thread is None or self._pid != os.getpid():
             return
+
+        if self.flush(timeout=timeout):
+            self.tasks.put(None)  # type: ignore
+            self._thread.join(timeout=timeout)
+        self._thread = None
@@ -1,6 +1,8 @@
+import asyncio
+import threading
 from contextvars import ContextVar
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set
 
 from agenta.client.backend.types.create_span import CreateSpan
 
@@ -17,6 +19,65 @@ class TracingContext:
         self.active_span: Optional[CreateSpan] = None
         self.spans: Dict[str, CreateSpan] = {}
 
+        ### --- COMPLETION --- ###
+        self._open_span_ids: Set[str] = set()
+        self._lock = threading.Lock()
+        self._waiters: List[
+            tuple
+        ] = []  # (event loop, event) of the wait_for_spans calls
+
+    @property
+    def open_spans(self) -> int:
+        """The number of spans opened and not closed yet"""
+
+        return len(self._open_span_ids)
+
+    def span_opened(self, span_id: str) -> None:
+        with self._lock:
+            self._open_span_ids.add(span_id)
+
+    def span_closed(self, span_id: str) -> None:
+        """Marks a span as closed, and wakes up the waiters when it was the last open span.
+
+        It can be called from any thread (e.g. by a synchronous function running in a thread pool).
+        """
+
+        with self._lock:
+            self._open_span_ids.discard(span_id)
+            if self._open_span_ids:
+                return
+            waiters, self._waiters = self._waiters, []
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # the event loop of the waiter is closed
+                pass
+
+    async def wait_for_spans(self, timeout: Optional[float]) -> bool:
+        """Waits until all the spans of the trace are closed, or the deadline passes.
+        Args:
+            timeout (Optional[float]): The maximum time to wait (in seconds, no deadline if None)
+
+        Returns:
+            bool: Whether all the spans are closed
+        """
+
+        with self._lock:
+            if not self._open_span_ids:
+                return True
+            waiter = (asyncio.get_running_loop(), asyncio.Event())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                return not self._open_span_ids
+
     def __repr__(self) -> str:
         return f"TracingContext(trace='{self.trace_id}', spans={[f'{span.id} {span.spankind}' for span in self.spans.values()]})"
 
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the tracing overhead of an app, in spans per second.
+
+Runs requests through a chain of --depth `@instrument`-ed functions and dumps their
+trace, and compares the serialization of the spans by `dump_trace` with the previous
+`json.loads(span.json())` of each span.
+
+Usage:
+    python -m tests.benchmarks.bench_spans --requests 200 --depth 50
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+import agenta as ag
+from agenta.sdk.tracing.llm_tracing import Tracing
+from agenta.sdk.tracing.logger import llm_logger
+from agenta.sdk.tracing.tracing_context import tracing_context, TracingContext
+
+
+def dump_spans_with_json(tracing: TracingContext):
+    """The serialization of the spans in dump_trace before serialize_span."""
+
+    return [json.loads(span.json()) for span in tracing.spans.values()]
+
+
+def make_chain(depth: int):
+    @ag.instrument(spankind="llm", ignore_inputs=["api_key"])
+    async def call_llm(prompt: str, api_key: str, temperature: float = 0.5):
+        return {"message": prompt, "temperature": temperature}
+
+    @ag.instrument()
+    async def chain(prompt: str, steps: int):
+        for step in range(steps):
+            prompt = (await call_llm(f"{prompt} {step}", "secret"))["message"][:100]
+        return prompt
+
+    return lambda prompt: chain(prompt, depth - 1)
+
+
+async def run(requests: int, depth: int):
+    chain = make_chain(depth)
+    durations = {"spans": 0.0, "dump_trace": 0.0, "json": 0.0}
+
+    for i in range(requests):
+        token = tracing_context.set(TracingContext())
+        try:
+            started_at = time.perf_counter()
+            await chain(f"prompt {i}")
+            durations["spans"] += time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            ag.tracing.dump_trace()
+            durations["dump_trace"] += time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            dump_spans_with_json(tracing_context.get())
+            durations["json"] += time.perf_counter() - started_at
+        finally:
+            tracing_context.reset(token)
+
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    ag.tracing = Tracing(host="http://agenta.bench", app_id="app-id", api_key="")
+    llm_logger.setLevel("WARNING")
+
+    durations = asyncio.run(run(args.requests, args.depth))
+    spans = args.requests * args.depth
+
+    print(f"recording:          {spans / durations['spans']:,.0f} spans/s")
+    print(f"dump_trace:         {spans / durations['dump_trace']:,.0f} spans/s")
+    print(f"json.loads(json()): {spans / durations['json']:,.0f} spans/s")
+
+
+if __name__ == "__main__":
+    main()
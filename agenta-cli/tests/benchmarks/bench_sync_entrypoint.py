@@ -0,0 +1,90 @@
+"""
+Load test of an app with a synchronous entrypoint, served inline or in the thread pool.
+
+Sends concurrent requests to the playground endpoint of the app (in process, through
+the ASGI transport of httpx), whose entrypoint blocks for --latency seconds like a
+synchronous LLM call, and reports the throughput of each AGENTA_SYNC_EXECUTION_MODE.
+
+Usage:
+    python -m tests.benchmarks.bench_sync_entrypoint --requests 64 --concurrency 16 --latency 0.05
+"""
+
+import time
+import asyncio
+import argparse
+
+import httpx
+from pydantic import BaseModel
+
+import agenta as ag
+from agenta.sdk.decorators import llm_entrypoint
+from agenta.sdk.tracing.llm_tracing import Tracing
+from agenta.sdk.tracing.logger import llm_logger
+
+
+LATENCY = 0.05
+
+
+class BenchConfig(BaseModel):
+    temperature: float = 0.5
+
+
+@ag.instrument(spankind="llm")
+def sync_llm_call(prompt: str) -> str:
+    time.sleep(LATENCY)
+    return prompt
+
+
+@ag.route("/bench", config_schema=BenchConfig)
+def generate(prompt: str) -> str:
+    return sync_llm_call(prompt)
+
+
+async def load_test(requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=llm_entrypoint.app),
+        base_url="http://agenta.bench",
+        timeout=None,
+    ) as client:
+
+        async def send(i: int):
+            async with semaphore:
+                response = await client.post(
+                    "/playground/run/bench", json={"prompt": f"prompt {i}"}
+                )
+                response.raise_for_status()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[send(i) for i in range(requests)])
+        return time.perf_counter() - started_at
+
+
+def main():
+    global LATENCY
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+    llm_logger.setLevel("WARNING")
+    ag.tracing = Tracing(host="http://agenta.bench", app_id="app-id", api_key="")
+
+    durations = {}
+    for mode in ["inline", "thread"]:
+        llm_entrypoint.SYNC_EXECUTION_MODE = mode
+        durations[mode] = asyncio.run(load_test(args.requests, args.concurrency))
+        print(
+            f"{mode:>6}: {args.requests} requests in {durations[mode]:.2f}s "
+            f"({args.requests / durations[mode]:.1f} req/s)"
+        )
+
+    print(f"speedup: {durations['inline'] / durations['thread']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from agenta.sdk.config_cache import ConfigCache
+
+
+def make_config(temperature: float):
+    return SimpleNamespace(current_version=1, parameters={"temperature": temperature})
+
+
+def make_cache(**kwargs) -> ConfigCache:
+    cache = ConfigCache(host="https://mock.agenta.ai", api_key="api-key", **kwargs)
+    cache._client = MagicMock()
+    return cache
+
+
+def set_async_client(cache: ConfigCache, get_config: AsyncMock) -> None:
+    client = SimpleNamespace(configs=SimpleNamespace(get_config=get_config))
+    cache._async_clients[asyncio.get_running_loop()] = (os.getpid(), client)
+
+
+def test_fresh_configs_are_not_fetched_again():
+    cache = make_cache(ttl=60, max_staleness=60)
+    cache.client.configs.get_config.return_value = make_config(0.5)
+
+    for _ in range(3):
+        config = cache.get(base_id="base-id", environment_name="production")
+        assert config.parameters == {"temperature": 0.5}
+
+    cache.client.configs.get_config.assert_called_once_with(
+        base_id="base-id", config_name=None, environment_name="production"
+    )
+
+
+def test_stale_configs_are_returned_while_refreshed():
+    cache = make_cache(ttl=0, max_staleness=60)
+    cache.client.configs.get_config.return_value = make_config(0.5)
+    cache.get(base_id="base-id", environment_name="production")
+
+    cache.client.configs.get_config.return_value = make_config(0.9)
+    stale_config = cache.get(base_id="base-id", environment_name="production")
+    assert stale_config.parameters == {"temperature": 0.5}
+
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    config = cache.get(base_id="base-id", environment_name="production")
+    assert config.parameters == {"temperature": 0.9}
+
+
+def test_expired_and_invalidated_configs_are_fetched_again():
+    cache = make_cache(ttl=-1, max_staleness=0)
+    cache.client.configs.get_config.return_value = make_config(0.5)
+    cache.get(base_id="base-id", config_name="default")
+    cache.get(base_id="base-id", config_name="default")
+    assert cache.client.configs.get_config.call_count == 2
+
+    cache.ttl, cache.max_staleness = 60, 60
+    cache.get(base_id="base-id", config_name="default")
+    cache.invalidate(base_id="base-id")
+    cache.get(base_id="base-id", config_name="default")
+    assert cache.client.configs.get_config.call_count == 3
+
+
+def test_concurrent_async_fetches_are_shared():
+    async def main():
+        cache = make_cache(ttl=60, max_staleness=60)
+
+        async def get_config(**kwargs):
+            await asyncio.sleep(0.01)
+            return make_config(0.5)
+
+        get_config_mock = AsyncMock(side_effect=get_config)
+        set_async_client(cache, get_config_mock)
+
+        configs = await asyncio.gather(
+            *[
+                cache.aget(base_id="base-id", environment_name="production")
+                for _ in range(10)
+            ]
+        )
+        assert all(config.parameters == {"temperature": 0.5} for config in configs)
+        await cache.aget(base_id="base-id", environment_name="production")
+        get_config_mock.assert_awaited_once()
+
+    asyncio.run(main())
+
+
+def test_stale_configs_are_refreshed_on_the_event_loop():
+    async def main():
+        cache = make_cache(ttl=0, max_staleness=60)
+        get_config_mock = AsyncMock(return_value=make_config(0.5))
+        set_async_client(cache, get_config_mock)
+        await cache.aget(base_id="base-id", config_name="default")
+
+        get_config_mock.return_value = make_config(0.9)
+        stale_config = await cache.aget(base_id="base-id", config_name="default")
+        assert stale_config.parameters == {"temperature": 0.5}
+
+        await asyncio.gather(*cache._tasks)
+        config = await cache.aget(base_id="base-id", config_name="default")
+        assert config.parameters == {"temperature": 0.9}
+        cache.client.configs.get_config.assert_not_called()
+
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+import time
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import agenta as ag
+from agenta.sdk.decorators import llm_entrypoint
+from agenta.sdk.decorators.llm_entrypoint import entrypoint
+from agenta.sdk.tracing.llm_tracing import Tracing
+
+
+ag.tracing = Tracing(host="https://mock.agenta.ai", app_id="app-id", api_key="")
+
+
+@ag.instrument(spankind="llm")
+def sync_llm_call(prompt: str) -> str:
+    time.sleep(0.2)
+    return prompt.upper()
+
+
+@ag.instrument()
+def sync_app(prompt: str) -> dict:
+    return {"output": sync_llm_call(prompt), "thread": threading.get_ident()}
+
+
+@pytest.fixture(autouse=True)
+def sdk_version():
+    with patch.object(llm_entrypoint, "version", return_value="0.24.2"):
+        yield
+
+
+async def execute(prompt: str):
+    executor = entrypoint.__new__(entrypoint)
+    return await executor.execute_function(
+        sync_app, True, params={"prompt": prompt}, config_params={}
+    )
+
+
+def test_sync_entrypoints_run_concurrently_in_threads():
+    async def main():
+        started_at = time.perf_counter()
+        responses = await asyncio.gather(*[execute(f"prompt {i}") for i in range(4)])
+        return time.perf_counter() - started_at, responses
+
+    with patch.object(llm_entrypoint, "SYNC_EXECUTION_MODE", "thread"):
+        duration, responses = asyncio.run(main())
+
+    assert duration < 0.6  # 4 x 0.2s when run one at a time
+    for i, response in enumerate(responses):
+        assert response.data["output"] == f"PROMPT {i}"
+        assert response.data["thread"] != threading.get_ident()
+
+        # the spans of the thread are recorded in the trace of their request
+        spans = response.trace["spans"]
+        assert [span["name"] for span in spans] == ["sync_app", "sync_llm_call"]
+        assert spans[1]["parent_span_id"] == spans[0]["id"]
+        assert spans[1]["inputs"] == {"prompt": f"prompt {i}"}
+
+
+def test_sync_entrypoints_run_inline_by_default():
+    response = asyncio.run(execute("prompt"))
+
+    assert response.data["thread"] == threading.get_ident()
+    assert len(response.trace["spans"]) == 2
@@ -0,0 +1,99 @@
+import os
+import gzip
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from agenta.sdk.tracing.exporter import TracesExporter
+from agenta.client.backend.types.create_span import CreateSpan
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_span(span_id: str) -> CreateSpan:
+    now = datetime.now(timezone.utc)
+    return CreateSpan(
+        id=span_id,
+        app_id="app-id",
+        name="generate",
+        spankind="LLM",
+        status="OK",
+        start_time=now,
+        end_time=now,
+    )
+
+
+def make_exporter(handler, **kwargs) -> TracesExporter:
+    exporter = TracesExporter(
+        host="https://mock.agenta.ai/api", api_key="api-key", logger=logger, **kwargs
+    )
+    client = httpx.AsyncClient(
+        base_url=exporter.host, transport=httpx.MockTransport(handler)
+    )
+    exporter._clients[asyncio.get_running_loop()] = (os.getpid(), client)
+    return exporter
+
+
+def test_export_retries_failed_requests_with_the_same_client():
+    """
+    Test that a trace is retried on overload responses and sent through the long-lived client.
+    """
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    async def export():
+        exporter = make_exporter(handler, retry_delay=0.01)
+        client = exporter.client
+        await exporter.export("trace-id", [make_span("span-1"), make_span("span-2")])
+        assert exporter.client is client
+
+    asyncio.run(export())
+    assert len(requests) == 3
+    assert requests[-1].url == "https://mock.agenta.ai/api/observability/trace/"
+    assert requests[-1].headers["Authorization"] == "api-key"
+    payload = json.loads(requests[-1].content)
+    assert payload["trace"] == "trace-id"
+    assert [span["id"] for span in payload["spans"]] == ["span-1", "span-2"]
+
+
+def test_export_compresses_large_requests():
+    """
+    Test that request bodies are gzip-compressed when compression is enabled.
+    """
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={})
+
+    async def export():
+        exporter = make_exporter(handler, compress=True, compression_threshold=0)
+        await exporter.export("trace-id", [make_span("span-1")])
+
+    asyncio.run(export())
+
+    assert requests[0].headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(requests[0].content))["trace"] == "trace-id"
+
+
+def test_export_raises_after_max_retries():
+    async def export():
+        exporter = make_exporter(
+            lambda request: httpx.Response(500), max_retries=1, retry_delay=0.01
+        )
+        await exporter.export("trace-id", [make_span("span-1")])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(export())
@@ -0,0 +1,83 @@
+import json
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import agenta as ag
+from agenta.sdk.decorators import tracing as tracing_decorators
+from agenta.sdk.tracing.llm_tracing import Tracing, serialize_span
+from agenta.sdk.tracing.tracing_context import tracing_context, TracingContext
+from agenta.client.backend.types.create_span import CreateSpan, LlmTokens
+
+
+ag.tracing = Tracing(host="https://mock.agenta.ai", app_id="app-id", api_key="")
+
+
+def make_span(**kwargs) -> CreateSpan:
+    now = datetime.now(timezone.utc)
+    return CreateSpan(
+        id="span-id",
+        app_id="app-id",
+        name="generate",
+        spankind="LLM",
+        status="OK",
+        start_time=now,
+        end_time=now + timedelta(seconds=1),
+        **kwargs,
+    )
+
+
+def test_spans_are_serialized_like_their_json():
+    span = make_span(
+        inputs={"prompt": "Hello", "at": datetime(2024, 1, 1), "ids": (1, 2)},
+        outputs={"__default__": ["a", "b"]},
+        config={"temperature": 0.5, "stop": None},
+        attributes={},
+        internals=None,
+        parent_span_id=None,
+        tokens=LlmTokens(prompt_tokens=1, completion_tokens=2, total_tokens=3),
+        cost=0.25,
+    )
+    span.environment = "production"
+    span.custom = {"extra": True}
+
+    assert serialize_span(span) == json.loads(span.json())
+    minimal_span = make_span()
+    assert serialize_span(minimal_span) == json.loads(minimal_span.json())
+
+
+def test_instrument_resolves_the_signature_once():
+    with patch.object(
+        tracing_decorators.inspect,
+        "getfullargspec",
+        wraps=tracing_decorators.inspect.getfullargspec,
+    ) as getfullargspec:
+
+        @ag.instrument(ignore_inputs=["api_key"], ignore_outputs=True)
+        def call_llm(prompt: str, api_key: str, temperature: float = 0.5) -> dict:
+            return {"message": prompt}
+
+        @ag.instrument()
+        async def generate(prompt: str) -> dict:
+            outputs = call_llm(prompt, "secret", temperature=0.9)
+            outputs["message"] += "!"
+            return outputs
+
+        async def main():
+            token = tracing_context.set(TracingContext())
+            try:
+                for _ in range(3):
+                    await generate("Hello")
+                return ag.tracing.dump_trace()
+            finally:
+                tracing_context.reset(token)
+
+        trace = asyncio.run(main())
+
+    assert getfullargspec.call_count == 2
+    spans = {span["name"]: span for span in trace["spans"]}
+    assert spans["call_llm"]["inputs"] == {"prompt": "Hello", "temperature": 0.9}
+    assert spans["call_llm"]["outputs"] == {}
+    assert spans["generate"]["inputs"] == {"prompt": "Hello"}
+    assert spans["generate"]["outputs"] == {"message": "Hello!"}
+    assert trace["latency"] >= 0
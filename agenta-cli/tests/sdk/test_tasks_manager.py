@@ -0,0 +1,59 @@
+import time
+import asyncio
+import logging
+import threading
+
+from agenta.sdk.tracing.tasks_manager import TaskQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+def test_add_task_does_not_wait_for_the_task():
+    """
+    Test that adding a task returns immediately, and that flush waits for the task.
+    """
+
+    tasks_queue = TaskQueue(num_workers=2, logger=logger)
+    finished = []
+
+    async def slow_task():
+        await asyncio.sleep(0.2)
+        finished.append(True)
+
+    start_time = time.perf_counter()
+    tasks_queue.add_task("trace-id", "send-trace", slow_task(), None)
+    assert time.perf_counter() - start_time < 0.1
+    assert finished == []
+
+    assert tasks_queue.flush(timeout=5)
+    assert finished == [True]
+    tasks_queue.shutdown()
+
+
+def test_add_task_drops_tasks_when_queue_is_full():
+    """
+    Test that tasks are dropped, instead of blocking the caller, when the queue is full.
+    """
+
+    tasks_queue = TaskQueue(num_workers=1, logger=logger, max_queue_size=2)
+    release = threading.Event()
+    finished = []
+
+    async def blocked_task(index):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        finished.append(index)
+
+    # The first task is taken by the sender thread, the next two fill the queue
+    assert tasks_queue.add_task("0", "send-trace", blocked_task(0), None) is not None
+    time.sleep(0.1)
+    for index in [1, 2]:
+        assert tasks_queue.add_task(str(index), "send-trace", blocked_task(index), None)
+    assert tasks_queue.add_task("3", "send-trace", blocked_task(3), None) is None
+    assert tasks_queue.dropped_tasks == 1
+
+    release.set()
+    assert tasks_queue.flush(timeout=5)
+    assert sorted(finished) == [0, 1, 2]
+    tasks_queue.shutdown()
@@ -0,0 +1,90 @@
+import time
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import agenta as ag
+from agenta.sdk.decorators import llm_entrypoint
+from agenta.sdk.decorators.llm_entrypoint import entrypoint
+from agenta.sdk.tracing.llm_tracing import Tracing
+from agenta.sdk.tracing.tracing_context import TracingContext
+
+
+ag.tracing = Tracing(host="https://mock.agenta.ai", app_id="app-id", api_key="")
+
+
+@pytest.fixture(autouse=True)
+def sdk_version():
+    with patch.object(llm_entrypoint, "version", return_value="0.24.2"):
+        yield
+
+
+def execute(func, timeout: float = 1):
+    async def main():
+        executor = entrypoint.__new__(entrypoint)
+        started_at = time.perf_counter()
+        with patch.object(llm_entrypoint, "TRACE_COMPLETION_TIMEOUT", timeout):
+            response = await executor.execute_function(
+                func, True, params={}, config_params={}
+            )
+        return time.perf_counter() - started_at, response
+
+    return asyncio.run(main())
+
+
+def test_closed_traces_are_dumped_without_waiting():
+    @ag.instrument()
+    async def app():
+        return "done"
+
+    duration, response = execute(app)
+
+    assert duration < 0.1
+    assert len(response.trace["spans"]) == 1
+
+
+def test_traces_are_dumped_when_their_last_span_closes():
+    @ag.instrument(spankind="tool")
+    async def late_tool():
+        await asyncio.sleep(0.2)
+
+    @ag.instrument()
+    async def app():
+        asyncio.ensure_future(late_tool())
+        await asyncio.sleep(0)  # the tool opens its span
+        return "done"
+
+    duration, response = execute(app)
+
+    assert 0.2 <= duration < 0.5
+    assert [span["name"] for span in response.trace["spans"]] == ["app", "late_tool"]
+
+
+def test_traces_with_spans_left_open_are_dumped_at_the_deadline():
+    @ag.instrument()
+    async def app():
+        ag.tracing.open_span(name="never_closed", spankind="tool", input={})
+        return "done"
+
+    duration, response = execute(app, timeout=0.2)
+
+    assert 0.2 <= duration < 0.5
+    assert len(response.trace["spans"]) == 2
+
+
+def test_spans_closed_from_other_threads_wake_up_the_waiter():
+    async def main():
+        tracing = TracingContext()
+        tracing.span_opened("span-id")
+
+        timer = threading.Timer(0.1, tracing.span_closed, args=("span-id",))
+        timer.start()
+        assert await tracing.wait_for_spans(timeout=5)
+        assert tracing.open_spans == 0
+
+        tracing.span_opened("other-span-id")
+        assert not await tracing.wait_for_spans(timeout=0.01)
+
+    asyncio.run(main())